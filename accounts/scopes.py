@@ -0,0 +1,194 @@
+"""
+Row-level access scope: which blocks, sections and farmers a user may see.
+
+Admins, treasurers, secretaries and presidents see the whole scheme. A
+block chair sees their block (``CustomUser.block``), and the section-level
+endpoints (attendance) also narrow to their section. ``scope_for(user)``
+resolves this once per user and caches it, together with the IDs of the
+farmers in the block, so views filter with plain FK/``IN`` lookups instead
+of joining through farmers on every request::
+
+    class PaymentListAPIView(ScopedQuerysetMixin, APIView):
+        scope_fields = {'farmer': 'farmer_id'}
+
+        def get(self, request):
+            payments = self.scope_queryset(Payment.objects.all())
+
+Cached scopes are dropped when a user's role, block or section changes
+(accounts.signals) and when farmers join or leave a block
+(farmers.signals), through the shared cache (settings.CACHES).
+``ACCESS_SCOPE_CACHE_TIMEOUT`` bounds how long a scope outlives a change
+that bypasses those signals.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+DEFAULT_CACHE_TIMEOUT = 300  # seconds
+
+SCOPED_ROLES = ('block_chair',)
+
+
+def _user_key(user_id):
+    return f'access-scope:user:{user_id}'
+
+
+def _block_version_key(block_id):
+    return f'access-scope:block:{block_id}'
+
+
+def cache_timeout():
+    return getattr(settings, 'ACCESS_SCOPE_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT)
+
+
+class Scope:
+    """The rows one user may reach. ``unrestricted`` scopes filter nothing."""
+
+    def __init__(self, role, block_id=None, section_id=None, section_ids=(), farmer_ids=()):
+        self.role = role
+        self.block_id = block_id
+        self.section_id = section_id
+        self.section_ids = frozenset(section_ids)
+        self.farmer_ids = frozenset(farmer_ids)
+
+    @property
+    def unrestricted(self):
+        return self.role not in SCOPED_ROLES
+
+    def error(self, level='block'):
+        """Why this scope cannot be used at ``level``, or None."""
+        if self.unrestricted:
+            return None
+        if not self.block_id:
+            return "No block assigned to this chair."
+        if level == 'section' and not self.section_id:
+            return "Block Chair has no block or section assigned."
+        return None
+
+    def filter(self, queryset, block=None, section=None, farmer=None, level='block'):
+        """
+        ``queryset`` limited to this scope. ``block``, ``section`` and
+        ``farmer`` name the model's FK columns (e.g. ``block='block_id'``);
+        the most direct one given is used. A block chair without a block
+        gets no rows.
+        """
+        if self.unrestricted:
+            return queryset
+        if self.error(level):
+            return queryset.none()
+        if level == 'section' and section:
+            return queryset.filter(**{section: self.section_id})
+        if block:
+            return queryset.filter(**{block: self.block_id})
+        if section:
+            return queryset.filter(**{f'{section}__in': self.section_ids})
+        if farmer:
+            return queryset.filter(**{f'{farmer}__in': self.farmer_ids})
+        raise ValueError("Scope.filter needs a block, section or farmer field.")
+
+    def permits(self, block_id=None, section_id=None, farmer_id=None, level='block'):
+        """Whether a single row with these FK values is in scope."""
+        if self.unrestricted:
+            return True
+        if self.error(level):
+            return False
+        if level == 'section' and section_id is not None:
+            return section_id == self.section_id
+        if block_id is not None:
+            return block_id == self.block_id
+        if section_id is not None:
+            return section_id in self.section_ids
+        if farmer_id is not None:
+            return farmer_id in self.farmer_ids
+        return False
+
+
+def _resolve(user):
+    from farmers.models import Farmer
+    from farmers.reference import reference_data
+
+    if user.role not in SCOPED_ROLES or not user.block_id:
+        return Scope(user.role, user.block_id, user.section_id)
+    section_ids = [
+        section['id'] for section in reference_data.snapshot().sections_for_block(user.block_id)
+    ]
+    farmer_ids = Farmer.objects.filter(block_id=user.block_id).values_list('id', flat=True)
+    return Scope(user.role, user.block_id, user.section_id, section_ids, farmer_ids)
+
+
+def scope_for(user):
+    """The user's scope, from the request, the cache, or resolved afresh."""
+    scope = getattr(user, '_access_scope', None)
+    if scope is not None:
+        return scope
+
+    identity = (user.role, user.block_id, user.section_id)
+    user_key = _user_key(user.pk)
+    if user.role in SCOPED_ROLES and user.block_id:
+        version_key = _block_version_key(user.block_id)
+        cached = cache.get_many([user_key, version_key])
+        version = cached.get(version_key, 0)
+        entry = cached.get(user_key)
+        # The identity check also catches changes saved by other processes
+        if entry and entry['identity'] == identity and entry['version'] == version:
+            scope = entry['scope']
+        else:
+            scope = _resolve(user)
+            cache.set(user_key, {'identity': identity, 'version': version, 'scope': scope}, cache_timeout())
+    else:
+        scope = _resolve(user)
+
+    user._access_scope = scope
+    return scope
+
+
+def invalidate_user(user_id):
+    cache.delete(_user_key(user_id))
+
+
+def invalidate_blocks(block_ids):
+    """Farmers joined or left these blocks; drop the scopes built on them."""
+    block_ids = {pk for pk in block_ids if pk}
+    # After commit, so a registration does not hold the block's cache row
+    transaction.on_commit(lambda: _bump_blocks(block_ids))
+
+
+def _bump_blocks(block_ids):
+    for block_id in block_ids:
+        key = _block_version_key(block_id)
+        if cache.add(key, 1, timeout=None):
+            continue
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, 1, timeout=None)
+
+
+class ScopedQuerysetMixin:
+    """
+    Limits a view's rows to the requesting user's scope. ``scope_fields``
+    maps 'block', 'section' and/or 'farmer' to the model's FK columns;
+    ``scope_level`` is 'block' or 'section'.
+    """
+    scope_fields = {'block': 'block_id'}
+    scope_level = 'block'
+
+    def get_scope(self):
+        return scope_for(self.request.user)
+
+    def scope_queryset(self, queryset):
+        return self.get_scope().filter(queryset, level=self.scope_level, **self.scope_fields)
+
+    def in_scope(self, obj):
+        values = {f'{name}_id': getattr(obj, field) for name, field in self.scope_fields.items()}
+        return self.get_scope().permits(level=self.scope_level, **values)
+
+    def scope_error_response(self):
+        """400 response for a block chair without the assignment the view needs."""
+        error = self.get_scope().error(self.scope_level)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        return None
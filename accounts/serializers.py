@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import authenticate
 from .models import CustomUser
 from farmers.serializers import BlockSerializer, SectionSerializer
+from limphasaScheme.fieldsets import SparseFieldsetMixin
 
 
 class RegisterUserSerializer(serializers.ModelSerializer):
@@ -24,7 +25,7 @@ class RegisterUserSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     block = BlockSerializer(read_only=True)
     section = SectionSerializer(read_only=True)
 
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import CustomUser
+from . import scopes
+
+SCOPE_FIELDS = {'role', 'block', 'block_id', 'section', 'section_id'}
+
+
+# -------------------
+# Access scope invalidation
+# -------------------
+@receiver(post_save, sender=CustomUser)
+def user_scope_changed(sender, instance, update_fields=None, **kwargs):
+    # e.g. login only saves last_login
+    if update_fields is not None and not SCOPE_FIELDS.intersection(update_fields):
+        return
+    scopes.invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    scopes.invalidate_user(instance.pk)
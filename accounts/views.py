@@ -1,3 +1,5 @@
+import logging
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
@@ -14,31 +16,43 @@ from .serializers import (
 )
 
 from farmers.models import Block, Section  # From farmers app
+from farmers.reference import reference_data, reference_response
+from limphasaScheme.fieldsets import Fieldset, select_related_for
+from limphasaScheme.pagination import KeysetPagination
+
+logger = logging.getLogger(__name__)
+
+
+# Nested objects of a user profile and the relations each one reads
+USER_RELATIONS = {
+    'block': ['block'],
+    'section': ['section__block'],
+}
 
 
 class RegisterAPIView(APIView):
     def post(self, request):
-        print("🔧 Register request received:", request.data)
+        logger.debug("Register request for %s", request.data.get("username"))
         serializer = RegisterUserSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            print("✅ Registration successful for user:", user.username)
+            logger.info("Registered user %s, awaiting approval", user.username)
             return Response(
                 {'message': 'Registration successful. Waiting for admin approval.'},
                 status=status.HTTP_201_CREATED
             )
-        print("❌ Registration errors:", serializer.errors)
+        logger.debug("Registration rejected: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class LoginAPIView(APIView):
     def post(self, request):
-        print("🔐 Login attempt for:", request.data.get("username"))
+        logger.debug("Login attempt for %s", request.data.get("username"))
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data
             refresh = RefreshToken.for_user(user)
-            print(f"✅ Login successful: {user.username}, Token issued.")
+            logger.info("Login succeeded for %s", user.username)
             return Response({
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -53,7 +67,7 @@ class LoginAPIView(APIView):
                     'section': user.section_id
                 }
             })
-        print("❌ Login failed:", serializer.errors)
+        logger.warning("Login failed for %s", request.data.get("username"))
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -61,8 +75,7 @@ class UserProfileAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        print(f"👤 Profile requested for: {request.user.username}")
-        serializer = UserProfileSerializer(request.user)
+        serializer = UserProfileSerializer(request.user, fieldset=Fieldset.from_request(request))
         return Response(serializer.data)
 
 
@@ -70,23 +83,26 @@ class UserListAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        print(f"📋 Admin user list requested by: {request.user.username}")
-        users = CustomUser.objects.all().order_by('-date_joined')
-        serializer = UserProfileSerializer(users, many=True)
-        return Response(serializer.data)
+        fieldset = Fieldset.from_request(request)
+        users = select_related_for(CustomUser.objects.all(), fieldset, USER_RELATIONS)
+        paginator = KeysetPagination(ordering=('-date_joined',))
+        page = paginator.paginate_queryset(users, request, view=self)
+        serializer = UserProfileSerializer(page, many=True, fieldset=fieldset)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class UserDetailAPIView(APIView):
     permission_classes = [IsAdminUser]
 
     def get_user(self, pk):
-        print(f"🔍 Fetching user with ID: {pk}")
         return get_object_or_404(CustomUser, pk=pk)
 
     def get(self, request, pk):
-        user = self.get_user(pk)
-        print(f"📄 Detail view for user: {user.username}")
-        serializer = UserProfileSerializer(user)
+        fieldset = Fieldset.from_request(request)
+        user = get_object_or_404(
+            select_related_for(CustomUser.objects.all(), fieldset, USER_RELATIONS), pk=pk
+        )
+        serializer = UserProfileSerializer(user, fieldset=fieldset)
         return Response(serializer.data)
 
     def patch(self, request, pk):
@@ -94,7 +110,7 @@ class UserDetailAPIView(APIView):
         data = request.data.copy()
         role = data.get("role", user.role)
 
-        print(f"✏️ Admin updating user: {user.username} with data: {data}")
+        logger.debug("User %s updating %s: fields %s", request.user.username, user.username, sorted(data))
 
         if role == "block_chair":
             block_id = data.get("block")
@@ -106,16 +122,19 @@ class UserDetailAPIView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
+            snapshot = reference_data.snapshot()
             try:
-                block = Block.objects.get(id=block_id)
-                section = Section.objects.get(id=section_id)
-                data["block"] = block.id
-                data["section"] = section.id
-            except (Block.DoesNotExist, Section.DoesNotExist):
+                block = snapshot.get(Block, int(block_id))
+                section = snapshot.get(Section, int(section_id))
+            except (TypeError, ValueError):
+                block = section = None
+            if block is None or section is None:
                 return Response(
                     {"detail": "Invalid block or section ID."},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            data["block"] = block['id']
+            data["section"] = section['id']
         else:
             data["block"] = None
             data["section"] = None
@@ -128,9 +147,9 @@ class UserDetailAPIView(APIView):
         )
         if serializer.is_valid():
             serializer.save()
-            print(f"✅ Update successful for user: {user.username}")
+            logger.info("User %s updated by %s", user.username, request.user.username)
             return Response(serializer.data)
-        print(f"❌ Update errors for user {user.username}: {serializer.errors}")
+        logger.debug("Update of user %s rejected: %s", user.username, serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -143,6 +162,9 @@ class FilteredSectionAPIView(APIView):
         if not block_id:
             return Response({"error": "block_id is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        sections = Section.objects.filter(block_id=block_id)
-        section_data = [{"id": s.id, "name": s.name} for s in sections]
-        return Response(section_data)
+        snapshot = reference_data.snapshot()
+        section_data = [
+            {"id": s['id'], "name": s['name']}
+            for s in snapshot.sections_for_block(block_id)
+        ]
+        return reference_response(request, snapshot, f"filtered-sections-{block_id}", section_data)
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 14:14
+
+import limphasaScheme.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_alter_attendance_block_alter_attendance_section'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attendance',
+            name='evidence',
+            field=models.ImageField(blank=True, null=True, storage=limphasaScheme.storage.blob_storage, upload_to='attendance_evidence/'),
+        ),
+    ]
@@ -0,0 +1,157 @@
+import django.db.models.deletion
+import limphasaScheme.storage
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import migrations, models
+
+# Columns of the old attendance table that describe the event, not the farmer.
+# EVENT_FIELDS identify the session; the rest are taken from its first row.
+EVENT_FIELDS = ('date', 'attendance_type', 'block_id', 'section_id')
+SESSION_FIELDS = EVENT_FIELDS + ('time', 'recorded_by_id', 'duration_minutes')
+MARK_FIELDS = ('farmer_id', 'status', 'comment', 'penalty_points', 'evidence')
+
+CREATE_VIEW = """
+CREATE VIEW attendance_attendance AS
+SELECT m.id, m.session_id, m.farmer_id, s.block_id, s.section_id, s.date, s.time,
+       s.attendance_type, m.status, s.recorded_by_id, m.comment, m.penalty_points,
+       m.evidence, s.duration_minutes
+FROM attendance_attendancemark m
+JOIN attendance_attendancesession s ON s.id = m.session_id
+"""
+
+DROP_VIEW = "DROP VIEW attendance_attendance"
+
+BATCH_SIZE = 2000
+
+
+def _reset_sequences(schema_editor, *models):
+    with schema_editor.connection.cursor() as cursor:
+        for sql in schema_editor.connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def pack_sessions(apps, schema_editor):
+    """One session per event; each old row becomes a mark with the same id."""
+    Attendance = apps.get_model('attendance', 'Attendance')
+    AttendanceSession = apps.get_model('attendance', 'AttendanceSession')
+    AttendanceMark = apps.get_model('attendance', 'AttendanceMark')
+
+    sessions = {}
+    marks = []
+    rows = Attendance.objects.order_by('id').values_list('id', *SESSION_FIELDS, *MARK_FIELDS)
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        pk, fields, mark = row[0], row[1:1 + len(SESSION_FIELDS)], row[1 + len(SESSION_FIELDS):]
+        event = fields[:len(EVENT_FIELDS)]
+        session_id = sessions.get(event)
+        if session_id is None:
+            session_id = sessions[event] = AttendanceSession.objects.create(
+                **dict(zip(SESSION_FIELDS, fields))
+            ).pk
+        marks.append(AttendanceMark(pk=pk, session_id=session_id, **dict(zip(MARK_FIELDS, mark))))
+        if len(marks) >= BATCH_SIZE:
+            AttendanceMark.objects.bulk_create(marks)
+            marks = []
+    AttendanceMark.objects.bulk_create(marks)
+    _reset_sequences(schema_editor, AttendanceMark)
+
+
+def unpack_sessions(apps, schema_editor):
+    Attendance = apps.get_model('attendance', 'Attendance')
+    AttendanceMark = apps.get_model('attendance', 'AttendanceMark')
+
+    rows = []
+    marks = AttendanceMark.objects.order_by('id').values_list(
+        'id', *(f'session__{name}' for name in SESSION_FIELDS), *MARK_FIELDS
+    )
+    for row in marks.iterator(chunk_size=BATCH_SIZE):
+        values = dict(zip(('id', *SESSION_FIELDS, *MARK_FIELDS), row))
+        rows.append(Attendance(**values))
+        if len(rows) >= BATCH_SIZE:
+            Attendance.objects.bulk_create(rows)
+            rows = []
+    Attendance.objects.bulk_create(rows)
+    _reset_sequences(schema_editor, Attendance)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_media_blob_storage'),
+        ('farmers', '0008_media_blob_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('time', models.TimeField(blank=True, null=True)),
+                ('attendance_type', models.CharField(choices=[('general_assembly', 'General Assembly'), ('main_canal_cleaning', 'Main Canal Cleaning'), ('block_canal_cleaning', 'Block Canal Cleaning'), ('training', 'Training Session'), ('field_inspection', 'Field Inspection')], max_length=50)),
+                ('duration_minutes', models.PositiveIntegerField(default=0, help_text='Duration of attendance in minutes')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('block', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='farmers.block')),
+                ('recorded_by', models.ForeignKey(limit_choices_to={'role__in': ['block_chair', 'admin']}, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('section', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='farmers.section')),
+            ],
+            options={
+                'verbose_name': 'Attendance Session',
+                'verbose_name_plural': 'Attendance Sessions',
+                'indexes': [
+                    models.Index(fields=['date', 'attendance_type'], name='session_date_type_idx'),
+                    models.Index(fields=['block', 'date'], name='session_block_date_idx'),
+                    models.Index(fields=['section', 'date'], name='session_section_date_idx'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='AttendanceMark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('present', 'Present'), ('absent', 'Absent'), ('late', 'Late'), ('excused', 'Excused (With Reason)')], max_length=10)),
+                ('comment', models.TextField(blank=True, null=True)),
+                ('penalty_points', models.IntegerField(default=0)),
+                ('evidence', models.ImageField(blank=True, null=True, storage=limphasaScheme.storage.blob_storage, upload_to='attendance_evidence/')),
+                ('farmer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_marks', to='farmers.farmer')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='marks', to='attendance.attendancesession')),
+            ],
+            options={
+                'verbose_name': 'Attendance Mark',
+                'verbose_name_plural': 'Attendance Marks',
+                'constraints': [
+                    models.UniqueConstraint(fields=('session', 'farmer'), name='mark_session_farmer_unique'),
+                ],
+            },
+        ),
+        migrations.RunPython(pack_sessions, unpack_sessions),
+        migrations.DeleteModel(
+            name='Attendance',
+        ),
+        migrations.CreateModel(
+            name='Attendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('time', models.TimeField(blank=True, null=True)),
+                ('attendance_type', models.CharField(choices=[('general_assembly', 'General Assembly'), ('main_canal_cleaning', 'Main Canal Cleaning'), ('block_canal_cleaning', 'Block Canal Cleaning'), ('training', 'Training Session'), ('field_inspection', 'Field Inspection')], max_length=50)),
+                ('status', models.CharField(choices=[('present', 'Present'), ('absent', 'Absent'), ('late', 'Late'), ('excused', 'Excused (With Reason)')], max_length=10)),
+                ('comment', models.TextField(blank=True, null=True)),
+                ('penalty_points', models.IntegerField(default=0)),
+                ('evidence', models.ImageField(blank=True, null=True, storage=limphasaScheme.storage.blob_storage, upload_to='attendance_evidence/')),
+                ('duration_minutes', models.PositiveIntegerField(default=0, help_text='Duration of attendance in minutes')),
+                ('block', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='farmers.block')),
+                ('farmer', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='attendances', to='farmers.farmer')),
+                ('recorded_by', models.ForeignKey(limit_choices_to={'role__in': ['block_chair', 'admin']}, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('section', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='farmers.section')),
+                ('session', models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='attendance.attendancesession')),
+            ],
+            options={
+                'verbose_name_plural': 'Attendance Records',
+                'db_table': 'attendance_attendance',
+                'managed': False,
+                'unique_together': {('farmer', 'date', 'attendance_type')},
+            },
+        ),
+        migrations.RunSQL(CREATE_VIEW, DROP_VIEW),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2 on 2026-10-18 14:47
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+
+EVENT_FIELDS = ('date', 'attendance_type', 'block_id', 'section_id')
+
+# The attendance_attendance view (0006) is dropped while the session table
+# is altered; SQLite rebuilds the table and will not drop one a view uses.
+CREATE_VIEW = """
+CREATE VIEW attendance_attendance AS
+SELECT m.id, m.session_id, m.farmer_id, s.block_id, s.section_id, s.date, s.time,
+       s.attendance_type, m.status, s.recorded_by_id, m.comment, m.penalty_points,
+       m.evidence, s.duration_minutes
+FROM attendance_attendancemark m
+JOIN attendance_attendancesession s ON s.id = m.session_id
+"""
+
+DROP_VIEW = "DROP VIEW attendance_attendance"
+
+
+def merge_sessions(apps, schema_editor):
+    """
+    Fold sessions that share an event into the oldest, which keeps its time,
+    recorder and duration. A farmer marked at more than one of them keeps
+    their latest mark.
+    """
+    AttendanceSession = apps.get_model('attendance', 'AttendanceSession')
+    AttendanceMark = apps.get_model('attendance', 'AttendanceMark')
+
+    duplicated = AttendanceSession.objects.values(*EVENT_FIELDS).annotate(
+        keep=Min('id'), sessions=Count('id')
+    ).filter(sessions__gt=1).order_by()
+    for event in list(duplicated):
+        keep = event.pop('keep')
+        event.pop('sessions')
+        sessions = AttendanceSession.objects.filter(**event)
+        marks = AttendanceMark.objects.filter(session__in=sessions)
+        latest = marks.values('farmer_id').annotate(latest=Max('id')).values('latest')
+        marks.exclude(pk__in=latest).delete()
+        marks.exclude(session_id=keep).update(session_id=keep)
+        sessions.exclude(pk=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_attendance_sessions'),
+        # Deleting duplicate marks clears the ledger entries' links to them
+        ('discipline', '0005_penalty_ledger'),
+        ('farmers', '0008_media_blob_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_sessions, migrations.RunPython.noop),
+        migrations.RunSQL(DROP_VIEW, CREATE_VIEW),
+        migrations.AddConstraint(
+            model_name='attendancesession',
+            constraint=models.UniqueConstraint(fields=('date', 'attendance_type', 'block', 'section'), name='session_event_unique', nulls_distinct=False),
+        ),
+        migrations.RunSQL(CREATE_VIEW, DROP_VIEW),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 15:01
+
+from importlib import import_module
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+# 0007's nulls_distinct=False constraint is skipped below PostgreSQL 15 (and
+# on SQLite), so scheme-wide sessions may have been split since then
+previous = import_module('attendance.migrations.0007_session_event_unique')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0007_session_event_unique'),
+        ('discipline', '0005_penalty_ledger'),
+        ('farmers', '0008_media_blob_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(previous.merge_sessions, migrations.RunPython.noop),
+        # SQLite rebuilds the table to drop the old constraint (see 0007)
+        migrations.RunSQL(previous.DROP_VIEW, previous.CREATE_VIEW),
+        migrations.RemoveConstraint(
+            model_name='attendancesession',
+            name='session_event_unique',
+        ),
+        migrations.AddConstraint(
+            model_name='attendancesession',
+            constraint=models.UniqueConstraint(models.F('date'), models.F('attendance_type'), django.db.models.functions.comparison.Coalesce('block', 0, output_field=models.BigIntegerField()), django.db.models.functions.comparison.Coalesce('section', 0, output_field=models.BigIntegerField()), name='session_event_unique'),
+        ),
+        migrations.RunSQL(previous.CREATE_VIEW, previous.DROP_VIEW),
+    ]
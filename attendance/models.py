@@ -1,10 +1,21 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Coalesce
 from farmers.models import Farmer, Block, Section
+from limphasaScheme.storage import blob_storage
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
-class Attendance(models.Model):
+
+# -------------------
+# Attendance Session Model
+# -------------------
+class AttendanceSession(models.Model):
+    """
+    One attendance event: a date, a type and the block/section it was for.
+    Who recorded it, the time and the duration are stored here once, not
+    on every farmer's row (see AttendanceMark).
+    """
     ATTENDANCE_TYPES = [
         ("general_assembly", "General Assembly"),
         ("main_canal_cleaning", "Main Canal Cleaning"),
@@ -13,6 +24,72 @@ class Attendance(models.Model):
         ("field_inspection", "Field Inspection"),
     ]
 
+    date = models.DateField()
+    time = models.TimeField(null=True, blank=True)
+    attendance_type = models.CharField(max_length=50, choices=ATTENDANCE_TYPES)
+    block = models.ForeignKey(Block, on_delete=models.SET_NULL, null=True, blank=True)
+    section = models.ForeignKey(Section, on_delete=models.SET_NULL, null=True, blank=True)
+    recorded_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        limit_choices_to={'role__in': ['block_chair', 'admin']}
+    )
+    duration_minutes = models.PositiveIntegerField(default=0, help_text="Duration of attendance in minutes")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Attendance Session"
+        verbose_name_plural = "Attendance Sessions"
+        indexes = [
+            models.Index(fields=['date', 'attendance_type'], name='session_date_type_idx'),
+            models.Index(fields=['block', 'date'], name='session_block_date_idx'),
+            models.Index(fields=['section', 'date'], name='session_section_date_idx'),
+        ]
+        constraints = [
+            # One session per event, including scheme-wide (no block) ones.
+            # Coalesce, not nulls_distinct (PostgreSQL 15+ only), so that
+            # holds on every backend.
+            models.UniqueConstraint(
+                'date', 'attendance_type',
+                Coalesce('block', 0, output_field=models.BigIntegerField()),
+                Coalesce('section', 0, output_field=models.BigIntegerField()),
+                name='session_event_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_attendance_type_display()} - {self.date}"
+
+    @classmethod
+    def for_event(cls, date, attendance_type, block_id=None, section_id=None, **defaults):
+        """The session for this event, created with ``defaults`` if there is none."""
+        sessions = cls.objects.filter(
+            date=date, attendance_type=attendance_type, block_id=block_id, section_id=section_id
+        ).order_by('id')
+        session = sessions.first()
+        if session is None:
+            try:
+                with transaction.atomic():
+                    session = cls.objects.create(
+                        date=date, attendance_type=attendance_type,
+                        block_id=block_id, section_id=section_id, **defaults
+                    )
+            except IntegrityError:
+                # Another writer created it first (session_event_unique)
+                session = sessions.first()
+        return session
+
+
+# -------------------
+# Attendance Mark Model
+# -------------------
+class AttendanceMark(models.Model):
+    """
+    One farmer's status at a session, plus the rare per-farmer extras.
+    Changes to ``penalty_points`` are posted to the penalty ledger
+    (discipline.penalties); a farmer's total lives there, not here.
+    """
     STATUS_CHOICES = [
         ("present", "Present"),
         ("absent", "Absent"),
@@ -20,32 +97,106 @@ class Attendance(models.Model):
         ("excused", "Excused (With Reason)"),
     ]
 
-    farmer = models.ForeignKey(Farmer, on_delete=models.CASCADE, related_name='attendances')
-    
-    # ✅ Make block and section optional to avoid IntegrityError
-    block = models.ForeignKey(Block, on_delete=models.SET_NULL, null=True, blank=True)
-    section = models.ForeignKey(Section, on_delete=models.SET_NULL, null=True, blank=True)
-    
+    session = models.ForeignKey(AttendanceSession, on_delete=models.CASCADE, related_name='marks')
+    farmer = models.ForeignKey(Farmer, on_delete=models.CASCADE, related_name='attendance_marks')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    comment = models.TextField(blank=True, null=True)
+    penalty_points = models.IntegerField(default=0)
+    evidence = models.ImageField(upload_to='attendance_evidence/', storage=blob_storage, blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Attendance Mark"
+        verbose_name_plural = "Attendance Marks"
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'farmer'], name='mark_session_farmer_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.farmer} - {self.session} - {self.status}"
+
+
+# -------------------
+# Attendance (compatibility view)
+# -------------------
+class Attendance(models.Model):
+    """
+    One farmer's attendance with its session's details, in the shape the
+    API has always returned. ``attendance_attendance`` is a database view
+    joining AttendanceMark to AttendanceSession (migration 0006), so reads
+    and filters work as before. ``save()`` and ``delete()`` write through to
+    the two tables; bulk writes (queryset ``update()``/``delete()``,
+    ``bulk_create``) must target AttendanceMark/AttendanceSession instead.
+    """
+    ATTENDANCE_TYPES = AttendanceSession.ATTENDANCE_TYPES
+    STATUS_CHOICES = AttendanceMark.STATUS_CHOICES
+
+    session = models.ForeignKey(
+        AttendanceSession, on_delete=models.DO_NOTHING, null=True, editable=False, related_name='+'
+    )
+    farmer = models.ForeignKey(Farmer, on_delete=models.DO_NOTHING, related_name='attendances')
+    block = models.ForeignKey(Block, on_delete=models.DO_NOTHING, null=True, blank=True, related_name='+')
+    section = models.ForeignKey(Section, on_delete=models.DO_NOTHING, null=True, blank=True, related_name='+')
+
     date = models.DateField()
     time = models.TimeField(null=True, blank=True)
     attendance_type = models.CharField(max_length=50, choices=ATTENDANCE_TYPES)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES)
 
     recorded_by = models.ForeignKey(
-        User, 
-        on_delete=models.SET_NULL, 
-        null=True, 
+        User,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        related_name='+',
         limit_choices_to={'role__in': ['block_chair', 'admin']}
     )
 
     comment = models.TextField(blank=True, null=True)
     penalty_points = models.IntegerField(default=0)
-    evidence = models.ImageField(upload_to='attendance_evidence/', blank=True, null=True)
+    evidence = models.ImageField(upload_to='attendance_evidence/', storage=blob_storage, blank=True, null=True)
     duration_minutes = models.PositiveIntegerField(default=0, help_text="Duration of attendance in minutes")
 
     class Meta:
+        managed = False
+        db_table = 'attendance_attendance'
         unique_together = ['farmer', 'date', 'attendance_type']
         verbose_name_plural = "Attendance Records"
 
     def __str__(self):
         return f"{self.farmer} - {self.date} - {self.get_attendance_type_display()}"
+
+    def save(self, *args, **kwargs):
+        """
+        Store the mark under the session for this date, type, block and
+        section. The session is created (with this row's time, recorder and
+        duration) when it does not exist yet.
+        """
+        with transaction.atomic():
+            session = AttendanceSession.for_event(
+                self.date, self.attendance_type, self.block_id, self.section_id,
+                time=self.time, recorded_by_id=self.recorded_by_id,
+                duration_minutes=self.duration_minutes,
+            )
+            mark = AttendanceMark(pk=self.pk) if self.pk else AttendanceMark()
+            mark.session = session
+            mark.farmer_id = self.farmer_id
+            mark.status = self.status
+            mark.comment = self.comment
+            mark.penalty_points = self.penalty_points
+            mark.evidence = self.evidence
+            mark.save(force_insert=self.pk is None)
+
+        self.pk = mark.pk
+        self.session = session
+        self.time = session.time
+        self.recorded_by_id = session.recorded_by_id
+        self.duration_minutes = session.duration_minutes
+        self.evidence = mark.evidence
+        self._state.adding = False
+        self._state.db = mark._state.db
+
+    save.alters_data = True
+
+    def delete(self, *args, **kwargs):
+        return AttendanceMark.objects.filter(pk=self.pk).delete()
+
+    delete.alters_data = True
@@ -0,0 +1,283 @@
+"""
+Attendance rates per farmer, section and block over a window of days.
+
+A farmer is expected at every session held in the window for their block
+(block-wide, or for their own section) and at scheme-wide sessions (no
+block), from the day they registered. Sessions they were marked at
+elsewhere, e.g. before moving block, count as expected too. Present and
+late count as attended; an excused mark takes the session out of the
+expected count. Section and block rates pool their farmers' counts.
+
+Each block is computed with three queries: its sessions, its active
+farmers and one grouped count of their marks. The result is cached per
+block, window and day. Attendance, session and farmer writes bump the
+version of the blocks they touch when they commit (attendance.signals), so
+only those blocks are recomputed on the next read. The scheme-wide figures
+are summed from the cached blocks. Versions live in the shared cache
+(settings.CACHES), so bumps from management commands reach the web
+workers; writes that skip signals show up after
+``ATTENDANCE_RATE_CACHE_TIMEOUT`` at the latest.
+"""
+from bisect import bisect_left
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from farmers.models import Block, Farmer, Section
+from farmers.reference import reference_data
+from .models import AttendanceMark, AttendanceSession
+
+DEFAULT_WINDOWS = {'30d': 30, '90d': 90, '365d': 365}
+DEFAULT_WINDOW = '90d'
+DEFAULT_CACHE_TIMEOUT = 3600  # seconds
+
+ATTENDED = ('present', 'late')
+
+
+def windows():
+    """Window name -> number of days, ending today."""
+    return getattr(settings, 'ATTENDANCE_RATE_WINDOWS', DEFAULT_WINDOWS)
+
+
+def default_window():
+    return getattr(settings, 'ATTENDANCE_RATE_DEFAULT_WINDOW', DEFAULT_WINDOW)
+
+
+def cache_timeout():
+    return getattr(settings, 'ATTENDANCE_RATE_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT)
+
+
+def window_dates(window, as_of=None):
+    as_of = as_of or timezone.localdate()
+    return as_of - timedelta(days=windows()[window] - 1), as_of
+
+
+def rate(expected, attended):
+    """Percentage to one decimal place; None when nothing was expected."""
+    return round(attended / expected * 100, 1) if expected else None
+
+
+def _counts(expected=0, attended=0, excused=0, farmers=0):
+    return {'farmers': farmers, 'expected': expected, 'attended': attended, 'excused': excused}
+
+
+def _add(totals, counts):
+    for name in ('farmers', 'expected', 'attended', 'excused'):
+        totals[name] += counts[name]
+
+
+def _with_rate(counts):
+    return {**counts, 'rate': rate(counts['expected'], counts['attended'])}
+
+
+def _farmer_row(counts):
+    return _with_rate({
+        name: counts[name] for name in ('section_id', 'expected', 'attended', 'excused')
+    })
+
+
+# -------------------
+# Computation
+# -------------------
+def _session_dates(block_id, date_from, date_to):
+    """Sorted session dates per section ID, block-wide/scheme-wide under None."""
+    sessions = AttendanceSession.objects.filter(
+        Q(block_id=block_id) | Q(block__isnull=True), date__range=(date_from, date_to)
+    ).values_list('date', 'block_id', 'section_id')
+    dates = {}
+    for day, session_block, section_id in sessions:
+        dates.setdefault(section_id if session_block else None, []).append(day)
+    for days in dates.values():
+        days.sort()
+    return dates
+
+
+def _mark_counts(block_id, date_from, date_to):
+    """Per farmer: attended, excused and marks at sessions not held for them."""
+    held_for_farmer = (
+        (
+            Q(session__block__isnull=True)
+            | Q(session__block_id=F('farmer__block_id'), session__section__isnull=True)
+            | Q(session__section_id=F('farmer__section_id'))
+        )
+        & Q(session__date__gte=TruncDate('farmer__date_registered'))
+    )
+    marks = AttendanceMark.objects.filter(
+        farmer__block_id=block_id, farmer__is_active=True,
+        session__date__range=(date_from, date_to),
+    ).values('farmer_id').annotate(
+        attended=Count('id', filter=Q(status__in=ATTENDED)),
+        excused=Count('id', filter=Q(status='excused')),
+        elsewhere=Sum(Case(When(held_for_farmer, then=Value(0)), default=Value(1), output_field=IntegerField())),
+    ).order_by()
+    return {row['farmer_id']: row for row in marks}
+
+
+def compute_block(block_id, window, as_of=None):
+    """
+    Rates for one block: ``farmers`` maps farmer ID to its counts (with
+    ``section_id``), ``sections`` maps section ID to pooled counts, and
+    ``totals`` pools the whole block.
+    """
+    date_from, date_to = window_dates(window, as_of)
+    dates = _session_dates(block_id, date_from, date_to)
+    marks = _mark_counts(block_id, date_from, date_to)
+    farmers = Farmer.objects.filter(block_id=block_id, is_active=True).values_list(
+        'id', 'section_id', 'date_registered'
+    )
+
+    result = {'farmers': {}, 'sections': {}, 'totals': _counts()}
+    for farmer_id, section_id, registered in farmers:
+        registered = timezone.localdate(registered)
+        held = 0
+        for days in (dates.get(None, ()), dates.get(section_id, ())):
+            held += len(days) - bisect_left(days, registered)
+        row = marks.get(farmer_id, {})
+        excused = row.get('excused', 0)
+        counts = _counts(
+            expected=max(held + row.get('elsewhere', 0) - excused, 0),
+            attended=row.get('attended', 0),
+            excused=excused,
+            farmers=1,
+        )
+        result['farmers'][farmer_id] = {'section_id': section_id, **counts}
+        _add(result['sections'].setdefault(section_id, _counts()), counts)
+        _add(result['totals'], counts)
+    return result
+
+
+# -------------------
+# Cache
+# -------------------
+def _version_key(scope):
+    return f'attendance-rates:version:{scope}'
+
+
+def _block_keys(block_ids, window, as_of):
+    scopes = ['all'] + [f'block:{pk}' for pk in block_ids]
+    versions = cache.get_many([_version_key(scope) for scope in scopes])
+    shared = versions.get(_version_key('all'), 0)
+    return {
+        pk: 'attendance-rates:block:{}:{}:{}:{}:{}'.format(
+            pk, window, as_of.isoformat(), shared, versions.get(_version_key(f'block:{pk}'), 0)
+        )
+        for pk in block_ids
+    }
+
+
+def block_rates(block_ids, window, as_of=None):
+    """``compute_block`` for each block, recomputing only those not cached."""
+    as_of = as_of or timezone.localdate()
+    keys = _block_keys(block_ids, window, as_of)
+    cached = cache.get_many(list(keys.values()))
+    results = {}
+    for pk, key in keys.items():
+        if key in cached:
+            results[pk] = cached[key]
+        else:
+            results[pk] = compute_block(pk, window, as_of)
+            cache.set(key, results[pk], cache_timeout())
+    return results
+
+
+def _bump(scope):
+    # After commit, so writers do not hold the version's cache row until then
+    transaction.on_commit(lambda: _bump_now(scope))
+
+
+def _bump_now(scope):
+    key = _version_key(scope)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def invalidate(block_ids=()):
+    for block_id in {pk for pk in block_ids if pk}:
+        _bump(f'block:{block_id}')
+
+
+def invalidate_all():
+    """A scheme-wide session changed: every farmer is expected at it."""
+    _bump('all')
+
+
+# -------------------
+# Reports
+# -------------------
+def get_rates(window=None, block_id=None, section_id=None):
+    """
+    Rates for the scheme (per block) or one block (per section), with the
+    farmer rows when ``section_id`` narrows it to one section.
+    """
+    window = window or default_window()
+    as_of = timezone.localdate()
+    date_from, date_to = window_dates(window, as_of)
+    snapshot = reference_data.snapshot()
+    block_ids = [block_id] if block_id else [block['id'] for block in snapshot.blocks]
+    blocks = block_rates(block_ids, window, as_of)
+
+    report = {
+        'window': window,
+        'date_from': date_from,
+        'date_to': date_to,
+        'block_id': block_id,
+        'section_id': section_id,
+    }
+    totals = _counts()
+    if block_id is None:
+        report['blocks'] = []
+        for pk, result in blocks.items():
+            block = snapshot.get(Block, pk)
+            report['blocks'].append({
+                'block_id': pk, 'block_name': block['name'] if block else None,
+                **_with_rate(result['totals']),
+            })
+            _add(totals, result['totals'])
+        report['blocks'].sort(key=lambda row: row['block_name'] or '')
+    else:
+        result = blocks[block_id]
+        sections = result['sections']
+        if section_id is not None:
+            sections = {section_id: sections.get(section_id, _counts())}
+        report['sections'] = []
+        for pk, counts in sections.items():
+            section = snapshot.get(Section, pk)
+            report['sections'].append({
+                'section_id': pk, 'section_name': section['name'] if section else None,
+                **_with_rate(counts),
+            })
+            _add(totals, counts)
+        report['sections'].sort(key=lambda row: row['section_name'] or '')
+        if section_id is not None:
+            report['farmers'] = [
+                {'farmer': pk, **_farmer_row(row)}
+                for pk, row in sorted(result['farmers'].items())
+                if row['section_id'] == section_id
+            ]
+    report['totals'] = _with_rate(totals)
+    return report
+
+
+def farmer_rates(farmer, window=None):
+    """One farmer's rate, read from their block's cached result."""
+    window = window or default_window()
+    as_of = timezone.localdate()
+    date_from, date_to = window_dates(window, as_of)
+    result = block_rates([farmer.block_id], window, as_of)[farmer.block_id]
+    counts = result['farmers'].get(farmer.pk, {'section_id': farmer.section_id, **_counts()})
+    return {
+        'window': window,
+        'date_from': date_from,
+        'date_to': date_to,
+        'farmer': farmer.pk,
+        'block_id': farmer.block_id,
+        **_farmer_row(counts),
+    }
@@ -0,0 +1,102 @@
+"""
+Roll call: attendance for a whole block or section in one request.
+
+The event (date, type, block, section) is validated once and the farmer
+IDs are checked against the roster, read with a single query. The event's
+AttendanceSession is fetched or created, and every farmer's mark is
+written with one ``bulk_create(update_conflicts=True)`` on the
+(session, farmer) unique constraint, so marking a farmer twice updates
+their status instead of failing. It all happens in one transaction.
+"""
+from collections import Counter
+
+from django.db import transaction
+
+from farmers.dashboard import mark_dirty
+from farmers.models import Farmer
+from . import rates
+from .models import AttendanceMark, AttendanceSession
+
+UNIQUE_FIELDS = ['session', 'farmer']
+UPDATE_FIELDS = ['status']
+
+
+class RosterError(Exception):
+    """Some farmer IDs are not active members of the roll call's block/section."""
+
+    def __init__(self, farmer_ids):
+        self.farmer_ids = sorted(farmer_ids)
+        super().__init__(f"Not on the roster: {self.farmer_ids}")
+
+
+def roster(block, section=None):
+    farmers = Farmer.objects.filter(block_id=block.pk, is_active=True)
+    if section is not None:
+        farmers = farmers.filter(section_id=section.pk)
+    return set(farmers.values_list('id', flat=True))
+
+
+def record_roll_call(data, user):
+    """
+    Upsert the roll call described by validated ``RollCallSerializer`` data.
+    Returns a summary; raises RosterError before writing anything.
+    """
+    block, section = data['block'], data.get('section')
+    members = roster(block, section)
+    statuses = dict(data['records'])
+    outsiders = set(statuses) - members
+    if outsiders:
+        raise RosterError(outsiders)
+    if data.get('default_status'):
+        for farmer_id in members - set(statuses):
+            statuses[farmer_id] = data['default_status']
+
+    comments = data.get('comments')
+    update_fields = UPDATE_FIELDS + (['comment'] if comments is not None else [])
+
+    with transaction.atomic():
+        session = AttendanceSession.for_event(
+            data['date'], data['attendance_type'], block.pk,
+            section.pk if section is not None else None,
+            time=data.get('time'),
+            recorded_by=user,
+            duration_minutes=data.get('duration_minutes', 0),
+        )
+        earlier = AttendanceMark.objects.filter(
+            farmer_id__in=list(statuses),
+            session__date=data['date'],
+            session__attendance_type=data['attendance_type'],
+        )
+        existing = earlier.count()
+        # A farmer has one mark per date and type; marks recorded under
+        # another block/section's session for this event move to this one
+        earlier.exclude(session=session).update(session=session)
+        rows = [
+            AttendanceMark(
+                session=session,
+                farmer_id=farmer_id,
+                status=status,
+                comment=(comments or {}).get(farmer_id),
+            )
+            for farmer_id, status in sorted(statuses.items())
+        ]
+        AttendanceMark.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=UNIQUE_FIELDS, update_fields=update_fields,
+        )
+    # bulk_create skips the post_save signals that normally do this
+    mark_dirty([block.pk])
+    rates.invalidate([block.pk])
+
+    return {
+        'session': session.pk,
+        'date': data['date'],
+        'attendance_type': data['attendance_type'],
+        'block': block.pk,
+        'section': section.pk if section is not None else None,
+        'roster': len(members),
+        'recorded': len(rows),
+        'created': len(rows) - existing,
+        'updated': existing,
+        'unmarked': len(members) - len(statuses),
+        'by_status': dict(Counter(statuses.values())),
+    }
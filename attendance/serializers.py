@@ -1,34 +1,34 @@
 from rest_framework import serializers
 from .models import Attendance
 from farmers.models import Block, Section
-from farmers.serializers import FarmerSerializer
+from farmers.serializers import FarmerSerializer, LeanFarmerSerializer, ReferenceRelatedField
+from limphasaScheme.fieldsets import SparseFieldsetMixin
+from limphasaScheme.lean import (
+    Field, LeanSerializer, Method, Nested, date_repr, file_url, time_repr, user_repr
+)
 
 
-class BlockSerializer(serializers.ModelSerializer):
+class BlockSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Block
         fields = ['id', 'name']
 
 
-class SectionSerializer(serializers.ModelSerializer):
+class SectionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Section
         fields = ['id', 'name']
 
 
-class AttendanceSerializer(serializers.ModelSerializer):
+class AttendanceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     farmer_details = FarmerSerializer(source='farmer', read_only=True)
     block_details = BlockSerializer(source='block', read_only=True)
     section_details = SectionSerializer(source='section', read_only=True)
     recorded_by = serializers.StringRelatedField(read_only=True)
 
     # Writeable fields for POST/PATCH
-    block = serializers.PrimaryKeyRelatedField(
-        queryset=Block.objects.all(), required=False, allow_null=True
-    )
-    section = serializers.PrimaryKeyRelatedField(
-        queryset=Section.objects.all(), required=False, allow_null=True
-    )
+    block = ReferenceRelatedField(Block, required=False, allow_null=True)
+    section = ReferenceRelatedField(Section, required=False, allow_null=True)
 
     class Meta:
         model = Attendance
@@ -49,3 +49,89 @@ class AttendanceSerializer(serializers.ModelSerializer):
             if not data.get("block") or not data.get("section"):
                 raise serializers.ValidationError("Block and section are required for block canal cleaning.")
         return data
+
+
+class LeanBlockSerializer(LeanSerializer):
+    fields = {'id': Field('id'), 'name': Field('name')}
+
+
+class LeanSectionSerializer(LeanSerializer):
+    fields = {'id': Field('id'), 'name': Field('name')}
+
+
+class LeanAttendanceSerializer(LeanSerializer):
+    """Read-only ``AttendanceSerializer`` output built from ``values()`` rows."""
+    fields = {
+        'id': Field('id'),
+        'farmer': Field('farmer'),
+        'farmer_details': Nested(LeanFarmerSerializer, 'farmer'),
+        'block': Field('block'),
+        'block_details': Nested(LeanBlockSerializer, 'block'),
+        'section': Field('section'),
+        'section_details': Nested(LeanSectionSerializer, 'section'),
+        'date': Field('date', date_repr),
+        'time': Field('time', time_repr),
+        'attendance_type': Field('attendance_type'),
+        'status': Field('status'),
+        'recorded_by': Method('get_recorded_by', 'recorded_by', 'recorded_by__first_name',
+                              'recorded_by__last_name', 'recorded_by__role'),
+        'comment': Field('comment'),
+        'penalty_points': Field('penalty_points'),
+        'evidence': Method('get_evidence', 'evidence'),
+        'duration_minutes': Field('duration_minutes'),
+    }
+    ordering_columns = ('id', 'date')
+    evidence_storage = Attendance._meta.get_field('evidence').storage
+
+    def get_recorded_by(self, row):
+        k = self.keys
+        if row[k['recorded_by']] is None:
+            return None
+        return user_repr(
+            row[k['recorded_by__first_name']], row[k['recorded_by__last_name']],
+            row[k['recorded_by__role']]
+        )
+
+    def get_evidence(self, row):
+        return file_url(self.evidence_storage, row[self.keys['evidence']], self.request)
+
+
+class RollCallSerializer(serializers.Serializer):
+    """
+    One attendance event for a block or section and a compact
+    ``{farmer_id: status}`` map (see attendance.rollcall).
+    """
+    date = serializers.DateField()
+    time = serializers.TimeField(required=False, allow_null=True)
+    attendance_type = serializers.ChoiceField(choices=Attendance.ATTENDANCE_TYPES)
+    block = ReferenceRelatedField(Block)
+    section = ReferenceRelatedField(Section, required=False, allow_null=True)
+    duration_minutes = serializers.IntegerField(required=False, min_value=0)
+    records = serializers.DictField(child=serializers.ChoiceField(choices=Attendance.STATUS_CHOICES))
+    comments = serializers.DictField(child=serializers.CharField(allow_blank=True), required=False)
+    # Status for roster farmers missing from records; unset leaves them unmarked
+    default_status = serializers.ChoiceField(choices=Attendance.STATUS_CHOICES, required=False)
+
+    max_records = 2000
+
+    def _farmer_ids(self, mapping, name):
+        try:
+            return {int(pk): value for pk, value in mapping.items()}
+        except (TypeError, ValueError):
+            raise serializers.ValidationError({name: "Keys must be farmer IDs."})
+
+    def validate(self, data):
+        section = data.get('section')
+        if section is not None and section.block_id != data['block'].pk:
+            raise serializers.ValidationError({'section': "Section does not belong to the selected block."})
+        if data['attendance_type'] == 'block_canal_cleaning' and section is None:
+            raise serializers.ValidationError("Block and section are required for block canal cleaning.")
+        data['records'] = self._farmer_ids(data['records'], 'records')
+        if len(data['records']) > self.max_records:
+            raise serializers.ValidationError({'records': f"At most {self.max_records} farmers per roll call."})
+        if 'comments' in data:
+            data['comments'] = self._farmer_ids(data['comments'], 'comments')
+            extra = set(data['comments']) - set(data['records'])
+            if extra:
+                raise serializers.ValidationError({'comments': f"No status given for farmers {sorted(extra)}."})
+        return data
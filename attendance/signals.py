@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from farmers.models import Farmer
+from . import rates
+from .models import AttendanceMark, AttendanceSession
+
+
+@receiver(post_save, sender=AttendanceSession)
+@receiver(post_delete, sender=AttendanceSession)
+def session_changed(sender, instance, **kwargs):
+    if instance.block_id:
+        rates.invalidate([instance.block_id])
+    else:
+        rates.invalidate_all()
+
+
+@receiver(post_save, sender=AttendanceMark)
+@receiver(post_delete, sender=AttendanceMark)
+def mark_changed(sender, instance, **kwargs):
+    block_id = Farmer.objects.filter(pk=instance.farmer_id).values_list('block_id', flat=True).first()
+    rates.invalidate([block_id, instance.session.block_id])
+
+
+@receiver(post_save, sender=Farmer)
+@receiver(post_delete, sender=Farmer)
+def farmer_changed(sender, instance, **kwargs):
+    rates.invalidate([instance.block_id, getattr(instance, '_previous_block_id', None)])
@@ -1,8 +1,10 @@
 from django.urls import path
 from .views import (
     AttendanceAPIView,
+    RollCallAPIView,
     BlockAttendanceView,
     AttendanceStatsView,
+    AttendanceRatesView,
     PenaltyResetView,
 )
 
@@ -10,12 +12,18 @@ urlpatterns = [
     # ✅ Main CRUD endpoint for attendance (GET, POST)
     path('', AttendanceAPIView.as_view(), name='attendance-list-create'),
 
+    # Whole-section roll call in one request
+    path('roll-call/', RollCallAPIView.as_view(), name='attendance-roll-call'),
+
     # ✅ View attendance for a specific block (with optional today filter)
     path('block/<int:block_id>/', BlockAttendanceView.as_view(), name='block-attendance'),
 
     # ✅ Analytics - Stats by block/status (present, absent, late, etc.)
     path('stats/', AttendanceStatsView.as_view(), name='attendance-stats'),
 
+    # Attendance rates per block, section or farmer over a window
+    path('rates/', AttendanceRatesView.as_view(), name='attendance-rates'),
+
     # ✅ Reset penalty points for a specific farmer (Admin only)
     path('penalties/reset/<int:farmer_id>/', PenaltyResetView.as_view(), name='reset-penalties'),
 ]
@@ -1,3 +1,5 @@
+import logging
+
 from django.db.models import Count, Q
 from datetime import date
 from rest_framework.views import APIView
@@ -5,12 +7,25 @@ from rest_framework.response import Response
 from rest_framework import permissions, status
 
 from .models import Attendance
-from .serializers import AttendanceSerializer
-from farmers.models import Block, Section
+from .serializers import AttendanceSerializer, LeanAttendanceSerializer, RollCallSerializer
+from .rollcall import RosterError, record_roll_call
+from . import rates
+from farmers.models import Block, Farmer, Section
+from farmers.reference import reference_data
+from limphasaScheme.fieldsets import Fieldset
+from limphasaScheme.pagination import KeysetPagination
+from accounts.scopes import ScopedQuerysetMixin
+from discipline import penalties
+
+logger = logging.getLogger(__name__)
+
+ATTENDANCE_ORDERING = ('-date',)
 
 
-class AttendanceAPIView(APIView):
+class AttendanceAPIView(ScopedQuerysetMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
+    scope_fields = {'block': 'block_id', 'section': 'section_id'}
+    scope_level = 'section'
 
     def get(self, request):
         user = request.user
@@ -18,17 +33,13 @@ class AttendanceAPIView(APIView):
         section_id = request.query_params.get('section')
         status_filter = request.query_params.get('status')
 
-        if user.role == 'admin':
-            queryset = Attendance.objects.all()
-        elif user.role == 'block_chair':
-            if not user.block or not user.section:
-                return Response(
-                    {"error": "Block Chair has no block or section assigned."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            queryset = Attendance.objects.filter(block=user.block, section=user.section)
+        if user.role in ('admin', 'block_chair'):
+            error = self.scope_error_response()
+            if error:
+                return error
+            queryset = self.scope_queryset(Attendance.objects.all())
         else:
-            print(f"Access denied for role: {user.role}")
+            logger.debug("Attendance list denied for role %s", user.role)
             return Response(
                 {"error": "You don't have permission to view attendance records."},
                 status=status.HTTP_403_FORBIDDEN
@@ -41,16 +52,15 @@ class AttendanceAPIView(APIView):
         if status_filter:
             queryset = queryset.filter(status=status_filter)
 
-        print("Fetching attendance with filters:", {
-            "block": block_id,
-            "section": section_id,
-            "status": status_filter,
-            "user": user.username,
-            "results_count": queryset.count(),
-        })
+        logger.debug(
+            "Attendance list for %s: block=%s section=%s status=%s",
+            user.username, block_id, section_id, status_filter,
+        )
 
-        serializer = AttendanceSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = LeanAttendanceSerializer(fieldset=Fieldset.from_request(request))
+        paginator = KeysetPagination(ordering=ATTENDANCE_ORDERING)
+        page = paginator.paginate_queryset(serializer.values(queryset), request, view=self)
+        return paginator.get_paginated_response(serializer.many(page))
 
     def post(self, request):
         user = request.user
@@ -60,29 +70,87 @@ class AttendanceAPIView(APIView):
             block = serializer.validated_data.get('block')
             section = serializer.validated_data.get('section')
 
-            if user.role == 'block_chair':
-                if not user.block or not user.section:
+            scope = self.get_scope()
+            if not scope.unrestricted:
+                if scope.error(self.scope_level):
                     return Response(
                         {"error": "Block Chair must be assigned a block and section."},
                         status=status.HTTP_400_BAD_REQUEST
                     )
 
-                if block != user.block or section != user.section:
-                    print(f"Unauthorized access attempt by {user.username}")
+                # A missing block/section is outside the chair's section too
+                block_id = getattr(block, 'pk', None)
+                section_id = getattr(section, 'pk', None)
+                if block_id != scope.block_id or section_id != scope.section_id:
+                    logger.warning("%s tried to record attendance outside their section", user.username)
                     return Response(
                         {"error": "Block Chairs can only record attendance for their assigned block and section."},
                         status=status.HTTP_403_FORBIDDEN
                     )
 
             serializer.save(recorded_by=user)
-            print(f"✅ Attendance saved successfully by {user.username}")
+            logger.info("Attendance #%s recorded by %s", serializer.instance.pk, user.username)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        print(f"❌ Attendance POST validation failed: {serializer.errors}")
+        logger.debug("Attendance rejected: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class BlockAttendanceView(APIView):
+class RollCallAPIView(ScopedQuerysetMixin, APIView):
+    """
+    POST /attendance/roll-call/ → record one event for a whole section:
+    {"date", "attendance_type", "block", "section", "time", "duration_minutes",
+     "records": {"<farmer_id>": "present", ...}, "comments": {...},
+     "default_status": "absent"}
+    Farmers already marked for that date and type are updated.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    scope_fields = {'block': 'block_id', 'section': 'section_id'}
+    scope_level = 'section'
+
+    def post(self, request):
+        user = request.user
+        if user.role not in ('admin', 'block_chair'):
+            return Response(
+                {"error": "You don't have permission to record attendance."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        error = self.scope_error_response()
+        if error:
+            return error
+
+        serializer = RollCallSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        section = data.get('section')
+        scope = self.get_scope()
+        if not scope.unrestricted and (
+            data['block'].pk != scope.block_id or section is None or section.pk != scope.section_id
+        ):
+            logger.warning("%s tried a roll call outside their section", user.username)
+            return Response(
+                {"error": "Block Chairs can only record attendance for their assigned block and section."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            summary = record_roll_call(data, user)
+        except RosterError as e:
+            return Response(
+                {"error": "Some farmers are not active members of this block/section.",
+                 "farmers": e.farmer_ids},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        logger.info(
+            "Roll call %s %s by %s: %d recorded",
+            data['attendance_type'], data['date'], user.username, summary['recorded'],
+        )
+        return Response(summary, status=status.HTTP_201_CREATED)
+
+
+class BlockAttendanceView(ScopedQuerysetMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, block_id):
@@ -95,7 +163,7 @@ class BlockAttendanceView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        if not user.block or str(user.block.id) != str(block_id):
+        if not self.get_scope().permits(block_id=block_id):
             return Response(
                 {"error": "You can only access attendance from your assigned block."},
                 status=status.HTTP_403_FORBIDDEN
@@ -105,27 +173,24 @@ class BlockAttendanceView(APIView):
         if today_only:
             queryset = queryset.filter(date=date.today())
 
-        serializer = AttendanceSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = LeanAttendanceSerializer(fieldset=Fieldset.from_request(request))
+        paginator = KeysetPagination(ordering=ATTENDANCE_ORDERING)
+        page = paginator.paginate_queryset(serializer.values(queryset), request, view=self)
+        return paginator.get_paginated_response(serializer.many(page))
 
 
-class AttendanceStatsView(APIView):
+class AttendanceStatsView(ScopedQuerysetMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        user = request.user
         block_id = request.query_params.get('block_id')
 
-        if user.role == 'block_chair':
-            if not user.block:
-                return Response(
-                    {"error": "No block assigned to this chair."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            block_id = user.block.id
+        error = self.scope_error_response()
+        if error:
+            return error
 
-        queryset = Attendance.objects.all()
-        if block_id:
+        queryset = self.scope_queryset(Attendance.objects.all())
+        if block_id and self.get_scope().unrestricted:
             queryset = queryset.filter(block_id=block_id)
 
         stats = queryset.aggregate(
@@ -139,12 +204,67 @@ class AttendanceStatsView(APIView):
         return Response(stats, status=status.HTTP_200_OK)
 
 
+class AttendanceRatesView(ScopedQuerysetMixin, APIView):
+    """
+    GET /attendance/rates/ → attendance rates over a window ending today:
+    per block for the scheme, per section for one block (block chairs always
+    get theirs), and per farmer with ?section=. ?farmer= gives one farmer.
+    ?window= picks one of ATTENDANCE_RATE_WINDOWS.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        window = params.get('window') or rates.default_window()
+        if window not in rates.windows():
+            return Response(
+                {"error": f"window must be one of: {', '.join(rates.windows())}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        for name in ('block', 'section', 'farmer'):
+            if params.get(name) and not params[name].isdigit():
+                return Response({"error": f"{name} must be a {name} ID."}, status=status.HTTP_400_BAD_REQUEST)
+
+        error = self.scope_error_response()
+        if error:
+            return error
+        scope = self.get_scope()
+
+        farmer_id = params.get('farmer')
+        if farmer_id:
+            farmer = Farmer.objects.filter(pk=farmer_id).only('id', 'block_id', 'section_id').first()
+            if farmer is None:
+                return Response({"error": "Farmer not found"}, status=status.HTTP_404_NOT_FOUND)
+            if not scope.permits(block_id=farmer.block_id):
+                return Response(
+                    {"error": "You can only view farmers in your assigned block."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            return Response(rates.farmer_rates(farmer, window))
+
+        block_id = int(params['block']) if params.get('block') else None
+        section_id = int(params['section']) if params.get('section') else None
+        if not scope.unrestricted:
+            block_id = scope.block_id
+        if section_id is not None:
+            section = reference_data.snapshot().get(Section, section_id)
+            if section is None or (block_id and section['block_id'] != block_id):
+                return Response({"error": "Section not found in this block."}, status=status.HTTP_404_NOT_FOUND)
+            block_id = section['block_id']
+        if block_id and not reference_data.snapshot().get(Block, block_id):
+            return Response({"error": "Block not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(rates.get_rates(window, block_id=block_id, section_id=section_id))
+
+
 class PenaltyResetView(APIView):
     permission_classes = [permissions.IsAdminUser]
 
     def post(self, request, farmer_id):
-        Attendance.objects.filter(farmer_id=farmer_id).update(penalty_points=0)
-        print(f"♻️ Penalties reset for farmer ID: {farmer_id} by {request.user.username}")
+        if not Farmer.objects.filter(pk=farmer_id).exists():
+            return Response({"error": "Farmer not found"}, status=status.HTTP_404_NOT_FOUND)
+        penalties.reset(farmer_id, user=request.user, note=request.data.get('note', ''))
+        logger.info("Penalties reset for farmer %s by %s", farmer_id, request.user.username)
         return Response(
             {"status": f"Penalties reset for farmer {farmer_id}."},
             status=status.HTTP_200_OK
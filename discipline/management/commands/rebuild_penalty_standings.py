@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from discipline.penalties import rebuild_standings
+
+
+class Command(BaseCommand):
+    help = "Recreate every farmer's penalty standing from the penalty ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = rebuild_standings(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} penalty standings."))
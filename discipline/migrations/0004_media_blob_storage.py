@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 14:15
+
+import limphasaScheme.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discipline', '0003_alter_disciplinecase_action_taken_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='disciplinecase',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=limphasaScheme.storage.blob_storage, upload_to='discipline_attachments/'),
+        ),
+    ]
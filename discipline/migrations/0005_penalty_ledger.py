@@ -0,0 +1,104 @@
+# Generated by Django 5.2 on 2026-10-18 14:34
+
+from datetime import datetime, time
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+DEFAULT_HALF_LIFE_DAYS = 180
+
+
+def open_ledger(apps, schema_editor):
+    """Post the points already on marks and cases, oldest first, per farmer."""
+    AttendanceMark = apps.get_model('attendance', 'AttendanceMark')
+    DisciplineCase = apps.get_model('discipline', 'DisciplineCase')
+    PenaltyEntry = apps.get_model('discipline', 'PenaltyEntry')
+    PenaltyStanding = apps.get_model('discipline', 'PenaltyStanding')
+    half_life = getattr(settings, 'PENALTY_HALF_LIFE_DAYS', DEFAULT_HALF_LIFE_DAYS)
+
+    events = []
+    marks = AttendanceMark.objects.filter(penalty_points__gt=0).values_list(
+        'id', 'farmer_id', 'penalty_points', 'session__date'
+    )
+    for pk, farmer_id, points, day in marks.iterator():
+        at = django.utils.timezone.make_aware(datetime.combine(day, time.min))
+        events.append((farmer_id, at, 'attendance', pk, points))
+    cases = DisciplineCase.objects.filter(penalty_points__gt=0).values_list(
+        'id', 'farmer_id', 'penalty_points', 'date_reported'
+    )
+    for pk, farmer_id, points, at in cases.iterator():
+        events.append((farmer_id, at, 'discipline', pk, points))
+    events.sort(key=lambda event: event[:2])
+
+    entries, standings = [], {}
+    for farmer_id, at, kind, pk, points in events:
+        standing = standings.get(farmer_id)
+        if standing is None:
+            standing = standings[farmer_id] = PenaltyStanding(farmer_id=farmer_id)
+        score = standing.decayed_points
+        if half_life and standing.decayed_at and at > standing.decayed_at:
+            score *= 0.5 ** ((at - standing.decayed_at).total_seconds() / (half_life * 86400))
+        standing.decayed_points = score + points
+        standing.decayed_at = standing.last_entry_at = at
+        standing.total += points
+        source = {'attendance_mark_id': pk} if kind == 'attendance' else {'discipline_case_id': pk}
+        entries.append(PenaltyEntry(
+            farmer_id=farmer_id, kind=kind, points=points, total_after=standing.total,
+            score_after=standing.decayed_points, note="Opening balance", created_at=at, **source
+        ))
+    PenaltyEntry.objects.bulk_create(entries, batch_size=2000)
+    PenaltyStanding.objects.bulk_create(standings.values(), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_attendance_sessions'),
+        ('discipline', '0004_media_blob_storage'),
+        ('farmers', '0008_media_blob_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PenaltyStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.IntegerField(default=0)),
+                ('decayed_points', models.FloatField(default=0)),
+                ('decayed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_entry_at', models.DateTimeField(blank=True, null=True)),
+                ('last_reset_at', models.DateTimeField(blank=True, null=True)),
+                ('farmer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='penalty_standing', to='farmers.farmer')),
+            ],
+            options={
+                'verbose_name': 'Penalty Standing',
+                'verbose_name_plural': 'Penalty Standings',
+            },
+        ),
+        migrations.CreateModel(
+            name='PenaltyEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('attendance', 'Attendance'), ('discipline', 'Discipline Case'), ('reset', 'Reset')], max_length=20)),
+                ('points', models.IntegerField()),
+                ('total_after', models.IntegerField(help_text='Running total after this entry')),
+                ('score_after', models.FloatField(default=0, help_text='Decayed score just after this entry')),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attendance_mark', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='penalty_entries', to='attendance.attendancemark')),
+                ('discipline_case', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='penalty_entries', to='discipline.disciplinecase')),
+                ('farmer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='penalty_entries', to='farmers.farmer')),
+                ('recorded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Penalty Entry',
+                'verbose_name_plural': 'Penalty Entries',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['farmer', 'created_at'], name='penalty_farmer_created_idx')],
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from farmers.models import Farmer, Block, Section
+from limphasaScheme.storage import blob_storage
 
 User = get_user_model()
 
@@ -85,7 +86,7 @@ class DisciplineCase(models.Model):
     resolution_date = models.DateTimeField(null=True, blank=True)
 
     attachment = models.FileField(
-        upload_to="discipline_attachments/", null=True, blank=True
+        upload_to="discipline_attachments/", storage=blob_storage, null=True, blank=True
     )
     evidence = models.JSONField(default=list, blank=True)
 
@@ -117,3 +118,78 @@ class DisciplineCase(models.Model):
             f"Case #{self.id}: {self.farmer} - "
             f"{self.get_offence_type_display()} ({self.get_status_display()})"
         )
+
+
+class PenaltyEntry(models.Model):
+    """
+    One change to a farmer's penalty points. Entries are only ever added:
+    a changed or deleted mark/case posts the difference, and a reset posts
+    minus the running total (see discipline.penalties).
+    """
+
+    KIND_CHOICES = [
+        ("attendance", "Attendance"),
+        ("discipline", "Discipline Case"),
+        ("reset", "Reset"),
+    ]
+
+    farmer = models.ForeignKey(
+        Farmer, on_delete=models.CASCADE, related_name="penalty_entries"
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    points = models.IntegerField()
+    total_after = models.IntegerField(help_text="Running total after this entry")
+    score_after = models.FloatField(default=0, help_text="Decayed score just after this entry")
+    attendance_mark = models.ForeignKey(
+        'attendance.AttendanceMark',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="penalty_entries",
+    )
+    discipline_case = models.ForeignKey(
+        DisciplineCase,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="penalty_entries",
+    )
+    note = models.CharField(max_length=255, blank=True)
+    recorded_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        verbose_name = "Penalty Entry"
+        verbose_name_plural = "Penalty Entries"
+        indexes = [
+            models.Index(fields=['farmer', 'created_at'], name='penalty_farmer_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.farmer}: {self.points:+d} ({self.get_kind_display()})"
+
+
+class PenaltyStanding(models.Model):
+    """
+    A farmer's current penalty position, moved with every PenaltyEntry.
+    ``total`` is the plain running total. ``decayed_points`` is the decayed
+    score as of ``decayed_at``; reads decay it the rest of the way.
+    """
+    farmer = models.OneToOneField(
+        Farmer, on_delete=models.CASCADE, related_name="penalty_standing"
+    )
+    total = models.IntegerField(default=0)
+    decayed_points = models.FloatField(default=0)
+    decayed_at = models.DateTimeField(null=True, blank=True)
+    last_entry_at = models.DateTimeField(null=True, blank=True)
+    last_reset_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Penalty Standing"
+        verbose_name_plural = "Penalty Standings"
+
+    def __str__(self):
+        return f"{self.farmer}: {self.total} penalty points"
@@ -0,0 +1,173 @@
+"""
+Penalty ledger for attendance marks and discipline cases.
+
+Every change to a farmer's penalty points is a PenaltyEntry, and the
+farmer's PenaltyStanding is moved in the same transaction, so a standing
+is one row read. When an attendance mark's or a case's ``penalty_points``
+changes, or the mark/case is deleted, the difference is posted
+(discipline.signals). A reset posts minus the running total and keeps the
+history. Points from before a reset stay forgiven: a later edit to a mark
+or case that predates the reset only adds the increase.
+
+Points decay with a half-life of ``PENALTY_HALF_LIFE_DAYS`` (0 turns decay
+off). The standing stores the decayed score as of its last entry, and reads
+decay it from there to now. That is exact for exponential decay, so reads
+never look at the entries.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery
+from django.utils import timezone
+
+from .models import PenaltyEntry, PenaltyStanding
+
+DEFAULT_HALF_LIFE_DAYS = 180
+
+SOURCES = {
+    'attendance': 'attendance_mark',
+    'discipline': 'discipline_case',
+}
+
+
+def half_life_days():
+    return getattr(settings, 'PENALTY_HALF_LIFE_DAYS', DEFAULT_HALF_LIFE_DAYS)
+
+
+def decay(points, since, until):
+    """``points`` recorded at ``since``, decayed to ``until``."""
+    days = half_life_days()
+    if not days or not points or since is None or until <= since:
+        return points
+    return points * 0.5 ** ((until - since).total_seconds() / (days * 86400))
+
+
+def score(standing, at=None):
+    """The decayed score of a PenaltyStanding at ``at`` (default now)."""
+    return decay(standing.decayed_points, standing.decayed_at, at or timezone.now())
+
+
+# -------------------
+# Posting
+# -------------------
+def _locked_standing(farmer_id):
+    PenaltyStanding.objects.bulk_create(
+        [PenaltyStanding(farmer_id=farmer_id)], ignore_conflicts=True
+    )
+    return PenaltyStanding.objects.select_for_update().get(farmer_id=farmer_id)
+
+
+def _post(standing, kind, points, decayed_change, now, **fields):
+    standing.decayed_points = max(score(standing, now) + decayed_change, 0)
+    standing.decayed_at = now
+    standing.total += points
+    standing.last_entry_at = now
+    if kind == 'reset':
+        standing.last_reset_at = now
+    standing.save()
+    return PenaltyEntry.objects.create(
+        farmer_id=standing.farmer_id, kind=kind, points=points,
+        total_after=standing.total, score_after=standing.decayed_points,
+        created_at=now, **fields
+    )
+
+
+def record_change(kind, source, farmer_id, previous, points, deleted=False):
+    """
+    A mark's or case's penalty points went from ``previous`` to ``points``
+    for ``farmer_id``. Posts the difference (or nothing) and returns the
+    entry. ``deleted`` entries are not linked to the source, which is
+    about to go.
+    """
+    if previous == points:
+        return None
+    field = SOURCES[kind]
+    with transaction.atomic():
+        now = timezone.now()
+        standing = _locked_standing(farmer_id)
+        entries = PenaltyEntry.objects.filter(farmer_id=farmer_id, **{field: source.pk})
+        if standing.last_reset_at:
+            entries = entries.filter(created_at__gt=standing.last_reset_at)
+        entries = list(entries.values_list('points', 'created_at'))
+
+        # What this source currently adds to the total, and what it should
+        live = sum(entry_points for entry_points, _ in entries)
+        target = max(live + points - previous, 0)
+        if target == live:
+            return None
+        if target < live:
+            # Shrink what is left of the source's points, keeping their age
+            remaining = sum(decay(entry_points, at, now) for entry_points, at in entries)
+            decayed_change = remaining * target / live - remaining
+        else:
+            decayed_change = target - live
+
+        label = "Attendance mark" if kind == 'attendance' else "Case"
+        note = f"{label} #{source.pk}: {previous} -> {points} points"
+        if deleted:
+            note = f"{label} #{source.pk} deleted"
+        return _post(
+            standing, kind, target - live, decayed_change, now,
+            note=note, **({} if deleted else {field: source})
+        )
+
+
+def reset(farmer_id, user=None, note=""):
+    """Clear a farmer's points with a ledger entry; returns the entry."""
+    with transaction.atomic():
+        now = timezone.now()
+        standing = _locked_standing(farmer_id)
+        return _post(
+            standing, 'reset', -standing.total, -score(standing, now), now,
+            note=note or "Penalties reset", recorded_by=user,
+        )
+
+
+# -------------------
+# Reading
+# -------------------
+def standing_data(standing, at=None):
+    at = at or timezone.now()
+    return {
+        'farmer': standing.farmer_id,
+        'total': standing.total,
+        'score': round(score(standing, at), 2),
+        'half_life_days': half_life_days() or None,
+        'as_of': at,
+        'last_entry_at': standing.last_entry_at,
+        'last_reset_at': standing.last_reset_at,
+    }
+
+
+def standing_for(farmer_id, at=None):
+    """A farmer's current standing: one indexed row, no entries read."""
+    standing = PenaltyStanding.objects.filter(farmer_id=farmer_id).first()
+    return standing_data(standing or PenaltyStanding(farmer_id=farmer_id), at)
+
+
+# -------------------
+# Rebuild
+# -------------------
+def rebuild_standings(batch_size=1000):
+    """Recreate every standing from each farmer's latest entry; returns the row count."""
+    last_resets = dict(
+        PenaltyEntry.objects.filter(kind='reset').values('farmer_id')
+        .annotate(last=Max('created_at')).order_by().values_list('farmer_id', 'last')
+    )
+    newest = PenaltyEntry.objects.filter(farmer_id=OuterRef('farmer_id')).order_by('-created_at', '-id')
+    latest = PenaltyEntry.objects.filter(pk=Subquery(newest.values('pk')[:1])).order_by()
+
+    standings = [
+        PenaltyStanding(
+            farmer_id=entry.farmer_id,
+            total=entry.total_after,
+            decayed_points=entry.score_after,
+            decayed_at=entry.created_at,
+            last_entry_at=entry.created_at,
+            last_reset_at=last_resets.get(entry.farmer_id),
+        )
+        for entry in latest.iterator(chunk_size=batch_size)
+    ]
+    with transaction.atomic():
+        PenaltyStanding.objects.all().delete()
+        PenaltyStanding.objects.bulk_create(standings, batch_size=batch_size)
+    return len(standings)
@@ -1,25 +1,27 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from farmers.models import Farmer
-from .models import DisciplineCase
+from limphasaScheme.fieldsets import SparseFieldsetMixin
+from limphasaScheme.lean import Field, LeanSerializer, Method, Nested, date_repr, datetime_repr, file_url
+from .models import DisciplineCase, PenaltyEntry
 
 User = get_user_model()
 
-class SimpleUserSerializer(serializers.ModelSerializer):
+class SimpleUserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Lightweight user representation."""
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name']
         read_only_fields = fields
 
-class FarmerSimpleSerializer(serializers.ModelSerializer):
+class FarmerSimpleSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Minimal farmer info for display."""
     class Meta:
         model = Farmer
         fields = ['id', 'first_name', 'last_name', 'registration_number']
         read_only_fields = fields
 
-class DisciplineCaseSerializer(serializers.ModelSerializer):
+class DisciplineCaseSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     # Read‐only nested representations
     farmer = FarmerSimpleSerializer(read_only=True)
     block = serializers.StringRelatedField(read_only=True)
@@ -71,3 +73,71 @@ class DisciplineCaseSerializer(serializers.ModelSerializer):
         validated_data['block'] = farmer.block
         validated_data['section'] = farmer.section
         return super().create(validated_data)
+
+
+class LeanSimpleUserSerializer(LeanSerializer):
+    """Read-only ``SimpleUserSerializer`` output built from ``values()`` rows."""
+    fields = {
+        'id': Field('id'),
+        'username': Field('username'),
+        'first_name': Field('first_name'),
+        'last_name': Field('last_name'),
+    }
+
+
+class LeanFarmerSimpleSerializer(LeanSerializer):
+    """Read-only ``FarmerSimpleSerializer`` output built from ``values()`` rows."""
+    fields = {
+        'id': Field('id'),
+        'first_name': Field('first_name'),
+        'last_name': Field('last_name'),
+        'registration_number': Field('registration_number'),
+    }
+
+
+class LeanDisciplineCaseSerializer(LeanSerializer):
+    """Read-only ``DisciplineCaseSerializer`` output built from ``values()`` rows."""
+    fields = {
+        'id': Field('id'),
+        'farmer': Nested(LeanFarmerSimpleSerializer, 'farmer'),
+        'block': Field('block__name'),
+        'section': Method('get_section', 'section', 'section__name', 'section__block__name'),
+        'date_reported': Field('date_reported', datetime_repr),
+        'date_incident': Field('date_incident', date_repr),
+        'offence_type': Field('offence_type'),
+        'offence_description': Field('offence_description'),
+        'action_taken': Field('action_taken'),
+        'status': Field('status'),
+        'severity': Field('severity'),
+        'penalty_points': Field('penalty_points'),
+        'comment': Field('comment'),
+        'reported_by': Nested(LeanSimpleUserSerializer, 'reported_by'),
+        'resolved_by': Nested(LeanSimpleUserSerializer, 'resolved_by'),
+        'resolution_date': Field('resolution_date', datetime_repr),
+        'attachment': Method('get_attachment', 'attachment'),
+        'evidence': Field('evidence'),
+    }
+    ordering_columns = ('id', 'date_reported', 'severity', 'penalty_points')
+    attachment_storage = DisciplineCase._meta.get_field('attachment').storage
+
+    def get_section(self, row):
+        k = self.keys
+        if row[k['section']] is None:
+            return None
+        # str(Section)
+        return f"{row[k['section__block__name']]} - {row[k['section__name']]}"
+
+    def get_attachment(self, row):
+        return file_url(self.attachment_storage, row[self.keys['attachment']], self.request)
+
+
+class PenaltyEntrySerializer(serializers.ModelSerializer):
+    recorded_by = serializers.StringRelatedField(read_only=True)
+
+    class Meta:
+        model = PenaltyEntry
+        fields = [
+            'id', 'created_at', 'kind', 'points', 'total_after', 'score_after',
+            'attendance_mark', 'discipline_case', 'note', 'recorded_by',
+        ]
+        read_only_fields = fields
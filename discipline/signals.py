@@ -0,0 +1,57 @@
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, pre_delete
+from django.dispatch import receiver
+
+from attendance.models import AttendanceMark
+from farmers.models import Farmer
+from . import penalties
+from .models import DisciplineCase
+
+PENALTY_SOURCES = {
+    AttendanceMark: 'attendance',
+    DisciplineCase: 'discipline',
+}
+
+
+def _saves_penalty(update_fields):
+    return update_fields is None or bool({'farmer', 'penalty_points'}.intersection(update_fields))
+
+
+@receiver(pre_save, sender=AttendanceMark)
+@receiver(pre_save, sender=DisciplineCase)
+def remember_previous_penalty(sender, instance, update_fields=None, **kwargs):
+    instance._previous_penalty = None
+    if instance.pk and _saves_penalty(update_fields):
+        instance._previous_penalty = sender.objects.filter(pk=instance.pk).values_list(
+            'farmer_id', 'penalty_points'
+        ).first()
+
+
+@receiver(post_save, sender=AttendanceMark)
+@receiver(post_save, sender=DisciplineCase)
+def post_penalty_change(sender, instance, created, update_fields=None, **kwargs):
+    if not _saves_penalty(update_fields):
+        return
+    kind = PENALTY_SOURCES[sender]
+    farmer_id, previous = getattr(instance, '_previous_penalty', None) or (instance.farmer_id, 0)
+    if farmer_id != instance.farmer_id:
+        penalties.record_change(kind, instance, farmer_id, previous, 0)
+        previous = 0
+    penalties.record_change(kind, instance, instance.farmer_id, previous, instance.penalty_points)
+
+
+def _deleting_farmer(origin):
+    if isinstance(origin, QuerySet):
+        return origin.model is Farmer
+    return isinstance(origin, Farmer)
+
+
+@receiver(pre_delete, sender=AttendanceMark)
+@receiver(pre_delete, sender=DisciplineCase)
+def reverse_penalty(sender, instance, origin=None, **kwargs):
+    # The farmer's ledger is deleted with them
+    if _deleting_farmer(origin):
+        return
+    penalties.record_change(
+        PENALTY_SOURCES[sender], instance, instance.farmer_id, instance.penalty_points, 0, deleted=True
+    )
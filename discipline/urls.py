@@ -4,6 +4,7 @@ from .views import (
     DisciplineDetailAPIView,
     CaseResolutionAPIView,
     CaseStatsAPIView,
+    PenaltyLedgerAPIView,
 )
 
 urlpatterns = [
@@ -11,4 +12,5 @@ urlpatterns = [
     path('<int:pk>/', DisciplineDetailAPIView.as_view(), name='discipline-detail'),
     path('<int:pk>/resolve/', CaseResolutionAPIView.as_view(), name='case-resolve'),
     path('stats/', CaseStatsAPIView.as_view(), name='case-stats'),
+    path('penalties/<int:farmer_id>/', PenaltyLedgerAPIView.as_view(), name='penalty-ledger'),
 ]
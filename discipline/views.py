@@ -10,12 +10,24 @@ from rest_framework.generics import ListAPIView
 
 from django_filters.rest_framework import DjangoFilterBackend
 
-from .models import DisciplineCase
-from .serializers import DisciplineCaseSerializer
+from .models import DisciplineCase, PenaltyEntry
+from .serializers import DisciplineCaseSerializer, LeanDisciplineCaseSerializer, PenaltyEntrySerializer
+from . import penalties
+from farmers.models import Farmer
+from limphasaScheme.pagination import KeysetPagination
 from .filters import DisciplineCaseFilter
+from limphasaScheme.fieldsets import Fieldset, select_related_for
+from accounts.scopes import ScopedQuerysetMixin
 
+# Nested objects of a case and the relations each one reads
+CASE_RELATIONS = {
+    'farmer': ['farmer'],
+    'reported_by': ['reported_by'],
+    'resolved_by': ['resolved_by'],
+}
 
-class DisciplineListCreateAPIView(ListAPIView):
+
+class DisciplineListCreateAPIView(ScopedQuerysetMixin, ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = DisciplineCaseSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -28,9 +40,17 @@ class DisciplineListCreateAPIView(ListAPIView):
         queryset = DisciplineCase.objects.select_related(
             'farmer', 'block', 'section', 'reported_by', 'resolved_by'
         )
-        if self.request.user.role == 'block_chair':
-            queryset = queryset.filter(block__block_chair=self.request.user)
-        return queryset
+        return self.scope_queryset(queryset)
+
+    def list(self, request, *args, **kwargs):
+        serializer = LeanDisciplineCaseSerializer(
+            context=self.get_serializer_context(), fieldset=Fieldset.from_request(request)
+        )
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.many(page))
+        return Response(serializer.many(queryset))
 
     def post(self, request):
         serializer = DisciplineCaseSerializer(data=request.data, context={'request': request})
@@ -44,23 +64,22 @@ class DisciplineListCreateAPIView(ListAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class DisciplineDetailAPIView(APIView):
+class DisciplineDetailAPIView(ScopedQuerysetMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self, pk):
-        case = get_object_or_404(
-            DisciplineCase.objects.select_related(
-                'farmer', 'block', 'section', 'reported_by', 'resolved_by'
-            ),
-            pk=pk
+        queryset = select_related_for(
+            DisciplineCase.objects.select_related('block', 'section__block'),
+            Fieldset.from_request(self.request), CASE_RELATIONS
         )
-        if self.request.user.role == 'block_chair' and case.block.block_chair != self.request.user:
+        case = get_object_or_404(queryset, pk=pk)
+        if not self.in_scope(case):
             raise PermissionDenied("You can only access cases from your block")
         return case
 
     def get(self, request, pk):
         case = self.get_object(pk)
-        serializer = DisciplineCaseSerializer(case)
+        serializer = DisciplineCaseSerializer(case, fieldset=Fieldset.from_request(request))
         return Response(serializer.data)
 
     def put(self, request, pk):
@@ -82,7 +101,7 @@ class DisciplineDetailAPIView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class CaseResolutionAPIView(APIView):
+class CaseResolutionAPIView(ScopedQuerysetMixin, APIView):
     """
     Special endpoint to resolve a case and record action taken.
     """
@@ -90,6 +109,8 @@ class CaseResolutionAPIView(APIView):
 
     def post(self, request, pk):
         case = get_object_or_404(DisciplineCase, pk=pk)
+        if not self.in_scope(case):
+            raise PermissionDenied("You can only access cases from your block")
 
         if not request.data.get('action_taken'):
             return Response(
@@ -120,3 +141,24 @@ class CaseStatsAPIView(APIView):
             serious_cases=Count('id', filter=Q(severity='serious')),
         )
         return Response(stats)
+
+
+class PenaltyLedgerAPIView(ScopedQuerysetMixin, APIView):
+    """
+    GET /discipline/penalties/<farmer_id>/ → the farmer's current standing
+    (running total and decayed score) and their ledger entries, newest first.
+    Resets go through POST /attendance/penalties/reset/<farmer_id>/.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, farmer_id):
+        farmer = get_object_or_404(Farmer.objects.only('id', 'block_id'), pk=farmer_id)
+        if not self.get_scope().permits(block_id=farmer.block_id):
+            raise PermissionDenied("You can only access farmers from your block")
+
+        paginator = KeysetPagination(ordering=('-created_at',))
+        entries = PenaltyEntry.objects.filter(farmer_id=farmer.pk).select_related('recorded_by')
+        page = paginator.paginate_queryset(entries, request, view=self)
+        response = paginator.get_paginated_response(PenaltyEntrySerializer(page, many=True).data)
+        response.data['standing'] = penalties.standing_for(farmer.pk)
+        return response
@@ -0,0 +1,188 @@
+"""
+Materialized dashboard stats.
+
+Stats are computed per scope (the whole scheme, or one block) and stored in
+``DashboardSnapshot``. Farmer, Attendance and Payment writes mark the scheme
+scope and the affected block scopes dirty (farmers.signals) when their
+transaction commits. Dirty scopes
+are recomputed either by ``manage.py refresh_dashboard`` (one-off or
+``--watch``) or by a background thread that a stale read starts, at most
+once per ``DASHBOARD_REFRESH_INTERVAL`` seconds. Reads never wait for a
+recompute unless a scope has never been computed. The attendance rate is
+read from attendance.rates over ``ATTENDANCE_RATE_DEFAULT_WINDOW``; since
+that window ends today, a snapshot from an earlier day is refreshed too.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from attendance import rates
+from payments.models import Payment, FarmerBalance
+from .models import Farmer, DashboardSnapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_INTERVAL = 30  # seconds
+
+_refresh_lock = threading.Lock()
+_refreshing = set()
+
+
+def scope_key(block_id=None):
+    return f"block:{block_id}" if block_id else DashboardSnapshot.SCHEME_SCOPE
+
+
+def refresh_interval():
+    return getattr(settings, 'DASHBOARD_REFRESH_INTERVAL', DEFAULT_REFRESH_INTERVAL)
+
+
+def compute_stats(block_id=None):
+    farmers = Farmer.objects.filter(is_active=True)
+    fines = Payment.objects.filter(payment_type='fine')
+    balances = FarmerBalance.objects.filter(is_active=True, outstanding__gt=0)
+    if block_id:
+        farmers = farmers.filter(block_id=block_id)
+        fines = fines.filter(farmer__block_id=block_id)
+        balances = balances.filter(block_id=block_id)
+
+    total_farmers = farmers.count()
+
+    attendance = rates.get_rates(block_id=block_id)
+    attendance_rate = attendance['totals']['rate'] or 0
+
+    fines_collected = fines.aggregate(total=Sum('amount'))['total'] or 0
+
+    plots_qs = farmers.values(
+        'block__name', 'section__name'
+    ).annotate(
+        total_plots=Sum('number_of_plots')
+    ).order_by('block__name', 'section__name')
+
+    plots_summary = [
+        {
+            'block__name': p['block__name'],
+            'section__name': p['section__name'],
+            'total_plots': p['total_plots']
+        }
+        for p in plots_qs
+    ]
+
+    balances_qs = balances.select_related(
+        'farmer', 'block', 'section'
+    ).order_by('-outstanding')[:5]
+
+    top_unpaid = [
+        {
+            'id': b.farmer_id,
+            'name': f"{b.farmer.first_name} {b.farmer.last_name}",
+            'block': b.block.name if b.block else None,
+            'section': b.section.name if b.section else None,
+            'paid': float(b.outstanding)
+        }
+        for b in balances_qs
+    ]
+
+    return {
+        'total_farmers': total_farmers,
+        'attendance_rate': attendance_rate,
+        'attendance_window': attendance['window'],
+        'fines_collected': float(fines_collected),
+        'plots_summary': plots_summary,
+        'top_unpaid': top_unpaid,
+    }
+
+
+def refresh_scope(block_id=None):
+    """Recompute one scope and store it; returns the snapshot."""
+    key = scope_key(block_id)
+    snapshot, _ = DashboardSnapshot.objects.get_or_create(
+        scope=key, defaults={'block_id': block_id}
+    )
+    # Read the version first: writes landing during the recompute bump
+    # dirty_version past it and keep the snapshot stale.
+    version = DashboardSnapshot.objects.filter(pk=snapshot.pk).values_list(
+        'dirty_version', flat=True
+    ).get()
+    snapshot.data = compute_stats(block_id)
+    snapshot.refreshed_version = version
+    snapshot.refreshed_at = timezone.now()
+    snapshot.save(update_fields=['data', 'refreshed_version', 'refreshed_at'])
+    return snapshot
+
+
+def refresh_dirty():
+    """Recompute every stale scope; returns the scopes refreshed."""
+    refreshed = []
+    stale = DashboardSnapshot.objects.filter(
+        dirty_version__gt=F('refreshed_version')
+    ).exclude(
+        scope=DashboardSnapshot.HIERARCHY_SCOPE
+    ).values_list('scope', 'block_id')
+    for key, block_id in stale:
+        refresh_scope(block_id)
+        refreshed.append(key)
+    return refreshed
+
+
+def _bump_dirty(keys):
+    DashboardSnapshot.objects.filter(scope__in=keys).update(
+        dirty_version=F('dirty_version') + 1
+    )
+
+
+def mark_dirty(block_ids=()):
+    """
+    Flag the scheme scope and the given block scopes as stale once the
+    current transaction commits. Every write bumps the scheme row, so doing
+    it inside the writer's transaction would hold that row's lock until
+    commit and serialize all concurrent writes.
+    """
+    keys = [scope_key()] + [scope_key(b) for b in set(block_ids) if b]
+    transaction.on_commit(lambda: _bump_dirty(keys))
+
+
+def _refresh_in_background(block_id):
+    key = scope_key(block_id)
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def run():
+        try:
+            refresh_scope(block_id)
+        except Exception as e:
+            logger.error(f"Error refreshing dashboard scope {key}: {e}")
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+            close_old_connections()
+
+    threading.Thread(target=run, name=f"dashboard-refresh-{key}", daemon=True).start()
+
+
+def get_snapshot(block_id=None):
+    """
+    Latest snapshot for a scope. Computed inline only the first time; a
+    stale snapshot is returned as-is and refreshed in the background.
+    """
+    snapshot = DashboardSnapshot.objects.filter(scope=scope_key(block_id)).first()
+    if snapshot is None:
+        return refresh_scope(block_id)
+
+    from_earlier_day = (
+        snapshot.refreshed_at is not None
+        and timezone.localdate(snapshot.refreshed_at) < timezone.localdate()
+    )
+    if snapshot.is_stale or from_earlier_day:
+        due = snapshot.refreshed_at is None or (
+            timezone.now() - snapshot.refreshed_at >= timedelta(seconds=refresh_interval())
+        )
+        if due:
+            _refresh_in_background(block_id)
+    return snapshot
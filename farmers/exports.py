@@ -0,0 +1,212 @@
+"""
+Streaming export of the farmer registry as CSV or XLSX.
+
+Farmers are read with ``values_list().iterator(chunk_size=...)`` (a
+server-side cursor on PostgreSQL) and encoded a chunk at a time, so an
+export holds one chunk in memory however large the registry is and the
+first bytes go out before the last row is read. XLSX is written as a
+minimal SpreadsheetML package straight into a zip stream, because a
+workbook library would buffer the whole sheet before saving. The column
+names match what ``farmers.importers`` reads back.
+"""
+import csv
+import io
+import re
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+DEFAULT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# (column header, values_list lookup)
+EXPORT_COLUMNS = [
+    ('registration_number', 'registration_number'),
+    ('first_name', 'first_name'),
+    ('middle_name', 'middle_name'),
+    ('last_name', 'last_name'),
+    ('gender', 'gender'),
+    ('phone_number', 'phone_number'),
+    ('email', 'email'),
+    ('location', 'location__name'),
+    ('block', 'block__name'),
+    ('section', 'section__name'),
+    ('role', 'role'),
+    ('number_of_plots', 'number_of_plots'),
+    ('amount_per_plot', 'amount_per_plot'),
+    ('total_amount', 'total_amount'),
+    ('next_of_kin', 'next_of_kin'),
+    ('is_active', 'is_active'),
+    ('date_registered', 'date_registered'),
+]
+
+
+def export_filename(file_format):
+    return f"farmers-{timezone.localdate():%Y%m%d}.{file_format}"
+
+
+def iter_export_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield one tuple per farmer, in registration order."""
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    for row in queryset.order_by('id').values_list(*lookups).iterator(chunk_size=chunk_size):
+        yield row
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'yes' if value else 'no'
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+
+def stream_farmers(queryset, file_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Byte chunks of the export file; ``file_format`` is 'csv' or 'xlsx'."""
+    rows = iter_export_rows(queryset, chunk_size)
+    if file_format == 'xlsx':
+        return _stream_xlsx(rows, chunk_size)
+    return _stream_csv(rows, chunk_size)
+
+
+# -------------------
+# CSV
+# -------------------
+def _stream_csv(rows, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so Excel opens non-ASCII names correctly; the importer skips it.
+    buffer.write('\ufeff')
+    writer.writerow([header for header, _ in EXPORT_COLUMNS])
+
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_text(value) for value in row])
+        if count % chunk_size == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+# -------------------
+# XLSX
+# -------------------
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Farmers" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+# Characters XML 1.0 does not allow, even escaped.
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+_COLUMN_LETTERS = [_column_letter(i) for i in range(len(EXPORT_COLUMNS))]
+
+
+def _xlsx_row(number, values):
+    cells = []
+    for letter, value in zip(_COLUMN_LETTERS, values):
+        ref = f'{letter}{number}'
+        if value is None or value == '':
+            continue
+        if isinstance(value, (int, Decimal)) and not isinstance(value, bool):
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        else:
+            text = escape(_ILLEGAL_XML.sub('', _text(value)))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+class _ChunkSink:
+    """Write-only, unseekable file that collects what ZipFile writes to it."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _stream_xlsx(rows, chunk_size):
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _ROOT_RELS)
+        archive.writestr('xl/workbook.xml', _WORKBOOK)
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(_SHEET_START.encode('utf-8'))
+            sheet.write(_xlsx_row(1, [header for header, _ in EXPORT_COLUMNS]).encode('utf-8'))
+            batch = []
+            for number, row in enumerate(rows, start=2):
+                batch.append(_xlsx_row(number, row))
+                if len(batch) >= chunk_size:
+                    sheet.write(''.join(batch).encode('utf-8'))
+                    batch = []
+                    yield sink.drain()
+            batch.append(_SHEET_END)
+            sheet.write(''.join(batch).encode('utf-8'))
+        yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,22 @@
+from .search import search_farmers
+
+
+def filter_farmers(queryset, params):
+    """
+    Apply the farmer list filters (block, section, location, search) from a
+    mapping of query parameters. Shared by the list and export endpoints.
+    """
+    block_id = params.get('block') or params.get('block_id')
+    section_id = params.get('section_id')
+    location_id = params.get('location_id')
+    search = params.get('search')
+
+    if block_id:
+        queryset = queryset.filter(block_id=block_id)
+    if section_id:
+        queryset = queryset.filter(section_id=section_id)
+    if location_id:
+        queryset = queryset.filter(location_id=location_id)
+    if search:
+        queryset = search_farmers(queryset, search)
+    return queryset
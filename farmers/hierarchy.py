@@ -0,0 +1,107 @@
+"""
+The block -> section tree used to build the front end's filters.
+
+One payload carries locations, blocks, their sections, active-farmer and
+plot counts and each block's chairperson, so a page no longer walks
+blocks, then sections per block, then farmers. The tree is stored as a
+``DashboardSnapshot`` under its own scope. Farmer writes and
+reference data changes mark it dirty (farmers.signals) when they commit.
+The next read rebuilds it inline from two grouped queries plus the
+reference cache.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Farmer, DashboardSnapshot
+from .reference import reference_data
+
+HIERARCHY_SCOPE = DashboardSnapshot.HIERARCHY_SCOPE
+
+
+def build_hierarchy():
+    reference = reference_data.snapshot(fresh=True)
+
+    counts = {}
+    for row in Farmer.objects.values('block_id', 'section_id').annotate(
+        active_farmers=Count('id', filter=Q(is_active=True)),
+        total_plots=Coalesce(Sum('number_of_plots', filter=Q(is_active=True)), 0),
+    ).order_by():
+        counts[(row['block_id'], row['section_id'])] = row
+
+    chairpersons = {}
+    for row in Farmer.objects.filter(role='chairperson', is_active=True).values(
+        'id', 'block_id', 'first_name', 'last_name', 'phone_number'
+    ).order_by('date_registered'):
+        chairpersons.setdefault(row['block_id'], {
+            'id': row['id'],
+            'name': f"{row['first_name']} {row['last_name']}",
+            'phone_number': row['phone_number'],
+        })
+
+    blocks = []
+    by_id = {}
+    for block in reference.blocks:
+        entry = {
+            'id': block['id'],
+            'name': block['name'],
+            'active_farmers': 0,
+            'total_plots': 0,
+            'chairperson': chairpersons.get(block['id']),
+            'sections': [],
+        }
+        blocks.append(entry)
+        by_id[block['id']] = entry
+
+    for section in reference.sections:
+        block = by_id.get(section['block_id'])
+        if block is None:
+            continue
+        row = counts.get((section['block_id'], section['id']), {})
+        entry = {
+            'id': section['id'],
+            'name': section['name'],
+            'active_farmers': row.get('active_farmers', 0),
+            'total_plots': row.get('total_plots', 0),
+        }
+        block['sections'].append(entry)
+
+    # Block totals also cover farmers whose section sits in another block.
+    for (block_id, _), row in counts.items():
+        block = by_id.get(block_id)
+        if block is not None:
+            block['active_farmers'] += row['active_farmers']
+            block['total_plots'] += row['total_plots']
+
+    return {
+        'locations': reference.locations,
+        'blocks': blocks,
+        'totals': {
+            'active_farmers': sum(b['active_farmers'] for b in blocks),
+            'total_plots': sum(b['total_plots'] for b in blocks),
+        },
+    }
+
+
+def get_hierarchy():
+    """The stored tree, rebuilt first if it is stale or has never been built."""
+    snapshot, _ = DashboardSnapshot.objects.get_or_create(scope=HIERARCHY_SCOPE)
+    if snapshot.is_stale or snapshot.refreshed_at is None:
+        version = snapshot.dirty_version
+        snapshot.data = build_hierarchy()
+        snapshot.refreshed_version = version
+        snapshot.refreshed_at = timezone.now()
+        snapshot.save(update_fields=['data', 'refreshed_version', 'refreshed_at'])
+    return snapshot
+
+
+def _bump_dirty():
+    DashboardSnapshot.objects.filter(scope=HIERARCHY_SCOPE).update(
+        dirty_version=F('dirty_version') + 1
+    )
+
+
+def mark_dirty():
+    """Flag the tree stale once the current transaction commits, off the writer's lock."""
+    transaction.on_commit(_bump_dirty)
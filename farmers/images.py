@@ -0,0 +1,110 @@
+"""
+Resized derivatives of farmer photos.
+
+Each photo gets a small thumbnail, a medium JPEG and a medium WebP, stored
+in the blob storage and served from /media/blobs/ like the photo itself.
+A derivative's blob name is an HMAC (keyed with SECRET_KEY) of the photo's
+name and the variant's settings, so it is found without a lookup table and
+is no easier to guess than the photo's own hash name. They are generated in
+a background thread when a photo is uploaded
+(``FARMER_PHOTO_EAGER_DERIVATIVES``), by ``FarmerPhotoAPIView`` on first
+request, or in bulk by ``manage.py generate_photo_derivatives``.
+"""
+import logging
+import os
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.crypto import salted_hmac
+
+from limphasaScheme.storage import blob_name, blob_storage
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_SALT = "farmers.images.derivative"
+
+DERIVATIVES = {
+    'thumbnail': {'size': (128, 128), 'format': 'JPEG', 'ext': 'jpg', 'quality': 80},
+    'medium': {'size': (640, 640), 'format': 'JPEG', 'ext': 'jpg', 'quality': 82},
+    'webp': {'size': (640, 640), 'format': 'WEBP', 'ext': 'webp', 'quality': 80},
+}
+
+# Derivative names already seen on disk, so serializing a list does not stat
+# every file on every request.
+_known = set()
+
+
+def derivative_name(image_name, variant):
+    spec = DERIVATIVES[variant]
+    key = salted_hmac(
+        DERIVATIVE_SALT, f"{image_name}:{variant}:{sorted(spec.items())}", algorithm='sha256'
+    ).hexdigest()
+    return blob_name(key, f".{spec['ext']}")
+
+
+def derivative_exists(image_name, variant):
+    name = derivative_name(image_name, variant)
+    if name in _known:
+        return True
+    if blob_storage().exists(name):
+        _known.add(name)
+        return True
+    return False
+
+
+def delete_derivatives(image_name):
+    storage = blob_storage()
+    for variant in DERIVATIVES:
+        name = derivative_name(image_name, variant)
+        _known.discard(name)
+        if storage.exists(name):
+            os.unlink(storage.path(name))
+
+
+def generate_derivatives(image_name, variants=None, overwrite=False):
+    """Render the requested variants of a stored photo; returns their names."""
+    from PIL import Image, ImageOps
+
+    variants = variants or list(DERIVATIVES)
+    pending = [v for v in variants if overwrite or not derivative_exists(image_name, v)]
+    if not pending:
+        return [derivative_name(image_name, v) for v in variants]
+
+    storage = blob_storage()
+    with storage.open(image_name, 'rb') as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original.load()
+
+    names = []
+    for variant in pending:
+        spec = DERIVATIVES[variant]
+        image = original.copy()
+        image.thumbnail(spec['size'])
+        if spec['format'] == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        buffer = BytesIO()
+        image.save(buffer, spec['format'], quality=spec['quality'], optimize=True)
+
+        name = storage.save_as(derivative_name(image_name, variant), buffer.getvalue())
+        _known.add(name)
+        names.append(name)
+    return names
+
+
+def generate_in_background(image_name):
+    def run():
+        try:
+            generate_derivatives(image_name, overwrite=True)
+        except Exception as e:
+            logger.error(f"Error generating derivatives for {image_name}: {e}")
+        finally:
+            close_old_connections()
+
+    threading.Thread(target=run, name="farmer-photo-derivatives", daemon=True).start()
+
+
+def eager_derivatives_enabled():
+    return getattr(settings, 'FARMER_PHOTO_EAGER_DERIVATIVES', True)
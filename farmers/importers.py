@@ -0,0 +1,282 @@
+"""
+Bulk farmer import from CSV or XLSX files.
+
+Rows are streamed from the file, validated in memory against a one-off
+snapshot of locations, blocks and sections, checked against the database a
+chunk at a time and inserted with ``bulk_create``. Invalid rows are skipped
+and reported back with their row number instead of aborting the import.
+"""
+import csv
+import io
+import logging
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .models import Farmer
+from .reference import reference_data
+from .registration import registration_numbers
+from .search import index_farmers
+from .dashboard import mark_dirty
+from . import hierarchy
+from payments.balances import open_balances
+from accounts import scopes
+from attendance import rates
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+REQUIRED_COLUMNS = {
+    'first_name', 'last_name', 'gender', 'phone_number',
+    'number_of_plots', 'amount_per_plot', 'location', 'block', 'section',
+}
+OPTIONAL_COLUMNS = {'middle_name', 'email', 'role', 'next_of_kin'}
+
+# Model fields cleaned with their own validators (regex, choices, lengths).
+CLEANED_FIELDS = [
+    'first_name', 'last_name', 'middle_name', 'gender', 'phone_number',
+    'email', 'number_of_plots', 'amount_per_plot', 'role', 'next_of_kin',
+]
+
+
+class ImportFormatError(Exception):
+    """The uploaded file cannot be read as a farmer sheet."""
+
+
+def _normalize_header(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def _normalize_name(value):
+    return str(value).strip().lower()
+
+
+def _check_columns(header):
+    missing = REQUIRED_COLUMNS - set(header)
+    if missing:
+        raise ImportFormatError(f"Missing columns: {', '.join(sorted(missing))}")
+
+
+def iter_csv_rows(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text)
+    try:
+        header = [_normalize_header(h) for h in next(reader)]
+    except StopIteration:
+        raise ImportFormatError("The file is empty.")
+    _check_columns(header)
+    for row in reader:
+        if any(cell.strip() for cell in row):
+            yield dict(zip(header, row))
+    text.detach()
+
+
+def iter_xlsx_rows(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("XLSX import requires the openpyxl package.")
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        try:
+            header = [_normalize_header(h) for h in next(rows)]
+        except StopIteration:
+            raise ImportFormatError("The file is empty.")
+        _check_columns(header)
+        for row in rows:
+            if any(cell not in (None, '') for cell in row):
+                yield {
+                    key: '' if value is None else value
+                    for key, value in zip(header, row)
+                }
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj, filename):
+    """Yield one dict per data row, keyed by normalized column names."""
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return iter_csv_rows(fileobj)
+    if name.endswith('.xlsx'):
+        return iter_xlsx_rows(fileobj)
+    raise ImportFormatError("Unsupported file type; upload a .csv or .xlsx file.")
+
+
+class ReferenceLookup:
+    """In-memory name/id lookup for locations, blocks and sections."""
+
+    def __init__(self):
+        snapshot = reference_data.snapshot()
+
+        self.locations = {}
+        for row in snapshot.locations:
+            self.locations[_normalize_name(row['name'])] = row['id']
+            self.locations[str(row['id'])] = row['id']
+
+        self.blocks = {}
+        for row in snapshot.blocks:
+            self.blocks[_normalize_name(row['name'])] = row['id']
+            self.blocks[str(row['id'])] = row['id']
+
+        self.sections = {}
+        for row in snapshot.sections:
+            self.sections[(row['block_id'], _normalize_name(row['name']))] = row['id']
+            self.sections[(row['block_id'], str(row['id']))] = row['id']
+
+    def resolve(self, row, errors):
+        location_id = self.locations.get(_normalize_name(row.get('location', '')))
+        block_id = self.blocks.get(_normalize_name(row.get('block', '')))
+        section_id = None
+
+        if location_id is None:
+            errors['location'] = ["Unknown location."]
+        if block_id is None:
+            errors['block'] = ["Unknown block."]
+        else:
+            section_id = self.sections.get((block_id, _normalize_name(row.get('section', ''))))
+            if section_id is None:
+                errors['section'] = ["This section does not belong to the selected block."]
+        return location_id, block_id, section_id
+
+
+class FarmerImporter:
+    """
+    Validate and insert farmer rows in chunks.
+
+    ``run()`` returns a report::
+
+        {"total_rows": 3, "created": 2, "failed": 1, "dry_run": False,
+         "errors": [{"row": 4, "errors": {"phone_number": ["..."]}}]}
+
+    Row numbers match the spreadsheet, so the header is row 1.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.lookup = ReferenceLookup()
+        self.seen_phones = set()
+        self.chaired_blocks = set(
+            Farmer.objects.filter(role='chairperson', is_active=True)
+            .values_list('block_id', flat=True)
+        )
+        self.report = {
+            'total_rows': 0, 'created': 0, 'failed': 0,
+            'dry_run': dry_run, 'errors': [],
+        }
+
+    def run(self, rows):
+        chunk = []
+        for row_number, row in enumerate(rows, start=2):
+            self.report['total_rows'] += 1
+            farmer = self.build_farmer(row_number, row)
+            if farmer is not None:
+                chunk.append((row_number, farmer))
+            if len(chunk) >= self.chunk_size:
+                self.flush(chunk)
+                chunk = []
+        if chunk:
+            self.flush(chunk)
+        self.report['errors'].sort(key=lambda error: error['row'])
+        return self.report
+
+    def add_error(self, row_number, errors):
+        self.report['failed'] += 1
+        self.report['errors'].append({'row': row_number, 'errors': errors})
+
+    def build_farmer(self, row_number, row):
+        errors = {}
+        values = {}
+
+        for name in CLEANED_FIELDS:
+            field = Farmer._meta.get_field(name)
+            raw = row.get(name, '')
+            if isinstance(raw, str):
+                raw = raw.strip()
+            if raw in ('', None):
+                raw = field.get_default() if field.has_default() else (None if field.null else '')
+            elif name == 'phone_number':
+                raw = str(raw)
+            try:
+                values[name] = field.clean(raw, None)
+            except ValidationError as e:
+                errors[name] = e.messages
+
+        location_id, block_id, section_id = self.lookup.resolve(row, errors)
+
+        phone = values.get('phone_number')
+        if phone and 'phone_number' not in errors:
+            if phone in self.seen_phones:
+                errors['phone_number'] = ["Duplicate phone number in this file."]
+            else:
+                self.seen_phones.add(phone)
+
+        if values.get('role') == 'chairperson' and block_id is not None:
+            if block_id in self.chaired_blocks:
+                errors['role'] = ["This block already has a chairperson."]
+            else:
+                self.chaired_blocks.add(block_id)
+
+        if errors:
+            self.add_error(row_number, errors)
+            return None
+
+        farmer = Farmer(
+            location_id=location_id, block_id=block_id, section_id=section_id,
+            **values
+        )
+        farmer.total_amount = farmer.number_of_plots * farmer.amount_per_plot
+        return farmer
+
+    def flush(self, chunk):
+        existing = set(
+            Farmer.objects.filter(
+                phone_number__in=[farmer.phone_number for _, farmer in chunk]
+            ).values_list('phone_number', flat=True)
+        )
+        valid = []
+        for row_number, farmer in chunk:
+            if farmer.phone_number in existing:
+                self.add_error(row_number, {
+                    'phone_number': ["A farmer with this phone number already exists."]
+                })
+            else:
+                valid.append((row_number, farmer))
+
+        if not valid:
+            return
+        if self.dry_run:
+            self.report['created'] += len(valid)
+            return
+
+        numbers = registration_numbers.reserve(len(valid))
+        for (_, farmer), number in zip(valid, numbers):
+            farmer.registration_number = number
+            farmer.search_text = farmer.build_search_text()
+
+        try:
+            with transaction.atomic():
+                created = Farmer.objects.bulk_create([farmer for _, farmer in valid])
+                index_farmers(created)
+                open_balances(created)
+            mark_dirty({farmer.block_id for farmer in created})
+            scopes.invalidate_blocks({farmer.block_id for farmer in created})
+            rates.invalidate({farmer.block_id for farmer in created})
+            hierarchy.mark_dirty()
+            self.report['created'] += len(valid)
+        except IntegrityError as e:
+            # Something raced us (e.g. a phone number registered meanwhile):
+            # retry row by row so one bad row does not sink the whole chunk.
+            logger.warning(f"Bulk insert failed, retrying chunk row by row: {e}")
+            for row_number, farmer in valid:
+                farmer.pk = None
+                try:
+                    with transaction.atomic():
+                        farmer.save()
+                    self.report['created'] += 1
+                except IntegrityError as row_error:
+                    self.add_error(row_number, {'non_field_errors': [str(row_error)]})
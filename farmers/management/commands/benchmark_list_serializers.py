@@ -0,0 +1,151 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from attendance.models import Attendance, AttendanceMark, AttendanceSession
+from attendance.serializers import AttendanceSerializer, LeanAttendanceSerializer
+from discipline.models import DisciplineCase
+from discipline.serializers import DisciplineCaseSerializer, LeanDisciplineCaseSerializer
+from farmers.models import Location, Block, Section, Farmer
+from farmers.serializers import FarmerSerializer, LeanFarmerSerializer
+from payments.models import Payment
+from payments.serializers import PaymentSerializer, LeanPaymentSerializer
+
+BENCH_PREFIX = "BENCH"
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the ModelSerializer and values()-based list serializers on "
+        "synthetic farmers, payments, attendance and discipline cases. The "
+        "rows are created in a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=1,
+                            help="Runs per measurement; the fastest is reported.")
+
+    def handle(self, *args, **options):
+        sizes = sorted(options['sizes'])
+        try:
+            with transaction.atomic():
+                self.populate(sizes[-1])
+                self.run(sizes, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    # -- data -------------------------------------------------------------
+
+    def populate(self, count):
+        self.stdout.write(f"Creating {count} rows per model...")
+        location = Location.objects.create(name=f"{BENCH_PREFIX} location")
+        block = Block.objects.create(name=f"{BENCH_PREFIX} block")
+        section = Section.objects.create(name=f"{BENCH_PREFIX} section", block=block)
+        user = get_user_model().objects.create(
+            username=f"{BENCH_PREFIX.lower()}-user", first_name="Bench", last_name="User", role='admin'
+        )
+        self.user = user
+
+        Farmer.objects.bulk_create([
+            Farmer(
+                first_name=f"First{n}", last_name=f"Last{n}", gender='female',
+                phone_number=f"+999{n:09d}", registration_number=f"{BENCH_PREFIX}{n:07d}",
+                number_of_plots=1 + n % 4, amount_per_plot='12500.50', total_amount=0,
+                location=location, block=block, section=section,
+            )
+            for n in range(count)
+        ], batch_size=2000)
+        farmers = list(Farmer.objects.filter(
+            registration_number__startswith=BENCH_PREFIX
+        ).order_by('id').values_list('id', flat=True))
+
+        today = timezone.now().date()
+        Payment.objects.bulk_create([
+            Payment(
+                farmer_id=pk, amount='2500.00', payment_type='plot_fee', description="Bench",
+                date_paid=today, method='cash', recorded_by=user, is_verified=n % 2 == 0,
+            )
+            for n, pk in enumerate(farmers)
+        ], batch_size=2000)
+        session = AttendanceSession.objects.create(
+            block=block, section=section, date=today,
+            attendance_type='general_assembly', recorded_by=user,
+        )
+        AttendanceMark.objects.bulk_create([
+            AttendanceMark(session=session, farmer_id=pk, status='present')
+            for pk in farmers
+        ], batch_size=2000)
+        DisciplineCase.objects.bulk_create([
+            DisciplineCase(
+                farmer_id=pk, block=block, section=section, offence_type='absence',
+                offence_description="Bench", reported_by=user, evidence=[],
+            )
+            for pk in farmers
+        ], batch_size=2000)
+        self.first_farmer = farmers[0]
+
+    # -- measuring --------------------------------------------------------
+
+    def cases(self):
+        request = Request(APIRequestFactory().get('/', HTTP_HOST='localhost'))
+        request.user = self.user
+        with_request = {'request': request}
+        first = self.first_farmer
+        return [
+            ('farmers', Farmer.objects.filter(pk__gte=first).select_related('location', 'block', 'section'),
+             FarmerSerializer, LeanFarmerSerializer, {}),
+            ('payments', Payment.objects.filter(farmer_id__gte=first).select_related(
+                'farmer__location', 'farmer__block', 'farmer__section', 'recorded_by', 'verified_by'),
+             PaymentSerializer, LeanPaymentSerializer, with_request),
+            ('attendance', Attendance.objects.filter(farmer_id__gte=first).select_related(
+                'farmer__location', 'farmer__block', 'farmer__section', 'block', 'section', 'recorded_by'),
+             AttendanceSerializer, LeanAttendanceSerializer, {}),
+            ('discipline', DisciplineCase.objects.filter(farmer_id__gte=first).select_related(
+                'farmer', 'block', 'section__block', 'reported_by', 'resolved_by'),
+             DisciplineCaseSerializer, LeanDisciplineCaseSerializer, with_request),
+        ]
+
+    def timed(self, repeat, fn):
+        best, result = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def run(self, sizes, repeat):
+        renderer = JSONRenderer()
+        self.stdout.write(f"{'list':<12}{'rows':>8}{'model (s)':>12}{'lean (s)':>12}{'speedup':>10}  identical")
+        for name, queryset, model_serializer, lean_serializer, context in self.cases():
+            queryset = queryset.order_by('id')
+            for size in sizes:
+                def model_path():
+                    rows = list(queryset[:size])
+                    return renderer.render(model_serializer(rows, many=True, context=context).data)
+
+                def lean_path():
+                    serializer = lean_serializer(context)
+                    rows = list(serializer.values(queryset)[:size])
+                    return renderer.render(serializer.many(rows))
+
+                model_time, model_bytes = self.timed(repeat, model_path)
+                lean_time, lean_bytes = self.timed(repeat, lean_path)
+                identical = model_bytes == lean_bytes
+                line = (
+                    f"{name:<12}{size:>8}{model_time:>12.3f}{lean_time:>12.3f}"
+                    f"{model_time / lean_time:>9.1f}x  {'yes' if identical else 'NO'}"
+                )
+                self.stdout.write(line if identical else self.style.ERROR(line))
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import time
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from farmers.images import DERIVATIVES, delete_derivatives, derivative_name
+from limphasaScheme.storage import BLOB_DIR, blob_extension, blob_name, blob_storage, is_blob_name
+
+# (app label, model, file field) stored in the blob storage
+MEDIA_FIELDS = [
+    ('farmers', 'Farmer', 'image'),
+    ('payments', 'Payment', 'attachment'),
+    ('attendance', 'AttendanceMark', 'evidence'),
+    ('discipline', 'DisciplineCase', 'attachment'),
+]
+
+# Interrupted uploads older than this are removed by --prune
+STALE_UPLOAD_SECONDS = 3600
+
+
+class Command(BaseCommand):
+    help = (
+        "Move uploaded files saved under their upload paths into the "
+        "content-addressed blob storage, storing identical files once, and "
+        "point the rows at the blobs. --prune also removes unreferenced blobs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Hash the files and report, without moving anything")
+        parser.add_argument('--keep-originals', action='store_true',
+                            help="Leave the old files in place after moving")
+        parser.add_argument('--prune', action='store_true',
+                            help="Delete blobs no row refers to")
+
+    def handle(self, *args, **options):
+        self.storage = blob_storage()
+        self.dry_run = options['dry_run']
+        self.keep_originals = options['keep_originals']
+        self.blobs = {}  # old name -> blob name
+        self.seen = set()
+        self.stats = {'files': 0, 'missing': 0, 'bytes': 0, 'duplicate_bytes': 0}
+
+        for app_label, model_name, field_name in MEDIA_FIELDS:
+            model = apps.get_model(app_label, model_name)
+            moved = self.move_field(model, field_name)
+            self.stdout.write(f"{model_name}.{field_name}: {moved} rows")
+
+        stats = self.stats
+        verb = "would move" if self.dry_run else "moved"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {stats['files']} files into {len(self.seen)} blobs, "
+            f"{stats['duplicate_bytes']} of {stats['bytes']} bytes were duplicates; "
+            f"{stats['missing']} files missing."
+        ))
+        if options['prune']:
+            self.prune()
+
+    def move_field(self, model, field_name):
+        rows = (
+            model.objects.exclude(**{f'{field_name}__isnull': True})
+            .exclude(**{field_name: ''})
+            .exclude(**{f'{field_name}__startswith': f'{BLOB_DIR}/'})
+            .values_list('pk', field_name)
+            .order_by('pk')
+        )
+        by_blob = {}
+        for pk, name in rows.iterator(chunk_size=1000):
+            blob = self.blobs.get(name) or self.store(name)
+            if blob is not None:
+                by_blob.setdefault(blob, []).append((pk, name))
+
+        count = 0
+        for blob, entries in by_blob.items():
+            count += len(entries)
+            if self.dry_run:
+                continue
+            model.objects.filter(pk__in=[pk for pk, _ in entries]).update(**{field_name: blob})
+            if not self.keep_originals:
+                for _, name in entries:
+                    self.remove_original(model, name)
+        return count
+
+    def store(self, name):
+        if not default_storage.exists(name):
+            self.stderr.write(f"Missing file: {name}")
+            self.stats['missing'] += 1
+            return None
+
+        with default_storage.open(name, 'rb') as source:
+            if self.dry_run:
+                digest = hashlib.sha256()
+                for chunk in File(source).chunks():
+                    digest.update(chunk)
+                blob = blob_name(digest.hexdigest(), blob_extension(name))
+            else:
+                blob = self.storage.save(name, File(source, name=name))
+        size = default_storage.size(name)
+        self.stats['files'] += 1
+        self.stats['bytes'] += size
+        if blob in self.seen:
+            self.stats['duplicate_bytes'] += size
+        self.seen.add(blob)
+        self.blobs[name] = blob
+        return blob
+
+    def remove_original(self, model, name):
+        if not default_storage.exists(name):
+            return
+        default_storage.delete(name)
+        if model._meta.label == 'farmers.Farmer':
+            # Derivatives are keyed by the photo name; new ones render on demand
+            delete_derivatives(name)
+
+    def prune(self):
+        referenced = set()
+        for app_label, model_name, field_name in MEDIA_FIELDS:
+            model = apps.get_model(app_label, model_name)
+            names = model.objects.filter(**{f'{field_name}__startswith': f'{BLOB_DIR}/'}).values_list(
+                field_name, flat=True
+            )
+            for name in names.iterator(chunk_size=1000):
+                referenced.add(name)
+                if model._meta.label == 'farmers.Farmer':
+                    referenced.update(derivative_name(name, variant) for variant in DERIVATIVES)
+
+        root = self.storage.path(BLOB_DIR)
+        removed = 0
+        now = time.time()
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.storage.location).replace(os.sep, '/')
+                if filename.startswith('.upload-'):
+                    stale = now - os.path.getmtime(path) > STALE_UPLOAD_SECONDS
+                elif is_blob_name(name):
+                    stale = name not in referenced
+                else:
+                    continue
+                if stale:
+                    removed += 1
+                    if not self.dry_run:
+                        os.unlink(path)
+        verb = "would remove" if self.dry_run else "removed"
+        self.stdout.write(self.style.SUCCESS(f"Prune: {verb} {removed} unreferenced blobs."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from farmers.exports import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, stream_farmers
+from farmers.filters import filter_farmers
+from farmers.models import Farmer
+
+
+class Command(BaseCommand):
+    help = "Export farmers to a CSV or XLSX file (format taken from the extension)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Output .csv or .xlsx file")
+        parser.add_argument('--block', help="Block ID")
+        parser.add_argument('--section', dest='section_id', help="Section ID")
+        parser.add_argument('--location', dest='location_id', help="Location ID")
+        parser.add_argument('--search', help="Free-text search term")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_type = path.rsplit('.', 1)[-1].lower()
+        if file_type not in EXPORT_FORMATS:
+            raise CommandError("The output file must end in .csv or .xlsx.")
+
+        queryset = filter_farmers(Farmer.objects.all(), options)
+        try:
+            with open(path, 'wb') as fileobj:
+                for chunk in stream_farmers(queryset, file_type, options['chunk_size']):
+                    fileobj.write(chunk)
+        except OSError as e:
+            raise CommandError(f"Cannot write {path}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"Exported farmers to {path}."))
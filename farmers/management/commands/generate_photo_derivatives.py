@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from farmers.images import generate_derivatives
+from farmers.models import Farmer
+
+
+class Command(BaseCommand):
+    help = "Render thumbnail/medium/webp derivatives for existing farmer photos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--overwrite', action='store_true', help="Re-render existing derivatives")
+
+    def handle(self, *args, **options):
+        done = failed = 0
+        photos = Farmer.objects.exclude(image='').exclude(image__isnull=True)
+        for pk, image in photos.values_list('id', 'image').iterator():
+            try:
+                generate_derivatives(image, overwrite=options['overwrite'])
+                done += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Farmer {pk} ({image}): {e}")
+        self.stdout.write(self.style.SUCCESS(f"{done} photos processed, {failed} failed."))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from farmers.importers import DEFAULT_CHUNK_SIZE, FarmerImporter, ImportFormatError, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Import farmers from a CSV or XLSX file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path to a .csv or .xlsx file")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Validate without saving")
+
+    def handle(self, *args, **options):
+        importer = FarmerImporter(chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                report = importer.run(iter_rows(fileobj, options['path']))
+        except OSError as e:
+            raise CommandError(f"Cannot open {options['path']}: {e}")
+        except ImportFormatError as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            messages = "; ".join(
+                f"{field}: {' '.join(msgs)}" for field, msgs in error['errors'].items()
+            )
+            self.stderr.write(f"Row {error['row']}: {messages}")
+
+        verb = "would be created" if report['dry_run'] else "created"
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['total_rows']} rows read, {report['created']} {verb}, "
+            f"{report['failed']} failed."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from farmers.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Recompute farmer search text and reload the search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        updated = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Search index rebuilt ({updated} farmers had stale search text)."
+        ))
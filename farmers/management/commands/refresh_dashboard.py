@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from farmers.dashboard import refresh_dirty, refresh_scope
+from farmers.models import Block
+
+
+class Command(BaseCommand):
+    help = "Recompute stale dashboard snapshots (or all of them with --all)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Refresh every scope")
+        parser.add_argument('--watch', action='store_true', help="Keep refreshing stale scopes")
+        parser.add_argument('--interval', type=int, default=30, help="Seconds between --watch passes")
+
+    def handle(self, *args, **options):
+        if options['all']:
+            refresh_scope()
+            for block_id in Block.objects.values_list('id', flat=True):
+                refresh_scope(block_id)
+            self.stdout.write(self.style.SUCCESS("Refreshed all dashboard scopes."))
+
+        while True:
+            refreshed = refresh_dirty()
+            if refreshed:
+                self.stdout.write(f"Refreshed: {', '.join(refreshed)}")
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
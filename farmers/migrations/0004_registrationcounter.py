@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-18 13:46
+
+import re
+
+from django.db import migrations, models
+
+SEQUENCE_NAME = 'farmers_registration_number_seq'
+
+
+def current_max_number(Farmer):
+    highest = 0
+    for number in Farmer.objects.values_list('registration_number', flat=True):
+        match = re.match(r'^LRS(\d+)$', number or '')
+        if match:
+            highest = max(highest, int(match.group(1)))
+    max_id = Farmer.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    return max(highest, max_id)
+
+
+def seed_counter(apps, schema_editor):
+    Farmer = apps.get_model('farmers', 'Farmer')
+    RegistrationCounter = apps.get_model('farmers', 'RegistrationCounter')
+    highest = current_max_number(Farmer)
+    RegistrationCounter.objects.update_or_create(
+        name='registration_number', defaults={'last_value': highest}
+    )
+
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f"CREATE SEQUENCE IF NOT EXISTS {SEQUENCE_NAME}")
+        if highest:
+            schema_editor.execute("SELECT setval(%s, %s)", [SEQUENCE_NAME, highest])
+
+
+def drop_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f"DROP SEQUENCE IF EXISTS {SEQUENCE_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0003_remove_block_created_at_remove_block_is_active_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistrationCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counter, drop_sequence),
+    ]
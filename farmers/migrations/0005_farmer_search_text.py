@@ -0,0 +1,71 @@
+# Generated by Django 5.2 on 2026-10-18 13:48
+
+import sqlite3
+
+from django.db import migrations, models
+
+FTS_TABLE = 'farmers_farmer_fts'
+TRIGRAM_INDEX = 'farmers_farmer_search_trgm'
+
+
+def backfill_search_text(apps, schema_editor):
+    Farmer = apps.get_model('farmers', 'Farmer')
+    batch = []
+    for farmer in Farmer.objects.only(
+        'first_name', 'middle_name', 'last_name', 'phone_number', 'registration_number'
+    ).iterator(chunk_size=1000):
+        parts = [
+            farmer.first_name, farmer.middle_name, farmer.last_name,
+            farmer.phone_number, farmer.registration_number,
+        ]
+        farmer.search_text = " ".join(p for p in parts if p).lower()[:255]
+        batch.append(farmer)
+        if len(batch) >= 1000:
+            Farmer.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    if batch:
+        Farmer.objects.bulk_update(batch, ['search_text'])
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} "
+            f"ON farmers_farmer USING gin (search_text gin_trgm_ops)"
+        )
+    elif vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0):
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5(search_text, tokenize='trigram')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, search_text) "
+            f"SELECT id, search_text FROM farmers_farmer"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f"DROP INDEX IF EXISTS {TRIGRAM_INDEX}")
+    elif vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0004_registrationcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='farmer',
+            name='search_text',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
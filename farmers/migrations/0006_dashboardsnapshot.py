@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-18 13:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0005_farmer_search_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=30, unique=True)),
+                ('data', models.JSONField(default=dict)),
+                ('dirty_version', models.PositiveBigIntegerField(default=0)),
+                ('refreshed_version', models.PositiveBigIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('block', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='farmers.block')),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 14:14
+
+import django.core.validators
+import limphasaScheme.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0007_referencedataversion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='farmer',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=limphasaScheme.storage.blob_storage, upload_to='farmer_photos/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png'])]),
+        ),
+    ]
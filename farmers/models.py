@@ -1,7 +1,7 @@
 from django.db import models
 from django.core.validators import MinValueValidator, RegexValidator, FileExtensionValidator
 from django.core.exceptions import ValidationError
-from django.db.models import Max
+from limphasaScheme.storage import blob_storage
 import logging
 
 logger = logging.getLogger(__name__)
@@ -40,6 +40,34 @@ class Section(models.Model):
         return f"{self.block.name} - {self.name}"
 
 
+# -------------------
+# Reference Data Version Model
+# -------------------
+class ReferenceDataVersion(models.Model):
+    """
+    Single row bumped on every Location/Block/Section write, so each process
+    can tell when its cached copy of the reference tables is out of date
+    (see farmers.reference).
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Reference data v{self.version}"
+
+
+# -------------------
+# Registration Counter Model
+# -------------------
+class RegistrationCounter(models.Model):
+    """Last number handed out for a named series (see farmers.registration)."""
+    name = models.CharField(max_length=50, unique=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
+
+
 # -------------------
 # Farmer Model
 # -------------------
@@ -90,6 +118,7 @@ class Farmer(models.Model):
     next_of_kin = models.CharField(max_length=100, blank=True, null=True)
     image = models.ImageField(
         upload_to="farmer_photos/",
+        storage=blob_storage,
         blank=True,
         null=True,
         validators=[FileExtensionValidator(allowed_extensions=["jpg", "jpeg", "png"])]
@@ -99,6 +128,10 @@ class Farmer(models.Model):
     is_active = models.BooleanField(default=True)
     date_registered = models.DateTimeField(auto_now_add=True)
 
+    # Lower-cased names, phone and registration number; indexed for search
+    # (see farmers.search)
+    search_text = models.CharField(max_length=255, blank=True, default='', editable=False)
+
     class Meta:
         ordering = ['-date_registered']
         permissions = [
@@ -123,14 +156,50 @@ class Farmer(models.Model):
             if exists:
                 raise ValidationError("This block already has a chairperson.")
 
+    def build_search_text(self):
+        parts = [
+            self.first_name, self.middle_name, self.last_name,
+            self.phone_number, self.registration_number,
+        ]
+        return " ".join(p for p in parts if p).lower()[:255]
+
     def save(self, *args, **kwargs):
         if not self.registration_number:
-            max_id = Farmer.objects.aggregate(max_id=Max('id'))['max_id'] or 0
-            self.registration_number = f"LRS{(max_id + 1):05d}"
-        
+            from .registration import registration_numbers
+            self.registration_number = registration_numbers.next_number()
+
         self.total_amount = self.number_of_plots * self.amount_per_plot
+        self.search_text = self.build_search_text()
         super().save(*args, **kwargs)
 
     def delete(self):
         self.is_active = False
         self.save()
+
+
+# -------------------
+# Dashboard Snapshot Model
+# -------------------
+class DashboardSnapshot(models.Model):
+    """
+    Precomputed dashboard stats for one scope: the whole scheme or a block
+    (see farmers.dashboard), plus the block/section tree (farmers.hierarchy).
+    Writes bump ``dirty_version``; a refresh stores the version it computed
+    from, so the snapshot is stale while ``dirty_version > refreshed_version``.
+    """
+    SCHEME_SCOPE = "scheme"
+    HIERARCHY_SCOPE = "hierarchy"
+
+    scope = models.CharField(max_length=30, unique=True)
+    block = models.ForeignKey(Block, on_delete=models.CASCADE, null=True, blank=True)
+    data = models.JSONField(default=dict)
+    dirty_version = models.PositiveBigIntegerField(default=0)
+    refreshed_version = models.PositiveBigIntegerField(default=0)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Dashboard snapshot ({self.scope})"
+
+    @property
+    def is_stale(self):
+        return self.dirty_version > self.refreshed_version
@@ -0,0 +1,119 @@
+"""
+Process-local cache of locations, blocks and sections.
+
+These tables change a few times a season, but every form render and farmer
+write reads them. Each process keeps a snapshot tagged with the version in
+``ReferenceDataVersion``. Writes bump that version (farmers.signals). Other
+processes check it at most every ``REFERENCE_CACHE_CHECK_INTERVAL`` seconds
+and reload when it has moved. List endpoints send the version as an ETag
+so unchanged clients get a 304.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.response import Response
+
+from .models import Location, Block, Section, ReferenceDataVersion
+
+DEFAULT_CHECK_INTERVAL = 5  # seconds
+
+
+class ReferenceSnapshot:
+    def __init__(self, version, last_modified):
+        self.version = version
+        self.last_modified = last_modified
+        self.locations = list(Location.objects.order_by('id').values('id', 'name'))
+        self.blocks = list(Block.objects.order_by('id').values('id', 'name'))
+        self.sections = [
+            {'id': s['id'], 'name': s['name'], 'block_id': s['block_id'], 'block_name': s['block__name']}
+            for s in Section.objects.order_by('id').values('id', 'name', 'block_id', 'block__name')
+        ]
+        self.by_model = {
+            Location: {row['id']: row for row in self.locations},
+            Block: {row['id']: row for row in self.blocks},
+            Section: {row['id']: row for row in self.sections},
+        }
+
+    def get(self, model, pk):
+        return self.by_model[model].get(pk)
+
+    def instance(self, model, pk):
+        """A model instance built from the cache without a query, or None."""
+        row = self.get(model, pk)
+        if row is None:
+            return None
+        if model is Section:
+            return Section.from_db('default', ['id', 'name', 'block_id'], [row['id'], row['name'], row['block_id']])
+        return model.from_db('default', ['id', 'name'], [row['id'], row['name']])
+
+    def sections_for_block(self, block_id):
+        return [s for s in self.sections if str(s['block_id']) == str(block_id)]
+
+
+class ReferenceCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    def check_interval(self):
+        return getattr(settings, 'REFERENCE_CACHE_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL)
+
+    def _db_version(self):
+        row, _ = ReferenceDataVersion.objects.get_or_create(pk=1)
+        return row.version, row.updated_at
+
+    def snapshot(self, fresh=False):
+        """Current snapshot; ``fresh`` re-checks the version regardless of the interval."""
+        with self._lock:
+            now = time.monotonic()
+            snapshot = self._snapshot
+            if snapshot is not None and not fresh and now - self._checked_at < self.check_interval():
+                return snapshot
+            version, updated_at = self._db_version()
+            self._checked_at = now
+            if snapshot is None or snapshot.version != version:
+                snapshot = self._snapshot = ReferenceSnapshot(version, updated_at)
+            return snapshot
+
+    def bump(self):
+        with transaction.atomic():
+            ReferenceDataVersion.objects.get_or_create(pk=1)
+            ReferenceDataVersion.objects.filter(pk=1).update(
+                version=F('version') + 1, updated_at=timezone.now()
+            )
+        with self._lock:
+            self._snapshot = None
+
+
+reference_data = ReferenceCache()
+
+
+def reference_response(request, snapshot, key, payload):
+    """Response for a reference list with ETag/Last-Modified, or a bare 304."""
+    return conditional_response(
+        request, f'"ref-{snapshot.version}-{key}"', snapshot.last_modified, payload
+    )
+
+
+def conditional_response(request, etag, last_modified, payload):
+    """Response carrying ``etag``; a bare 304 when the client already has it."""
+    last_modified = int(last_modified.timestamp())
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        not_modified = etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    else:
+        since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        not_modified = since is not None and since >= last_modified
+
+    response = Response(status=304) if not_modified else Response(payload)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,110 @@
+"""
+Registration number allocation for farmers.
+
+Numbers look like ``LRS00042``. On PostgreSQL they are drawn from a database
+sequence, which never blocks and is not rolled back with the caller's
+transaction, so each worker can safely keep a small pool of numbers in memory.
+Other backends fall back to the ``RegistrationCounter`` row, locked with
+SELECT ... FOR UPDATE and reserved inside the caller's transaction.
+"""
+import re
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Farmer, RegistrationCounter
+
+PREFIX = "LRS"
+COUNTER_NAME = "registration_number"
+SEQUENCE_NAME = "farmers_registration_number_seq"
+DEFAULT_BLOCK_SIZE = 20
+
+NUMBER_RE = re.compile(rf"^{PREFIX}(\d+)$")
+
+
+def format_registration_number(value):
+    return f"{PREFIX}{value:05d}"
+
+
+def current_max_number():
+    """Highest number already in use, from registration numbers or row ids."""
+    highest = 0
+    for number in Farmer.objects.filter(
+        registration_number__startswith=PREFIX
+    ).values_list('registration_number', flat=True).iterator():
+        match = NUMBER_RE.match(number)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    max_id = Farmer.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    return max(highest, max_id)
+
+
+def uses_sequence():
+    return connection.vendor == 'postgresql'
+
+
+def _reserve_from_sequence(count):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(%s) FROM generate_series(1, %s)",
+            [SEQUENCE_NAME, count]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _reserve_from_counter(count):
+    with transaction.atomic():
+        counter = RegistrationCounter.objects.select_for_update().filter(
+            name=COUNTER_NAME
+        ).first()
+        if counter is None:
+            counter = RegistrationCounter.objects.create(
+                name=COUNTER_NAME, last_value=current_max_number()
+            )
+        start = counter.last_value + 1
+        counter.last_value += count
+        counter.save(update_fields=['last_value'])
+    return list(range(start, start + count))
+
+
+class RegistrationNumberAllocator:
+    """
+    Hands out formatted registration numbers.
+
+    With a sequence backend, numbers are fetched ``block_size`` at a time and
+    served from a per-process pool, so a registration drive costs one round
+    trip per block instead of one aggregate per farmer. Numbers left in the
+    pool when a worker exits are simply skipped.
+    """
+
+    def __init__(self, block_size=None):
+        self.block_size = block_size or getattr(
+            settings, 'REGISTRATION_NUMBER_BLOCK_SIZE', DEFAULT_BLOCK_SIZE
+        )
+        self._pool = deque()
+        self._lock = threading.Lock()
+
+    def next_number(self):
+        return self.reserve(1)[0]
+
+    def reserve(self, count):
+        """Reserve ``count`` numbers in one go (used by bulk imports)."""
+        if count < 1:
+            raise ValueError("count must be at least 1")
+
+        if not uses_sequence():
+            # Counter reservations belong to the caller's transaction, so a
+            # rollback hands them back; caching them here would not be safe.
+            return [format_registration_number(v) for v in _reserve_from_counter(count)]
+
+        with self._lock:
+            if len(self._pool) < count:
+                missing = count - len(self._pool)
+                self._pool.extend(_reserve_from_sequence(max(missing, self.block_size)))
+            values = [self._pool.popleft() for _ in range(count)]
+        return [format_registration_number(v) for v in values]
+
+
+registration_numbers = RegistrationNumberAllocator()
@@ -0,0 +1,154 @@
+"""
+Farmer search.
+
+Every farmer carries a lower-cased ``search_text`` (names, phone number and
+registration number) maintained in ``Farmer.save()``. How it is searched
+depends on the database:
+
+* PostgreSQL: a GIN ``gin_trgm_ops`` index on ``search_text`` serves both
+  substring matches and typo-tolerant word similarity, ranked by
+  ``word_similarity``.
+* SQLite: an FTS5 table with the trigram tokenizer, kept in sync from the
+  farmer signals, serves substring/prefix matches ranked by bm25.
+  There is no typo tolerance on this backend.
+* Anything else falls back to plain substring filters on ``search_text``.
+"""
+import sqlite3
+
+from django.db import connection
+from django.db.models import FloatField, IntegerField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+from .models import Farmer
+
+FTS_TABLE = 'farmers_farmer_fts'
+# The FTS5 trigram tokenizer cannot match terms shorter than this.
+MIN_TRIGRAM_LENGTH = 3
+# Scores are stored as integers so keyset pagination can compare them exactly.
+RANK_SCALE = 1000
+SEARCH_ORDERING = ('-search_rank', '-date_registered')
+
+
+def _score(expression):
+    return Cast(expression * RANK_SCALE, IntegerField())
+
+
+def normalize(term):
+    return " ".join(str(term).lower().split())
+
+
+def uses_fts():
+    return connection.vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def search_farmers(queryset, term):
+    """
+    Filter a Farmer queryset by a free-text term.
+
+    Returns the queryset annotated with an integer ``search_rank`` (higher is
+    better) and ordered by it; see ``SEARCH_ORDERING``.
+    """
+    term = normalize(term)
+    if not term:
+        return queryset
+
+    if connection.vendor == 'postgresql':
+        return _search_trigram(queryset, term)
+    if uses_fts():
+        return _search_fts(queryset, term)
+    return _search_contains(queryset, term)
+
+
+def _contains_all(tokens):
+    condition = Q()
+    for token in tokens:
+        condition &= Q(search_text__contains=token)
+    return condition
+
+
+def _search_contains(queryset, term):
+    return queryset.filter(_contains_all(term.split())).annotate(
+        search_rank=Value(0, output_field=IntegerField())
+    ).order_by(*SEARCH_ORDERING)
+
+
+def _search_trigram(queryset, term):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    return queryset.filter(
+        _contains_all(term.split()) | Q(search_text__trigram_word_similar=term)
+    ).annotate(
+        search_rank=_score(TrigramWordSimilarity(term, 'search_text'))
+    ).order_by(*SEARCH_ORDERING)
+
+
+def _search_fts(queryset, term):
+    tokens = term.split()
+    indexed = [t for t in tokens if len(t) >= MIN_TRIGRAM_LENGTH]
+    if not indexed:
+        return _search_contains(queryset, term)
+
+    match = " AND ".join('"%s"' % t.replace('"', '""') for t in indexed)
+    farmer_table = Farmer._meta.db_table
+    queryset = queryset.filter(
+        id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+    ).annotate(
+        search_rank=_score(RawSQL(
+            f"SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = {farmer_table}.id",
+            [match],
+            output_field=FloatField(),
+        ))
+    )
+    short = [t for t in tokens if len(t) < MIN_TRIGRAM_LENGTH]
+    if short:
+        queryset = queryset.filter(_contains_all(short))
+    return queryset.order_by(*SEARCH_ORDERING)
+
+
+def index_farmers(farmers):
+    """Write farmers' current search_text to the FTS table (SQLite only)."""
+    if not uses_fts():
+        return
+    rows = [(f.pk, f.search_text) for f in farmers if f.pk]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk, _ in rows])
+        cursor.executemany(f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (%s, %s)", rows)
+
+
+def unindex_farmers(farmer_ids):
+    if not uses_fts() or not farmer_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in farmer_ids])
+
+
+def rebuild_index(batch_size=1000):
+    """Recompute every farmer's search_text and reload the FTS table."""
+    batch = []
+    updated = 0
+    for farmer in Farmer.objects.only(
+        'first_name', 'middle_name', 'last_name', 'phone_number',
+        'registration_number', 'search_text',
+    ).iterator(chunk_size=batch_size):
+        text = farmer.build_search_text()
+        if text != farmer.search_text:
+            farmer.search_text = text
+            batch.append(farmer)
+        if len(batch) >= batch_size:
+            updated += Farmer.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    if batch:
+        updated += Farmer.objects.bulk_update(batch, ['search_text'])
+
+    if uses_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}(rowid, search_text) "
+                f"SELECT id, search_text FROM {Farmer._meta.db_table}"
+            )
+    return updated
@@ -1,34 +1,77 @@
 from rest_framework import serializers
 from .models import Location, Block, Section, Farmer
+from .images import derivative_exists, derivative_name
+from .reference import reference_data
+from limphasaScheme.fieldsets import SparseFieldsetMixin
+from limphasaScheme.storage import blob_storage
+from limphasaScheme.lean import Field, LeanSerializer, Method, datetime_repr, decimal_repr, file_url
+from functools import partial
 import logging
 
 logger = logging.getLogger(__name__)
 
-class LocationSerializer(serializers.ModelSerializer):
+def derivative_url(image_name, variant, request=None):
+    """
+    Stored derivative if present, otherwise the photo itself until one is
+    rendered. Both are blobs served from /media/blobs/ without a token.
+    """
+    if not image_name:
+        return None
+    if derivative_exists(image_name, variant):
+        image_name = derivative_name(image_name, variant)
+    return file_url(blob_storage(), image_name, request)
+
+class ReferenceRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field for Location/Block/Section resolved from the reference cache."""
+
+    def __init__(self, model, **kwargs):
+        self.model = model
+        if not kwargs.get('read_only'):
+            kwargs.setdefault('queryset', model.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        instance = reference_data.snapshot().instance(self.model, pk)
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instance
+
+class LocationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Location
         fields = ['id', 'name']
 
-class BlockSerializer(serializers.ModelSerializer):
+class BlockSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Block
         fields = ['id', 'name']
 
-class SectionSerializer(serializers.ModelSerializer):
+class SectionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     block_name = serializers.CharField(source='block.name', read_only=True)
+    block = ReferenceRelatedField(Block, write_only=True)
 
     class Meta:
         model = Section
         fields = ['id', 'name', 'block', 'block_name']
-        extra_kwargs = {
-            'block': {'write_only': True}  # Accept block ID on POST/PUT
-        }
 
-class FarmerSerializer(serializers.ModelSerializer):
+class FarmerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     block_name = serializers.CharField(source='block.name', read_only=True)
     section_name = serializers.CharField(source='section.name', read_only=True)
     location_name = serializers.CharField(source='location.name', read_only=True)
+    # Accept location/block/section IDs, checked against the reference cache
+    location = ReferenceRelatedField(Location, write_only=True)
+    block = ReferenceRelatedField(Block, write_only=True)
+    section = ReferenceRelatedField(Section, write_only=True)
     total_amount = serializers.SerializerMethodField()
+    image_thumbnail = serializers.SerializerMethodField()
+    image_medium = serializers.SerializerMethodField()
+    image_webp = serializers.SerializerMethodField()
 
     class Meta:
         model = Farmer
@@ -37,13 +80,10 @@ class FarmerSerializer(serializers.ModelSerializer):
             'phone_number', 'email', 'registration_number',
             'number_of_plots', 'amount_per_plot', 'total_amount',
             'role', 'location', 'block', 'section', 'date_registered',
-            'image',
+            'image', 'image_thumbnail', 'image_medium', 'image_webp',
             'block_name', 'section_name', 'location_name',
         ]
         extra_kwargs = {
-            'location': {'write_only': True},  # Accept location ID
-            'block': {'write_only': True},     # Accept block ID
-            'section': {'write_only': True},   # Accept section ID
             'registration_number': {'read_only': True},
             'date_registered': {'read_only': True},
         }
@@ -55,6 +95,18 @@ class FarmerSerializer(serializers.ModelSerializer):
             logger.error(f"Error calculating total_amount for farmer {obj.id}: {e}")
             return 0.0
 
+    def _derivative_url(self, obj, variant):
+        return derivative_url(obj.image.name, variant, self.context.get('request'))
+
+    def get_image_thumbnail(self, obj):
+        return self._derivative_url(obj, 'thumbnail')
+
+    def get_image_medium(self, obj):
+        return self._derivative_url(obj, 'medium')
+
+    def get_image_webp(self, obj):
+        return self._derivative_url(obj, 'webp')
+
     def validate(self, data):
         """Ensure section belongs to selected block"""
         block = data.get('block') or getattr(self.instance, 'block', None)
@@ -67,3 +119,50 @@ class FarmerSerializer(serializers.ModelSerializer):
             })
 
         return data
+
+
+class LeanFarmerSerializer(LeanSerializer):
+    """Read-only ``FarmerSerializer`` output built from ``values()`` rows."""
+    fields = {
+        'id': Field('id'),
+        'first_name': Field('first_name'),
+        'last_name': Field('last_name'),
+        'middle_name': Field('middle_name'),
+        'gender': Field('gender'),
+        'phone_number': Field('phone_number'),
+        'email': Field('email'),
+        'registration_number': Field('registration_number'),
+        'number_of_plots': Field('number_of_plots'),
+        'amount_per_plot': Field('amount_per_plot', partial(decimal_repr, max_digits=10, decimal_places=2)),
+        'total_amount': Method('get_total_amount', 'number_of_plots', 'amount_per_plot'),
+        'role': Field('role'),
+        'date_registered': Field('date_registered', datetime_repr),
+        'image': Method('get_image', 'image'),
+        'image_thumbnail': Method('get_image_thumbnail', 'image'),
+        'image_medium': Method('get_image_medium', 'image'),
+        'image_webp': Method('get_image_webp', 'image'),
+        'block_name': Field('block__name'),
+        'section_name': Field('section__name'),
+        'location_name': Field('location__name'),
+    }
+    ordering_columns = ('id', 'date_registered')
+    image_storage = Farmer._meta.get_field('image').storage
+
+    def get_total_amount(self, row):
+        k = self.keys
+        return float(row[k['number_of_plots']]) * float(row[k['amount_per_plot']])
+
+    def get_image(self, row):
+        return file_url(self.image_storage, row[self.keys['image']], self.request)
+
+    def _derivative_url(self, row, variant):
+        return derivative_url(row[self.keys['image']], variant, self.request)
+
+    def get_image_thumbnail(self, row):
+        return self._derivative_url(row, 'thumbnail')
+
+    def get_image_medium(self, row):
+        return self._derivative_url(row, 'medium')
+
+    def get_image_webp(self, row):
+        return self._derivative_url(row, 'webp')
@@ -0,0 +1,96 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from attendance.models import AttendanceMark
+from payments.models import Payment
+from .models import Location, Block, Section, Farmer
+from .reference import reference_data
+from accounts import scopes
+from . import dashboard, hierarchy, images, search
+
+
+@receiver(post_save, sender=Farmer)
+def index_farmer(sender, instance, **kwargs):
+    search.index_farmers([instance])
+
+
+@receiver(post_delete, sender=Farmer)
+def unindex_farmer(sender, instance, **kwargs):
+    search.unindex_farmers([instance.pk])
+
+
+@receiver(pre_save, sender=Farmer)
+def remember_previous_values(sender, instance, **kwargs):
+    instance._previous_block_id = None
+    instance._previous_image = None
+    if instance.pk:
+        previous = Farmer.objects.filter(pk=instance.pk).values('block_id', 'image').first()
+        if previous:
+            instance._previous_block_id = previous['block_id']
+            instance._previous_image = previous['image']
+
+
+# -------------------
+# Reference data cache
+# -------------------
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=Block)
+@receiver(post_delete, sender=Block)
+@receiver(post_save, sender=Section)
+@receiver(post_delete, sender=Section)
+def reference_data_changed(sender, instance, **kwargs):
+    reference_data.bump()
+    hierarchy.mark_dirty()
+    if sender is Section:
+        scopes.invalidate_blocks([instance.block_id])
+
+
+# -------------------
+# Photo derivatives
+# -------------------
+@receiver(post_save, sender=Farmer)
+def render_photo_derivatives(sender, instance, **kwargs):
+    if not instance.image or not images.eager_derivatives_enabled():
+        return
+    if instance.image.name != getattr(instance, '_previous_image', None):
+        images.generate_in_background(instance.image.name)
+
+
+# -------------------
+# Access scope invalidation
+# -------------------
+@receiver(post_save, sender=Farmer)
+def farmer_membership_changed(sender, instance, created, **kwargs):
+    previous_block_id = getattr(instance, '_previous_block_id', None)
+    if created or previous_block_id != instance.block_id:
+        scopes.invalidate_blocks([instance.block_id, previous_block_id])
+
+
+@receiver(post_delete, sender=Farmer)
+def farmer_removed(sender, instance, **kwargs):
+    scopes.invalidate_blocks([instance.block_id])
+
+
+# -------------------
+# Dashboard invalidation
+# -------------------
+
+
+@receiver(post_save, sender=Farmer)
+@receiver(post_delete, sender=Farmer)
+def farmer_changed(sender, instance, **kwargs):
+    dashboard.mark_dirty([instance.block_id, getattr(instance, '_previous_block_id', None)])
+    hierarchy.mark_dirty()
+
+
+@receiver(post_save, sender=AttendanceMark)
+@receiver(post_delete, sender=AttendanceMark)
+def attendance_changed(sender, instance, **kwargs):
+    dashboard.mark_dirty([instance.session.block_id])
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def payment_changed(sender, instance, **kwargs):
+    dashboard.mark_dirty([instance.farmer.block_id, getattr(instance, '_previous_block_id', None)])
@@ -3,7 +3,11 @@ from .views import (
     LocationAPIView,
     BlockAPIView,
     SectionAPIView,
+    HierarchyAPIView,
     FarmerAPIView,
+    FarmerImportAPIView,
+    FarmerExportAPIView,
+    FarmerPhotoAPIView,
     DashboardStatsAPIView,
    
 )
@@ -12,7 +16,11 @@ urlpatterns = [
     path('locations/', LocationAPIView.as_view(), name='location-list'),
     path('blocks/', BlockAPIView.as_view(), name='block-list'),
     path('sections/', SectionAPIView.as_view(), name='section-list'),
+    path('hierarchy/', HierarchyAPIView.as_view(), name='hierarchy'),
     path('farmers/', FarmerAPIView.as_view(), name='farmer-list'),
+    path('farmers/import/', FarmerImportAPIView.as_view(), name='farmer-import'),
+    path('farmers/export/', FarmerExportAPIView.as_view(), name='farmer-export'),
+    path('farmers/<int:pk>/photo/<str:variant>/', FarmerPhotoAPIView.as_view(), name='farmer-photo'),
     path('dashboard/stats/', DashboardStatsAPIView.as_view(), name='dashboard-stats'),
     
 ]
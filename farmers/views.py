@@ -1,17 +1,28 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import MultiPartParser, FormParser
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.db import transaction
-from django.db.models import Q, Sum, F, ExpressionWrapper, DecimalField
-from .models import Location, Block, Section, Farmer
+from .models import Block, Farmer
 from .serializers import (
     LocationSerializer, BlockSerializer,
-    SectionSerializer, FarmerSerializer
+    SectionSerializer, FarmerSerializer, LeanFarmerSerializer
 )
-from attendance.models import Attendance
-from payments.models import Payment
+from .importers import FarmerImporter, ImportFormatError, iter_rows
+from .search import SEARCH_ORDERING
+from .filters import filter_farmers
+from .exports import EXPORT_FORMATS, export_filename, stream_farmers
+from .dashboard import get_snapshot
+from .hierarchy import get_hierarchy
+from .images import DERIVATIVES, derivative_name, generate_derivatives
+from .reference import conditional_response, reference_data, reference_response
+from limphasaScheme.fieldsets import Fieldset
+from limphasaScheme.pagination import KeysetPagination
+from limphasaScheme.storage import blob_storage
+from accounts.scopes import scope_for
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,9 +37,8 @@ class LocationAPIView(APIView):
 
     def get(self, request):
         try:
-            locations = Location.objects.all()
-            serializer = LocationSerializer(locations, many=True)
-            return Response(serializer.data)
+            snapshot = reference_data.snapshot()
+            return reference_response(request, snapshot, 'locations', snapshot.locations)
         except Exception as e:
             logger.error(f"Error retrieving locations: {e}")
             return Response({"error": "Failed to retrieve locations"}, status=500)
@@ -50,9 +60,8 @@ class BlockAPIView(APIView):
 
     def get(self, request):
         try:
-            blocks = Block.objects.all()
-            serializer = BlockSerializer(blocks, many=True)
-            return Response(serializer.data)
+            snapshot = reference_data.snapshot()
+            return reference_response(request, snapshot, 'blocks', snapshot.blocks)
         except Exception as e:
             logger.error(f"Error retrieving blocks: {e}")
             return Response({"error": "Failed to retrieve blocks"}, status=500)
@@ -74,12 +83,14 @@ class SectionAPIView(APIView):
 
     def get(self, request):
         try:
-            queryset = Section.objects.select_related('block')
+            snapshot = reference_data.snapshot()
             block_id = request.query_params.get('block_id')
-            if block_id:
-                queryset = queryset.filter(block_id=block_id)
-            serializer = SectionSerializer(queryset, many=True)
-            return Response(serializer.data)
+            sections = snapshot.sections_for_block(block_id) if block_id else snapshot.sections
+            data = [
+                {'id': s['id'], 'name': s['name'], 'block_name': s['block_name']}
+                for s in sections
+            ]
+            return reference_response(request, snapshot, f"sections-{block_id or 'all'}", data)
         except Exception as e:
             logger.error(f"Error retrieving sections: {e}")
             return Response({"error": "Failed to retrieve sections"}, status=500)
@@ -96,6 +107,24 @@ class SectionAPIView(APIView):
                 return Response({"error": str(e)}, status=400)
         return Response(serializer.errors, status=400)
 
+class HierarchyAPIView(APIView):
+    """
+    Blocks with their sections, active-farmer and plot counts and the
+    block chairperson, plus the location list, in one response.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            snapshot = get_hierarchy()
+            return conditional_response(
+                request, f'"hierarchy-{snapshot.refreshed_version}"',
+                snapshot.refreshed_at, snapshot.data
+            )
+        except Exception as e:
+            logger.error(f"Error building hierarchy: {e}")
+            return Response({"error": "Failed to retrieve hierarchy"}, status=500)
+
 class FarmerAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -106,32 +135,20 @@ class FarmerAPIView(APIView):
 
     def get(self, request):
         try:
-            queryset = Farmer.objects.select_related('location', 'block', 'section')
-            block_id = request.query_params.get('block') or request.query_params.get('block_id')
-            section_id = request.query_params.get('section_id')
-            location_id = request.query_params.get('location_id')
-            search = request.query_params.get('search')
-
-            if block_id:
-                queryset = queryset.filter(block_id=block_id)
-            if section_id:
-                queryset = queryset.filter(section_id=section_id)
-            if location_id:
-                queryset = queryset.filter(location_id=location_id)
-            if search:
-                queryset = queryset.filter(
-                    Q(first_name__icontains=search) |
-                    Q(last_name__icontains=search) |
-                    Q(phone_number__icontains=search) |
-                    Q(registration_number__icontains=search)
-                )
-
-            paginator = PageNumberPagination()
-            paginator.page_size = 10
-            paginated_qs = paginator.paginate_queryset(queryset, request)
-            serializer = FarmerSerializer(paginated_qs, many=True)
-            return paginator.get_paginated_response(serializer.data)
+            queryset = filter_farmers(Farmer.objects.all(), request.query_params)
+            ordering = ('-date_registered',)
+            extra = ()
+            if request.query_params.get('search', '').strip():
+                ordering = SEARCH_ORDERING
+                extra = ('search_rank',)
+
+            serializer = LeanFarmerSerializer(fieldset=Fieldset.from_request(request))
+            paginator = KeysetPagination(ordering=ordering, allow_page_numbers=True)
+            rows = paginator.paginate_queryset(serializer.values(queryset, *extra), request)
+            return paginator.get_paginated_response(serializer.many(rows))
 
+        except NotFound:
+            raise
         except Exception as e:
             logger.error(f"Error retrieving farmers: {e}")
             return Response({"error": "Failed to retrieve farmers"}, status=500)
@@ -170,62 +187,109 @@ class FarmerAPIView(APIView):
             logger.error(f"Error deleting farmer: {e}")
             return Response({"error": str(e)}, status=500)
 
+class FarmerExportAPIView(APIView):
+    """
+    GET /farmers/farmers/export/?file_type=csv|xlsx → the whole registry as a
+    download, streamed. Takes the same block/section/location/search filters
+    as the farmer list.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminOrSecretary]
+
+    def get(self, request):
+        file_type = request.query_params.get('file_type', 'csv').lower()
+        if file_type not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"file_type must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=400
+            )
+
+        queryset = filter_farmers(Farmer.objects.all(), request.query_params)
+        response = StreamingHttpResponse(
+            stream_farmers(queryset, file_type), content_type=EXPORT_FORMATS[file_type]
+        )
+        response['Content-Disposition'] = f'attachment; filename="{export_filename(file_type)}"'
+        return response
+
+class FarmerPhotoAPIView(APIView):
+    """
+    GET /farmers/farmers/{pk}/photo/{variant}/ → resized farmer photo
+    (thumbnail, medium or webp), rendered on first request. Serializers
+    link the derivative's blob URL instead, which <img> can load.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, variant):
+        if variant not in DERIVATIVES:
+            return Response({"error": "Unknown photo variant"}, status=404)
+        farmer = get_object_or_404(Farmer.objects.only('id', 'image'), pk=pk)
+        if not farmer.image:
+            return Response({"error": "Farmer has no photo"}, status=404)
+
+        try:
+            generate_derivatives(farmer.image.name, [variant])
+        except Exception as e:
+            logger.error(f"Error rendering {variant} photo for farmer {pk}: {e}")
+            return Response({"error": "Failed to render photo"}, status=500)
+
+        name = derivative_name(farmer.image.name, variant)
+        content_type = f"image/{DERIVATIVES[variant]['format'].lower()}"
+        response = FileResponse(blob_storage().open(name, 'rb'), content_type=content_type)
+        response['Cache-Control'] = 'private, max-age=604800'
+        return response
+
+class FarmerImportAPIView(APIView):
+    """
+    POST /farmers/farmers/import/ with a CSV or XLSX ``file``.
+    Pass ``dry_run=true`` to validate without saving.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminOrSecretary]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({"error": "No file uploaded."}, status=400)
+
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        try:
+            importer = FarmerImporter(dry_run=dry_run)
+            report = importer.run(iter_rows(upload, upload.name))
+        except ImportFormatError as e:
+            return Response({"error": str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"Error importing farmers: {e}")
+            return Response({"error": "Failed to import farmers"}, status=500)
+
+        logger.info(
+            f"Farmer import by {request.user.username}: "
+            f"{report['created']} created, {report['failed']} failed"
+        )
+        return Response(report, status=201 if report['created'] and not dry_run else 200)
+
 class DashboardStatsAPIView(APIView):
+    """
+    GET /farmers/dashboard/stats/ → latest dashboard snapshot.
+    Admins may pass ?block_id= for one block; block chairs always get theirs.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        total_farmers = Farmer.objects.filter(is_active=True).count()
-
-        present_count = Attendance.objects.filter(status='present').count()
-        possible = total_farmers * 4
-        attendance_rate = (present_count / possible * 100) if possible else 0
-        attendance_rate = round(attendance_rate, 1)
-
-        fines_collected = Payment.objects.filter(payment_type='fine').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-
-        plots_qs = Farmer.objects.filter(is_active=True).values(
-            'block__name', 'section__name'
-        ).annotate(
-            total_plots=Sum('number_of_plots')
-        ).order_by('block__name', 'section__name')
-
-        plots_summary = [
-            {
-                'block__name': p['block__name'],
-                'section__name': p['section__name'],
-                'total_plots': p['total_plots']
-            }
-            for p in plots_qs
-        ]
-
-        paid_annotation = Sum('payments__amount')
-        farmers_qs = Farmer.objects.filter(is_active=True).annotate(
-            paid=paid_annotation
-        ).annotate(
-            outstanding=ExpressionWrapper(
-                F('total_amount') - F('paid'),
-                output_field=DecimalField(max_digits=12, decimal_places=2)
-            )
-        ).filter(outstanding__gt=0).order_by('-outstanding')[:5]
-
-        top_unpaid = [
-            {
-                'id': f.id,
-                'name': f"{f.first_name} {f.last_name}",
-                'block': f.block.name,
-                'section': f.section.name,
-                'paid': float(f.outstanding)
-            }
-            for f in farmers_qs
-        ]
-
-        data = {
-            'total_farmers': total_farmers,
-            'attendance_rate': attendance_rate,
-            'fines_collected': float(fines_collected),
-            'plots_summary': plots_summary,
-            'top_unpaid': top_unpaid,
-        }
+        block_id = request.query_params.get('block_id') or None
+        scope = scope_for(request.user)
+        if not scope.unrestricted:
+            # A chair without a block must not fall through to the scheme totals
+            if scope.error():
+                return Response({"error": scope.error()}, status=400)
+            block_id = scope.block_id
+        elif block_id is not None:
+            if not block_id.isdigit():
+                return Response({"error": "block_id must be a block ID."}, status=400)
+            block_id = int(block_id)
+        if block_id and not Block.objects.filter(pk=block_id).exists():
+            return Response({"error": "Block not found"}, status=404)
+
+        snapshot = get_snapshot(block_id)
+        data = dict(snapshot.data)
+        data['generated_at'] = snapshot.refreshed_at
+        data['is_stale'] = snapshot.is_stale
         return Response(data)
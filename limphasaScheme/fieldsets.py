@@ -0,0 +1,135 @@
+"""
+Sparse fieldsets (``?fields=``) and expansion (``?expand=``) for the APIs.
+
+``?fields=id,amount,farmer.first_name`` returns only the listed fields.
+Dotted names select fields inside a nested object. ``?expand=farmer``
+keeps the named nested objects and drops every other nested object.
+Without either parameter the full representation is returned, as before.
+
+Nested objects are the expandable fields: nested serializers on a
+ModelSerializer (``SparseFieldsetMixin``) or ``Nested`` columns on a lean
+serializer. A dropped nested object is neither serialized nor joined: lean
+serializers leave its columns out of ``values()``, and views pass their
+relations through ``select_related_for``.
+"""
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def _split(value):
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+
+def _parse_fields(names):
+    tree = {}
+    for name in names:
+        head, _, rest = name.partition('.')
+        if rest:
+            if tree.get(head, {}) is not None:
+                tree.setdefault(head, {}).setdefault('__names__', []).append(rest)
+        else:
+            tree[head] = None
+    return {
+        name: None if sub is None else Fieldset(fields=_parse_fields(sub['__names__']))
+        for name, sub in tree.items()
+    }
+
+
+class Fieldset:
+    """Which fields of one serializer to return."""
+
+    def __init__(self, fields=None, expand=None):
+        # fields: {name: Fieldset or None (whole field)} or None for all
+        self.fields = fields
+        self.expand = expand
+
+    @classmethod
+    def parse(cls, fields=None, expand=None):
+        return cls(
+            fields=_parse_fields(_split(fields)) if fields else None,
+            expand=set(_split(expand)) if expand is not None else None,
+        )
+
+    @classmethod
+    def from_request(cls, request):
+        if request is None:
+            return cls()
+        params = request.query_params if hasattr(request, 'query_params') else request.GET
+        return cls.parse(params.get(FIELDS_PARAM), params.get(EXPAND_PARAM))
+
+    @property
+    def is_full(self):
+        return self.fields is None and self.expand is None
+
+    def includes(self, name, nested=False):
+        if self.fields is not None:
+            return name in self.fields
+        if nested and self.expand is not None:
+            return name in self.expand
+        return True
+
+    def child(self, name):
+        """Fieldset for a nested object."""
+        if self.fields is not None and self.fields.get(name) is not None:
+            return self.fields[name]
+        return Fieldset()
+
+
+def select_related_for(queryset, fieldset, relations):
+    """
+    ``select_related`` only the relations behind included fields.
+    ``relations`` maps a nested field name to the lookups it reads.
+    """
+    lookups = [
+        lookup
+        for name, names in relations.items()
+        if fieldset.includes(name, nested=True)
+        for lookup in names
+    ]
+    return queryset.select_related(*lookups) if lookups else queryset
+
+
+class SparseFieldsetMixin:
+    """
+    ModelSerializer mixin that honours ``?fields=``/``?expand=``.
+
+    The top-level serializer takes its fieldset from ``fieldset=`` or from
+    the request in its context, on safe (read) requests only. Nested
+    serializers get theirs from the parent. Write-only fields are never
+    dropped, so validation is unaffected.
+    """
+
+    def __init__(self, *args, fieldset=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fieldset = fieldset
+
+    def get_fieldset(self):
+        if self._fieldset is not None:
+            return self._fieldset
+        request = self.context.get('request')
+        if request is not None and request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return Fieldset.from_request(request)
+        return Fieldset()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.get_fieldset()
+        if fieldset.is_full:
+            return fields
+
+        selected = {}
+        for name, field in fields.items():
+            if field.write_only:
+                selected[name] = field
+                continue
+            nested = isinstance(field, serializers.BaseSerializer)
+            if not fieldset.includes(name, nested=nested):
+                continue
+            if nested:
+                child = field.child if isinstance(field, serializers.ListSerializer) else field
+                if isinstance(child, SparseFieldsetMixin):
+                    child._fieldset = fieldset.child(name)
+            selected[name] = field
+        return selected
@@ -0,0 +1,172 @@
+"""
+Read-only list serialization straight from ``values()`` rows.
+
+A ModelSerializer builds a model instance per row and then runs a field
+object (and often a related-object lookup) per attribute. The lean
+serializers used by the list endpoints fetch only the columns a list shows
+with ``values()``, pulling related names through joins, and build each
+dict directly. Dates, times and decimals are still formatted by DRF's own
+fields, so the JSON is byte-identical to the ModelSerializer it stands in
+for. Writes and detail views keep using the ModelSerializers.
+"""
+from operator import itemgetter
+
+from rest_framework import serializers
+
+from .fieldsets import Fieldset
+
+_datetime_field = serializers.DateTimeField()
+_date_field = serializers.DateField()
+_time_field = serializers.TimeField()
+_decimal_fields = {}
+
+
+def datetime_repr(value):
+    return None if value is None else _datetime_field.to_representation(value)
+
+
+def date_repr(value):
+    return None if value is None else _date_field.to_representation(value)
+
+
+def time_repr(value):
+    return None if value is None else _time_field.to_representation(value)
+
+
+def decimal_repr(value, max_digits, decimal_places):
+    if value is None:
+        return None
+    field = _decimal_fields.get((max_digits, decimal_places))
+    if field is None:
+        field = _decimal_fields[(max_digits, decimal_places)] = serializers.DecimalField(
+            max_digits=max_digits, decimal_places=decimal_places
+        )
+    return field.to_representation(value)
+
+
+def file_url(storage, name, request=None):
+    """What DRF's FileField renders for a stored file name."""
+    if not name:
+        return None
+    url = storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def user_repr(first_name, last_name, role):
+    """``str(CustomUser)`` from its columns."""
+    return f"{f'{first_name} {last_name}'.strip()} ({role})"
+
+
+class Field:
+    """A column copied to the output, optionally through ``format``."""
+
+    def __init__(self, lookup, format=None):
+        self.lookup = lookup
+        self.format = format
+
+    def lookups(self):
+        return [self.lookup]
+
+    def getter(self, serializer):
+        key = serializer.keys[self.lookup]
+        format = self.format
+        if format is None:
+            return itemgetter(key)
+        return lambda row: format(row[key])
+
+
+class Method:
+    """A value computed by ``serializer.<method>(row)`` from ``lookups``."""
+
+    def __init__(self, method, *lookups):
+        self.method = method
+        self.columns = lookups
+
+    def lookups(self):
+        return list(self.columns)
+
+    def getter(self, serializer):
+        return getattr(serializer, self.method)
+
+
+class Nested:
+    """
+    A related object rendered by another lean serializer whose columns are
+    read through ``relation__``. It is None when the relation is empty.
+    """
+
+    def __init__(self, serializer_class, relation):
+        self.serializer_class = serializer_class
+        self.relation = relation
+
+    def bind(self, serializer, fieldset):
+        return self.serializer_class(
+            serializer.context,
+            prefix=f'{serializer.prefix}{self.relation}__',
+            fieldset=fieldset,
+        )
+
+
+class LeanSerializer:
+    """
+    Base for values()-backed list serializers.
+
+    ``fields`` maps output names, in output order, to ``Field``, ``Method``
+    or ``Nested`` specs. ``ordering_columns`` are always fetched so keyset
+    pagination can read its cursor from the row. ``prefix`` nests a
+    serializer under a foreign key (e.g. ``farmer__``). Method specs read
+    their columns through ``self.keys``. ``fieldset`` applies
+    ``?fields=``/``?expand=`` (see limphasaScheme.fieldsets): fields left
+    out are neither fetched nor built.
+    """
+    fields = {}
+    ordering_columns = ('id',)
+
+    def __init__(self, context=None, prefix='', fieldset=None):
+        self.context = context or {}
+        self.request = self.context.get('request')
+        self.prefix = prefix
+        fieldset = fieldset or Fieldset()
+
+        # Nested serializers only need the key that tells an empty relation
+        ordering = self.ordering_columns if not prefix else ('id',)
+        self._lookups = [prefix + column for column in ordering]
+        self.keys = {}
+        self._getters = []
+        for name, spec in self.fields.items():
+            nested = isinstance(spec, Nested)
+            if not fieldset.includes(name, nested=nested):
+                continue
+            if nested:
+                child = spec.bind(self, fieldset.child(name))
+                self._lookups += child.lookups() + [child.null_key]
+                self._getters.append((name, child.getter()))
+                continue
+            for lookup in spec.lookups():
+                self.keys[lookup] = prefix + lookup
+                self._lookups.append(prefix + lookup)
+            self._getters.append((name, spec.getter(self)))
+
+    @property
+    def null_key(self):
+        return f'{self.prefix}id'
+
+    def lookups(self):
+        return list(dict.fromkeys(self._lookups))
+
+    def values(self, queryset, *extra):
+        """``queryset.values()`` with every column the selected fields read."""
+        return queryset.values(*dict.fromkeys([*self.lookups(), *extra]))
+
+    def getter(self):
+        """Row -> representation, or None when nested under an empty relation."""
+        null_key = self.null_key
+        build = self.to_representation
+        return lambda row: None if row[null_key] is None else build(row)
+
+    def to_representation(self, row):
+        return {name: get(row) for name, get in self._getters}
+
+    def many(self, rows):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
@@ -0,0 +1,135 @@
+"""
+Logging plumbing: request IDs, sampling, JSON lines and a non-blocking
+queue handler.
+
+Views log with the stdlib API and %-style arguments
+(``logger.debug("Saved payment %s", payment.pk)``), so a disabled level
+costs one level check and no string building. Records that pass are
+tagged with the current request ID (``RequestIDMiddleware``). They are
+sampled per logger (``SamplingFilter``) and put on an in-memory queue
+(``QueueHandler``). A single listener thread formats them as JSON and
+writes them out, so request threads never wait on stdout.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+request_id_var = contextvars.ContextVar('request_id', default=None)
+
+# LogRecord attributes that are not ``extra=`` fields
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+
+def new_request_id():
+    return uuid.uuid4().hex
+
+
+class RequestIDMiddleware:
+    """Binds a request ID (the client's X-Request-ID or a new one) for logging."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get(REQUEST_ID_HEADER) or new_request_id()
+        request.request_id = request_id
+        token = request_id_var.set(request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response[REQUEST_ID_HEADER] = request_id
+        return response
+
+
+class RequestIDFilter(logging.Filter):
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of the records at or below ``level`` (DEBUG by
+    default) from chatty loggers. ``rates`` maps a logger name (or a parent
+    name) to the fraction kept, and the most specific match wins. Records
+    above ``level`` always pass.
+    """
+
+    def __init__(self, rates=None, level=logging.DEBUG):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+
+    def rate_for(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno > self.level:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, including any ``extra=`` fields."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        request_id = getattr(record, 'request_id', None)
+        if request_id:
+            entry['request_id'] = request_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to a background listener that writes them to ``stream``
+    (stderr by default) as JSON lines. Only the message is rendered on the
+    calling thread; everything else happens in the listener.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        target = logging.StreamHandler(stream or sys.stderr)
+        target.setFormatter(JSONFormatter())
+        self.listener = logging.handlers.QueueListener(self.queue, target, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def prepare(self, record):
+        # Render %-args now, while the objects they refer to are still
+        # current, but leave JSON formatting to the listener thread.
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
@@ -0,0 +1,102 @@
+"""
+Serving content-addressed blobs (see limphasaScheme.storage).
+
+A blob's name is the hash of its bytes, so the name is a strong ETag and
+the response can be cached for a year. Single byte ranges
+(``Range: bytes=start-end``) are answered with 206 so large PDFs and
+videos can be resumed or previewed without downloading everything.
+"""
+import mimetypes
+import os
+import re
+
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+
+from .storage import blob_storage, is_blob_name
+
+CACHE_CONTROL = 'private, max-age=31536000, immutable'
+CHUNK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _etag(name):
+    return '"%s"' % os.path.splitext(os.path.basename(name))[0]
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable range, None to send it all, or False."""
+    match = _RANGE.match((header or '').replace(' ', ''))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _headers(response, name, content_type):
+    response['ETag'] = _etag(name)
+    response['Cache-Control'] = CACHE_CONTROL
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Type'] = content_type
+    response['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+
+@require_safe
+def serve_blob(request, name):
+    """GET /media/blobs/... → the stored blob, honouring Range and If-None-Match."""
+    if not is_blob_name(name):
+        raise Http404
+    storage = blob_storage()
+    path = storage.path(name)
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        raise Http404
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    if _etag(name) in request.headers.get('If-None-Match', ''):
+        return _headers(HttpResponseNotModified(), name, content_type)
+
+    byte_range = parse_range(request.headers.get('Range'), size)
+    if request.headers.get('If-Range') and request.headers['If-Range'] != _etag(name):
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return _headers(response, name, content_type)
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read_range(path, start, end), status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    return _headers(response, name, content_type)
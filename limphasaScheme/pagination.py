@@ -0,0 +1,188 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+Pages are fetched with ``WHERE (ordering columns) < (last row seen)`` rather
+than ``OFFSET``, so page 500 costs the same as page 1. The position is handed
+to clients as an opaque ``cursor`` in the ``next``/``previous`` links. The
+total is only counted when the client asks for it with ``?count=true``.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    page_size = api_settings.PAGE_SIZE or 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_query_param = 'page'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering=None, allow_page_numbers=False):
+        """
+        ``ordering`` lists plain field names, e.g. ``('-date_paid', '-timestamp')``.
+        ``id`` is appended as a tiebreaker. Without it, the view's
+        OrderingFilter/``ordering`` is used. ``allow_page_numbers`` keeps the
+        old ``?page=N`` behaviour for clients that still send it.
+        """
+        self.ordering = ordering
+        self.allow_page_numbers = allow_page_numbers
+        self.legacy = None
+
+    # -- ordering ---------------------------------------------------------
+
+    def get_ordering(self, request, queryset, view):
+        ordering = self.ordering
+        if ordering is None and view is not None:
+            if OrderingFilter in getattr(view, 'filter_backends', []):
+                ordering = OrderingFilter().get_ordering(request, queryset, view)
+            else:
+                ordering = getattr(view, 'ordering', None)
+        if ordering is None:
+            ordering = queryset.query.order_by or queryset.model._meta.ordering or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        ordering = [o for o in ordering if o.lstrip('-') not in ('id', 'pk')]
+        descending = ordering[0].startswith('-') if ordering else True
+        ordering.append('-id' if descending else 'id')
+        for field in ordering:
+            assert '__' not in field, "Keyset ordering must use fields on the model itself"
+        return ordering
+
+    # -- cursor encoding --------------------------------------------------
+
+    def encode_cursor(self, values, reverse=False):
+        payload = json.dumps({'k': [_encode_value(v) for v in values], 'r': int(reverse)})
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.base_url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            return list(payload['k']), bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    # -- paging -----------------------------------------------------------
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    @staticmethod
+    def _row_value(row, field):
+        if isinstance(row, dict):
+            return row[field]
+        return getattr(row, field)
+
+    def _after(self, ordering, values):
+        """Rows strictly after ``values`` in ``ordering`` (row-value comparison)."""
+        if len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        ordering = self.get_ordering(request, queryset, view)
+
+        if (
+            self.allow_page_numbers
+            and self.page_query_param in request.query_params
+            and self.cursor_query_param not in request.query_params
+        ):
+            self.legacy = PageNumberPagination()
+            self.legacy.page_size = self.page_size
+            return self.legacy.paginate_queryset(queryset.order_by(*ordering), request, view)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.count = queryset.count()
+
+        values, reverse = self.decode_cursor(request)
+        if reverse:
+            ordering = [f[1:] if f.startswith('-') else f'-{f}' for f in ordering]
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(ordering, values))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            ordering = [f[1:] if f.startswith('-') else f'-{f}' for f in ordering]
+
+        has_next = has_more if not reverse else True
+        has_previous = values is not None if not reverse else has_more
+        fields = [f.lstrip('-') for f in ordering]
+
+        self.next_link = None
+        self.previous_link = None
+        if rows and has_next:
+            self.next_link = self.encode_cursor([self._row_value(rows[-1], f) for f in fields])
+        if rows and has_previous:
+            self.previous_link = self.encode_cursor(
+                [self._row_value(rows[0], f) for f in fields], reverse=True
+            )
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        body = {'next': self.next_link, 'previous': self.previous_link}
+        if self.count is not None:
+            body['count'] = self.count
+        body['results'] = data
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
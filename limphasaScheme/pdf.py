@@ -0,0 +1,132 @@
+"""
+A minimal PDF writer for text documents (receipts, statements).
+
+Pages hold text in the standard Helvetica fonts and straight rules; that
+is all the documents need, so there is no dependency on a PDF library and
+rendering a page costs a few string joins. Content streams are deflated.
+Text is encoded as WinAnsi (cp1252); characters outside it print as '?'.
+Nothing here imports Django, so it can run in worker processes.
+"""
+import zlib
+
+A4 = (595.28, 841.89)  # points
+
+FONTS = {
+    'regular': ('F1', 'Helvetica'),
+    'bold': ('F2', 'Helvetica-Bold'),
+}
+
+# Helvetica advance widths (1/1000 em) for ASCII 32..126
+_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+
+
+def text_width(value, size):
+    """Approximate width in points of ``value`` set in Helvetica at ``size``."""
+    total = 0
+    for char in value:
+        code = ord(char)
+        total += _WIDTHS[code - 32] if 32 <= code <= 126 else 556
+    return total * size / 1000
+
+
+def _escape(value):
+    data = str(value).encode('cp1252', errors='replace')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def _number(value):
+    return f'{value:.2f}'.rstrip('0').rstrip('.')
+
+
+class PDFDocument:
+    """Pages of positioned text and rules, written out by ``render()``."""
+
+    def __init__(self, page_size=A4, title=None):
+        self.width, self.height = page_size
+        self.title = title
+        self.pages = []
+        self.new_page()
+
+    def new_page(self):
+        self.ops = []
+        self.pages.append(self.ops)
+
+    def text(self, x, y, value, size=10, bold=False, align='left'):
+        """Draw one line; ``y`` is measured from the top of the page."""
+        value = str(value)
+        if align == 'right':
+            x -= text_width(value, size)
+        elif align == 'center':
+            x -= text_width(value, size) / 2
+        font = FONTS['bold' if bold else 'regular'][0]
+        self.ops.append(
+            b'BT /%s %s Tf %s %s Td (%s) Tj ET' % (
+                font.encode(), _number(size).encode(), _number(x).encode(),
+                _number(self.height - y).encode(), _escape(value),
+            )
+        )
+
+    def rule(self, x1, y1, x2, y2, width=0.5):
+        self.ops.append(('%s w %s %s m %s %s l S' % (
+            _number(width), _number(x1), _number(self.height - y1),
+            _number(x2), _number(self.height - y2),
+        )).encode())
+
+    def render(self):
+        """The document as PDF bytes."""
+        objects = []
+
+        def add(body):
+            objects.append(body)
+            return len(objects)
+
+        catalog = add(None)
+        pages = add(None)
+        fonts = {
+            key: add(b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>' % name.encode())
+            for key, name in FONTS.values()
+        }
+        font_resources = b' '.join(b'/%s %d 0 R' % (key.encode(), number) for key, number in fonts.items())
+
+        page_numbers = []
+        for ops in self.pages:
+            stream = zlib.compress(b'\n'.join(ops))
+            content = add(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream))
+            page_numbers.append(add(
+                b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] '
+                b'/Resources << /Font << %s >> >> /Contents %d 0 R >>' % (
+                    pages, _number(self.width).encode(), _number(self.height).encode(),
+                    font_resources, content,
+                )
+            ))
+
+        objects[catalog - 1] = b'<< /Type /Catalog /Pages %d 0 R >>' % pages
+        objects[pages - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % number for number in page_numbers), len(page_numbers),
+        )
+        info = None
+        if self.title:
+            info = add(b'<< /Title (%s) /Producer (Limphasa Scheme) >>' % _escape(self.title))
+
+        out = [b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n']
+        offsets = []
+        position = len(out[0])
+        for number, body in enumerate(objects, start=1):
+            chunk = b'%d 0 obj\n%s\nendobj\n' % (number, body)
+            offsets.append(position)
+            out.append(chunk)
+            position += len(chunk)
+
+        xref = [b'xref\n0 %d\n' % (len(objects) + 1), b'0000000000 65535 f \n']
+        xref += [b'%010d 00000 n \n' % offset for offset in offsets]
+        trailer = b'trailer\n<< /Size %d /Root %d 0 R%s >>\nstartxref\n%d\n%%EOF\n' % (
+            len(objects) + 1, catalog, b' /Info %d 0 R' % info if info else b'', position,
+        )
+        return b''.join(out + xref + [trailer])
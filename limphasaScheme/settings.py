@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third-party
     'rest_framework',
@@ -50,6 +51,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'limphasaScheme.log.RequestIDMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -108,6 +110,22 @@ DATABASES = {
     }
 }
 
+# -----------------------------
+# Cache
+# -----------------------------
+# One cache for every gunicorn worker and management command, so the
+# version bumps behind access scopes, attendance rates and arrears aging
+# reach all processes. The table is created by `manage.py createcachetable`
+# (render.yaml build). Writes that skip signals (queryset update/delete)
+# stay invisible for at most ACCESS_SCOPE_CACHE_TIMEOUT (300s),
+# ATTENDANCE_RATE_CACHE_TIMEOUT (3600s) or ARREARS_AGING_CACHE_TIMEOUT (600s).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'limphasa_cache',
+    }
+}
+
 # -----------------------------
 # Authentication & JWT
 # -----------------------------
@@ -115,7 +133,7 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'limphasaScheme.pagination.KeysetPagination',
     'PAGE_SIZE': 10,
 }
 
@@ -155,6 +173,71 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads (receipts, evidence, photos) are stored once per content under
+# MEDIA_ROOT/blobs and served by limphasaScheme.media (see limphasaScheme.storage).
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    'blobs': {'BACKEND': 'limphasaScheme.storage.ContentAddressedStorage'},
+}
+
+# -----------------------------
+# Receipt & Statement PDFs
+# -----------------------------
+# Worker processes used to render document archives (payments.documents);
+# unset means min(4, CPU count). With DOCUMENT_JOBS_IN_BACKGROUND off, jobs
+# queued through the API wait for `manage.py render_documents --pending`.
+DOCUMENT_WORKERS = int(os.environ.get('DOCUMENT_WORKERS', 0)) or None
+DOCUMENT_JOBS_IN_BACKGROUND = os.environ.get('DOCUMENT_JOBS_IN_BACKGROUND', 'True') == 'True'
+
+# -----------------------------
+# Attendance Rates
+# -----------------------------
+# Windows (name -> days ending today) offered by /attendance/rates/; the
+# dashboard uses ATTENDANCE_RATE_DEFAULT_WINDOW (see attendance.rates).
+ATTENDANCE_RATE_WINDOWS = {'30d': 30, '90d': 90, '365d': 365}
+ATTENDANCE_RATE_DEFAULT_WINDOW = os.environ.get('ATTENDANCE_RATE_DEFAULT_WINDOW', '90d')
+
+# -----------------------------
+# Penalty Ledger
+# -----------------------------
+# Penalty points lose half their weight every PENALTY_HALF_LIFE_DAYS in the
+# decayed score (discipline.penalties); 0 keeps points at full weight.
+PENALTY_HALF_LIFE_DAYS = int(os.environ.get('PENALTY_HALF_LIFE_DAYS', 180))
+
+# -----------------------------
+# Logging
+# -----------------------------
+# JSON lines on stderr, written by a background thread (limphasaScheme.log).
+# LOG_LEVEL=DEBUG turns on the per-request diagnostics in the views; those
+# are sampled per logger by LOG_SAMPLING (fraction of DEBUG records kept).
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_SAMPLING = {
+    'accounts.views': 0.1,
+    'attendance.views': 0.1,
+    'payments.views': 0.1,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'limphasaScheme.log.RequestIDFilter'},
+        'sampling': {'()': 'limphasaScheme.log.SamplingFilter', 'rates': LOG_SAMPLING},
+    },
+    'handlers': {
+        'queue': {
+            'class': 'limphasaScheme.log.QueueHandler',
+            'filters': ['request_id', 'sampling'],
+        },
+    },
+    'root': {'handlers': ['queue'], 'level': 'WARNING'},
+    'loggers': {
+        app: {'level': LOG_LEVEL}
+        for app in ('accounts', 'attendance', 'discipline', 'farmers', 'payments', 'limphasaScheme')
+    },
+}
+
 # -----------------------------
 # Default Primary Key Field
 # -----------------------------
@@ -0,0 +1,113 @@
+"""
+Content-addressed storage for uploaded receipts, evidence and photos.
+
+``ContentAddressedStorage`` ignores the upload path and stores each file
+under the SHA-256 of its bytes, sharded by the first two byte pairs::
+
+    blobs/3f/a2/3fa2...c9.jpg
+
+The upload is streamed to a temporary file in chunks while it is hashed,
+then moved into place. If the blob already exists the temporary file is
+dropped and the existing name returned, so a receipt photo uploaded twice
+is stored once. Blobs never change, so ``limphasaScheme.media`` serves
+them with range support and immutable cache headers.
+
+Blobs can be shared by several rows, so ``delete`` leaves them in place.
+``save_as`` writes a file under a given blob-shaped name instead, for
+files derived from a blob (see farmers.images).
+``manage.py dedupe_media`` moves files saved before this storage existed
+into it.
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage, storages
+from django.utils.deconstruct import deconstructible
+
+BLOB_DIR = 'blobs'
+BLOB_NAME = re.compile(rf'^{BLOB_DIR}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/[0-9a-f]{{64}}(\.[a-z0-9]{{1,10}})?$')
+
+_EXTENSION = re.compile(r'^\.[a-z0-9]{1,10}$')
+
+
+def is_blob_name(name):
+    return bool(name and BLOB_NAME.match(name))
+
+
+def blob_name(digest, extension=''):
+    return f'{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def blob_extension(name):
+    extension = os.path.splitext(name or '')[1].lower()
+    return extension if _EXTENSION.match(extension) else ''
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names each file by the SHA-256 of its content."""
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content in _save; nothing to avoid.
+        return name
+
+    def _save(self, name, content):
+        directory = os.path.join(self.location, BLOB_DIR)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        with tempfile.NamedTemporaryFile(dir=directory, prefix='.upload-', delete=False) as temp:
+            try:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    temp.write(chunk)
+            except BaseException:
+                temp.close()
+                os.unlink(temp.name)
+                raise
+
+        name = blob_name(digest.hexdigest(), blob_extension(name))
+        path = self.path(name)
+        if os.path.exists(path):
+            os.unlink(temp.name)
+            return name
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(temp.name, self.file_permissions_mode)
+        # Atomic: concurrent uploads of the same bytes write identical files
+        os.replace(temp.name, path)
+        return name
+
+    def save_as(self, name, data):
+        """
+        Write ``data`` under ``name`` rather than its hash, replacing any
+        file there. For blobs named after another blob (photo derivatives,
+        see farmers.images); ``name`` must be blob-shaped so serve_blob
+        serves it.
+        """
+        if not is_blob_name(name):
+            raise ValueError(f"Not a blob name: {name}")
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix='.upload-', delete=False) as temp:
+            temp.write(data)
+        if self.file_permissions_mode is not None:
+            os.chmod(temp.name, self.file_permissions_mode)
+        os.replace(temp.name, path)
+        return name
+
+    def delete(self, name):
+        # Other rows may point at the same blob; see dedupe_media for cleanup.
+        if not is_blob_name(name):
+            super().delete(name)
+
+
+def blob_storage():
+    """Storage for FileField/ImageField uploads (``STORAGES['blobs']``)."""
+    return storages['blobs']
@@ -16,7 +16,9 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
+
+from .media import serve_blob
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -26,4 +28,6 @@ urlpatterns = [
     path('discipline/', include('discipline.urls')),  # fixed spelling!
     path('farmers/', include('farmers.urls')),
     path('payments/', include('payments.urls')),
+
+    re_path(r'^media/(?P<name>blobs/.+)$', serve_blob, name='media-blob'),
 ]
@@ -0,0 +1,247 @@
+"""
+Arrears aging: outstanding plot fees bucketed by how long they have gone
+unpaid.
+
+A balance's age is counted from the farmer's last plot-fee payment, or
+from their registration when they have never paid one; fines and other
+payments do not reset it. The report is one grouped query
+over ``FarmerBalance`` (one row per farmer) with a conditional Count/Sum
+per bucket, so a scheme-wide report costs the same single pass as a
+block's. Reports are cached per scope (scheme or block) and grouping;
+payment and farmer writes bump the version of the scopes they touch when
+they commit (payments.signals) so the next read recomputes. Versions live
+in the shared cache (settings.CACHES); writes that skip signals show up
+after ``ARREARS_AGING_CACHE_TIMEOUT`` at the latest.
+"""
+import csv
+import io
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+from farmers.models import Block, Section
+from farmers.reference import reference_data
+from .models import FarmerBalance
+
+DEFAULT_CACHE_TIMEOUT = 600  # seconds
+
+# (name, first day, last day) of each bucket; None is open-ended
+BUCKETS = [
+    ('current', 0, 30),
+    ('days_31_60', 31, 60),
+    ('days_61_90', 61, 90),
+    ('days_over_90', 91, None),
+]
+BUCKET_NAMES = [name for name, _, _ in BUCKETS]
+
+GROUPINGS = {
+    'block': ('block_id',),
+    'section': ('block_id', 'section_id'),
+}
+
+
+def cache_timeout():
+    return getattr(settings, 'ARREARS_AGING_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT)
+
+
+def in_arrears(block_id=None):
+    balances = FarmerBalance.objects.filter(is_active=True, outstanding__gt=0)
+    if block_id:
+        balances = balances.filter(block_id=block_id)
+    return balances.annotate(
+        arrears_since=Coalesce('last_plot_fee_date', TruncDate('farmer__date_registered'))
+    )
+
+
+def bucket_filter(name, as_of):
+    _, first, last = next(bucket for bucket in BUCKETS if bucket[0] == name)
+    q = Q(arrears_since__lte=as_of - timedelta(days=first))
+    if last is not None:
+        q &= Q(arrears_since__gte=as_of - timedelta(days=last))
+    return q
+
+
+# -------------------
+# Report
+# -------------------
+def _empty_buckets():
+    return {name: {'farmers': 0, 'amount': 0} for name in BUCKET_NAMES}
+
+
+def compute_report(as_of, block_id=None, group_by='block'):
+    """Aging per block (or per section) and for the whole scope."""
+    aggregates = {'farmer_count': Count('id'), 'total_outstanding': Sum('outstanding')}
+    for name in BUCKET_NAMES:
+        q = bucket_filter(name, as_of)
+        aggregates[f'{name}__farmers'] = Count('id', filter=q)
+        aggregates[f'{name}__amount'] = Sum('outstanding', filter=q)
+
+    columns = GROUPINGS[group_by]
+    grouped = in_arrears(block_id).values(*columns).annotate(**aggregates).order_by()
+
+    snapshot = reference_data.snapshot()
+    totals = {'farmers': 0, 'outstanding': 0, 'buckets': _empty_buckets()}
+    rows = []
+    for values in grouped:
+        block = snapshot.get(Block, values['block_id'])
+        row = {'block_id': values['block_id'], 'block_name': block['name'] if block else None}
+        if 'section_id' in values:
+            section = snapshot.get(Section, values['section_id'])
+            row['section_id'] = values['section_id']
+            row['section_name'] = section['name'] if section else None
+        row.update(farmers=values['farmer_count'], outstanding=values['total_outstanding'], buckets={})
+        for name in BUCKET_NAMES:
+            bucket = {
+                'farmers': values[f'{name}__farmers'],
+                'amount': values[f'{name}__amount'] or 0,
+            }
+            row['buckets'][name] = bucket
+            totals['buckets'][name]['farmers'] += bucket['farmers']
+            totals['buckets'][name]['amount'] += bucket['amount']
+        totals['farmers'] += row['farmers']
+        totals['outstanding'] += row['outstanding']
+        rows.append(row)
+
+    rows.sort(key=lambda row: (row['block_name'] or '', row.get('section_name') or ''))
+    return {
+        'as_of': as_of,
+        'group_by': group_by,
+        'block_id': block_id,
+        'buckets': [
+            {'name': name, 'from_days': first, 'to_days': last} for name, first, last in BUCKETS
+        ],
+        'rows': rows,
+        'totals': totals,
+    }
+
+
+def _version_key(scope):
+    return f'arrears-aging:version:{scope}'
+
+
+def _scope(block_id):
+    return f'block:{block_id}' if block_id else 'scheme'
+
+
+def get_report(as_of, block_id=None, group_by='block'):
+    """``compute_report``, cached until a write touches the scope."""
+    scope = _scope(block_id)
+    versions = cache.get_many([_version_key('all'), _version_key(scope)])
+    key = 'arrears-aging:{}:{}:{}:{}:{}'.format(
+        scope, group_by, as_of.isoformat(),
+        versions.get(_version_key('all'), 0), versions.get(_version_key(scope), 0),
+    )
+    report = cache.get(key)
+    if report is None:
+        report = compute_report(as_of, block_id, group_by)
+        cache.set(key, report, cache_timeout())
+    return report
+
+
+def _bump(scope):
+    # After commit, so payment writers do not hold the scheme's cache row
+    transaction.on_commit(lambda: _bump_now(scope))
+
+
+def _bump_now(scope):
+    key = _version_key(scope)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def invalidate(block_ids=()):
+    """Balances in these blocks changed; the scheme report changes with them."""
+    _bump('scheme')
+    for block_id in {pk for pk in block_ids if pk}:
+        _bump(_scope(block_id))
+
+
+def invalidate_all():
+    _bump('all')
+
+
+# -------------------
+# Drill-down
+# -------------------
+FARMER_COLUMNS = (
+    'id', 'farmer_id', 'farmer__first_name', 'farmer__last_name', 'farmer__registration_number',
+    'block_id', 'section_id', 'outstanding', 'last_payment_date', 'last_plot_fee_date',
+    'arrears_since',
+)
+
+
+def bucket_balances(as_of, bucket=None, block_id=None, section_id=None):
+    """Balances in arrears (optionally one bucket), as ``values()`` rows."""
+    balances = in_arrears(block_id)
+    if bucket:
+        balances = balances.filter(bucket_filter(bucket, as_of))
+    if section_id:
+        balances = balances.filter(section_id=section_id)
+    return balances.values(*FARMER_COLUMNS)
+
+
+def farmer_row(values, as_of):
+    snapshot = reference_data.snapshot()
+    block = snapshot.get(Block, values['block_id'])
+    section = snapshot.get(Section, values['section_id'])
+    days = (as_of - values['arrears_since']).days
+    return {
+        'farmer': values['farmer_id'],
+        'farmer_name': f"{values['farmer__first_name']} {values['farmer__last_name']}",
+        'registration_number': values['farmer__registration_number'],
+        'block': values['block_id'],
+        'block_name': block['name'] if block else None,
+        'section': values['section_id'],
+        'section_name': section['name'] if section else None,
+        'outstanding': values['outstanding'],
+        'last_payment_date': values['last_payment_date'],
+        'last_plot_fee_date': values['last_plot_fee_date'],
+        'arrears_since': values['arrears_since'],
+        'days_in_arrears': days,
+        'bucket': next(name for name, first, last in BUCKETS if last is None or days <= last),
+    }
+
+
+# -------------------
+# CSV
+# -------------------
+def report_csv(report):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    by_section = report['group_by'] == 'section'
+    header = ['block'] + (['section'] if by_section else []) + ['farmers', 'outstanding']
+    for name in BUCKET_NAMES:
+        header += [f'{name}_farmers', f'{name}_amount']
+    writer.writerow(header)
+
+    def write(label, row):
+        line = label + [row['farmers'], row['outstanding']]
+        for name in BUCKET_NAMES:
+            line += [row['buckets'][name]['farmers'], row['buckets'][name]['amount']]
+        writer.writerow(line)
+
+    for row in report['rows']:
+        write([row['block_name']] + ([row['section_name']] if by_section else []), row)
+    write(['Total'] + ([''] if by_section else []), report['totals'])
+    return out.getvalue()
+
+
+FARMER_CSV_COLUMNS = [
+    'registration_number', 'farmer_name', 'block_name', 'section_name',
+    'outstanding', 'last_payment_date', 'last_plot_fee_date', 'arrears_since', 'days_in_arrears', 'bucket',
+]
+
+
+def farmers_csv(rows):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=FARMER_CSV_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
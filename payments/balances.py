@@ -0,0 +1,160 @@
+"""
+Maintenance of FarmerBalance rows.
+
+Payment.save()/delete() call ``record_change``/``record_delete`` inside
+their transaction, and farmer saves call ``sync_farmer`` (see
+payments.signals), so balances move with every write instead of being
+recomputed from all payments on each read. ``rebuild`` recomputes
+everything from scratch and is exposed as ``manage.py rebuild_balances``.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from farmers.models import Farmer
+from .models import FarmerBalance, Payment
+from . import aging
+
+# Payment fields that affect a balance
+LEDGER_FIELDS = ('farmer_id', 'amount', 'payment_type', 'date_paid')
+
+PAID_FIELDS = {
+    'plot_fee': 'paid_plot_fee',
+    'fine': 'paid_fine',
+    'contribution': 'paid_contribution',
+    'other': 'paid_other',
+}
+# Only plot fees count against amount_due
+DUE_PAYMENT_TYPE = 'plot_fee'
+
+
+def touches_ledger(update_fields):
+    return update_fields is None or bool({'farmer', *LEDGER_FIELDS}.intersection(update_fields))
+
+
+def _new_balance(farmer):
+    return FarmerBalance(
+        farmer_id=farmer.pk,
+        block_id=farmer.block_id,
+        section_id=farmer.section_id,
+        is_active=farmer.is_active,
+        amount_due=farmer.total_amount,
+        outstanding=farmer.total_amount,
+    )
+
+
+def _ensure_balance(farmer_id):
+    if not FarmerBalance.objects.filter(farmer_id=farmer_id).exists():
+        farmer = Farmer.objects.get(pk=farmer_id)
+        FarmerBalance.objects.bulk_create([_new_balance(farmer)], ignore_conflicts=True)
+
+
+def _apply(farmer_id, payment_type, amount, date_paid, sign):
+    amount = Decimal(str(amount)) * sign
+    paid_field = PAID_FIELDS.get(payment_type, 'paid_other')
+    updates = {
+        paid_field: F(paid_field) + amount,
+        'total_paid': F('total_paid') + amount,
+    }
+    if payment_type == DUE_PAYMENT_TYPE:
+        updates['outstanding'] = F('outstanding') - amount
+    if sign > 0:
+        updates['last_payment_date'] = Greatest(
+            Coalesce('last_payment_date', Value(date_paid)), Value(date_paid)
+        )
+        if payment_type == DUE_PAYMENT_TYPE:
+            updates['last_plot_fee_date'] = Greatest(
+                Coalesce('last_plot_fee_date', Value(date_paid)), Value(date_paid)
+            )
+
+    _ensure_balance(farmer_id)
+    FarmerBalance.objects.filter(farmer_id=farmer_id).update(**updates)
+
+    if sign < 0:
+        last = Payment.objects.filter(farmer_id=farmer_id).aggregate(
+            last=Max('date_paid'),
+            last_plot_fee=Max('date_paid', filter=Q(payment_type=DUE_PAYMENT_TYPE)),
+        )
+        FarmerBalance.objects.filter(farmer_id=farmer_id).update(
+            last_payment_date=last['last'], last_plot_fee_date=last['last_plot_fee'],
+        )
+
+
+def record_change(previous, payment):
+    """Apply a saved payment; ``previous`` holds its LEDGER_FIELDS before the save."""
+    current = {name: getattr(payment, name) for name in LEDGER_FIELDS}
+    if previous is not None:
+        if all(previous[name] == current[name] for name in LEDGER_FIELDS):
+            return
+        _apply(previous['farmer_id'], previous['payment_type'],
+               previous['amount'], previous['date_paid'], -1)
+    _apply(current['farmer_id'], current['payment_type'],
+           current['amount'], current['date_paid'], 1)
+
+
+def record_delete(payment):
+    _apply(payment.farmer_id, payment.payment_type, payment.amount, payment.date_paid, -1)
+
+
+def sync_farmer(farmer):
+    """Refresh the farmer-derived columns after a farmer is created or edited."""
+    updated = FarmerBalance.objects.filter(farmer_id=farmer.pk).update(
+        block_id=farmer.block_id,
+        section_id=farmer.section_id,
+        is_active=farmer.is_active,
+        amount_due=farmer.total_amount,
+        outstanding=Value(farmer.total_amount) - F('paid_plot_fee'),
+    )
+    if not updated:
+        FarmerBalance.objects.bulk_create([_new_balance(farmer)], ignore_conflicts=True)
+
+
+def open_balances(farmers):
+    """Create empty balances for freshly bulk-created farmers."""
+    FarmerBalance.objects.bulk_create(
+        [_new_balance(farmer) for farmer in farmers], ignore_conflicts=True
+    )
+    aging.invalidate({farmer.block_id for farmer in farmers})
+
+
+def rebuild(batch_size=1000):
+    """Recompute every balance from farmers and payments; returns the row count."""
+    paid = {}
+    for row in Payment.objects.values('farmer_id', 'payment_type').annotate(
+        total=Sum('amount'), last=Max('date_paid')
+    ).order_by():
+        entry = paid.setdefault(row['farmer_id'], {'last': None})
+        field = PAID_FIELDS.get(row['payment_type'], 'paid_other')
+        entry[field] = entry.get(field, Decimal('0')) + row['total']
+        if entry['last'] is None or row['last'] > entry['last']:
+            entry['last'] = row['last']
+        if row['payment_type'] == DUE_PAYMENT_TYPE:
+            entry['last_plot_fee'] = row['last']
+
+    count = 0
+    with transaction.atomic():
+        FarmerBalance.objects.all().delete()
+        batch = []
+        for farmer in Farmer.objects.only(
+            'id', 'block_id', 'section_id', 'is_active', 'total_amount'
+        ).iterator(chunk_size=batch_size):
+            balance = _new_balance(farmer)
+            entry = paid.get(farmer.pk, {})
+            for field in PAID_FIELDS.values():
+                setattr(balance, field, entry.get(field, Decimal('0')))
+            balance.total_paid = sum(entry.get(f, Decimal('0')) for f in PAID_FIELDS.values())
+            balance.outstanding = balance.amount_due - balance.paid_plot_fee
+            balance.last_payment_date = entry.get('last')
+            balance.last_plot_fee_date = entry.get('last_plot_fee')
+            batch.append(balance)
+            if len(batch) >= batch_size:
+                FarmerBalance.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            FarmerBalance.objects.bulk_create(batch)
+            count += len(batch)
+    aging.invalidate_all()
+    return count
@@ -0,0 +1,350 @@
+"""
+Batch rendering of payment receipts and farmer statements.
+
+The selection is read in the calling process with a few ``values()``
+queries per batch of documents: payments with their farmer and users for
+receipts; farmers, their balances and their payments for statements. The
+rows become plain dicts, and a ``ProcessPoolExecutor`` renders them to PDF
+(``payments.layouts``) on every core. The results are written into one zip
+archive as they come back. Workers are started with "spawn" and never
+touch the database.
+
+``DocumentJob`` rows track jobs requested through the API. They run in a
+background thread (``start_in_background``) or with
+``manage.py render_documents --job``.
+"""
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import repeat
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from farmers.models import Farmer
+from .layouts import render
+from .models import DocumentJob, FarmerBalance, Payment
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+PAYMENT_TYPES = dict(Payment.PAYMENT_TYPE_CHOICES)
+METHODS = dict(Payment.METHOD_CHOICES)
+
+_USER_COLUMNS = ('username', 'first_name', 'last_name')
+_FARMER_COLUMNS = (
+    'id', 'first_name', 'middle_name', 'last_name', 'registration_number',
+    'phone_number', 'block__name', 'section__name',
+)
+_PAYMENT_COLUMNS = (
+    'id', 'farmer_id', 'amount', 'payment_type', 'method', 'reference_code',
+    'date_paid', 'is_verified',
+)
+
+
+class SelectionError(Exception):
+    """The job parameters do not describe a valid selection."""
+
+
+def worker_count():
+    return getattr(settings, 'DOCUMENT_WORKERS', None) or min(4, os.cpu_count() or 1)
+
+
+def receipt_number(pk):
+    return f"{pk:06d}"
+
+
+def _parse_date(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise SelectionError(f"{name} must be a date in YYYY-MM-DD format.")
+
+
+def _id(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise SelectionError(f"{name} must be an ID.")
+
+
+def _ids(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    try:
+        return [int(pk) for pk in value]
+    except (TypeError, ValueError):
+        raise SelectionError(f"{name} must be a list of IDs.")
+
+
+def clean_params(kind, params):
+    """Validate job parameters; returns them in a JSON-safe form."""
+    if kind not in dict(DocumentJob.KIND_CHOICES):
+        raise SelectionError(f"kind must be one of: {', '.join(dict(DocumentJob.KIND_CHOICES))}")
+    cleaned = {}
+    for name in ('block', 'section'):
+        pk = _id(params, name)
+        if pk is not None:
+            cleaned[name] = pk
+    for name in ('farmer_ids', 'payment_ids'):
+        ids = _ids(params, name)
+        if ids is not None:
+            cleaned[name] = ids
+    for name in ('date_from', 'date_to'):
+        value = _parse_date(params, name)
+        if value:
+            cleaned[name] = value.isoformat()
+    if kind == 'receipts' and not cleaned:
+        raise SelectionError("Select receipts by payment_ids, farmer_ids, block, section or dates.")
+    return cleaned
+
+
+def _date_filter(params, field):
+    q = Q()
+    if params.get('date_from'):
+        q &= Q(**{f'{field}__gte': params['date_from']})
+    if params.get('date_to'):
+        q &= Q(**{f'{field}__lte': params['date_to']})
+    return q
+
+
+def select_payments(params):
+    payments = Payment.objects.filter(_date_filter(params, 'date_paid'))
+    if params.get('payment_ids'):
+        payments = payments.filter(pk__in=params['payment_ids'])
+    if params.get('farmer_ids'):
+        payments = payments.filter(farmer_id__in=params['farmer_ids'])
+    if params.get('block'):
+        payments = payments.filter(farmer__block_id=params['block'])
+    if params.get('section'):
+        payments = payments.filter(farmer__section_id=params['section'])
+    return payments.order_by('id')
+
+
+def select_farmers(params):
+    farmers = Farmer.objects.all()
+    if params.get('farmer_ids'):
+        farmers = farmers.filter(pk__in=params['farmer_ids'])
+    else:
+        farmers = farmers.filter(is_active=True)
+    if params.get('block'):
+        farmers = farmers.filter(block_id=params['block'])
+    if params.get('section'):
+        farmers = farmers.filter(section_id=params['section'])
+    return farmers.order_by('block__name', 'section__name', 'last_name', 'first_name', 'id')
+
+
+def select(kind, params):
+    return select_payments(params) if kind == 'receipts' else select_farmers(params)
+
+
+# -------------------
+# Document data
+# -------------------
+def _user_name(row, prefix):
+    first, last, username = (row[f'{prefix}__{column}'] for column in ('first_name', 'last_name', 'username'))
+    return f"{first} {last}".strip() or username
+
+
+def _farmer(row, prefix=''):
+    get = lambda column: row[f'{prefix}{column}']  # noqa: E731
+    names = (get('first_name'), get('middle_name'), get('last_name'))
+    return {
+        'id': get('id'),
+        'name': " ".join(name for name in names if name),
+        'last_name': get('last_name'),
+        'registration_number': get('registration_number'),
+        'phone_number': get('phone_number'),
+        'block': get('block__name'),
+        'section': get('section__name'),
+    }
+
+
+def _local(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M') if value else None
+
+
+def receipt_batches(payments, issued):
+    columns = (
+        *_PAYMENT_COLUMNS, 'description', 'verification_date',
+        *(f'farmer__{column}' for column in _FARMER_COLUMNS),
+        *(f'recorded_by__{column}' for column in _USER_COLUMNS),
+        *(f'verified_by__{column}' for column in _USER_COLUMNS),
+    )
+    batch = []
+    for row in payments.values(*columns).iterator(chunk_size=BATCH_SIZE):
+        batch.append({
+            'number': receipt_number(row['id']),
+            'issued': issued,
+            'farmer': _farmer(row, 'farmer__'),
+            'date_paid': row['date_paid'].isoformat(),
+            'amount': row['amount'],
+            'payment_type': PAYMENT_TYPES.get(row['payment_type'], row['payment_type']),
+            'method': METHODS.get(row['method'], row['method']),
+            'reference_code': row['reference_code'],
+            'description': row['description'],
+            'recorded_by': _user_name(row, 'recorded_by') if row['recorded_by__username'] else None,
+            'is_verified': row['is_verified'],
+            'verified_by': _user_name(row, 'verified_by') if row['verified_by__username'] else None,
+            'verification_date': _local(row['verification_date']),
+        })
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _period(params):
+    start, end = params.get('date_from'), params.get('date_to')
+    if start and end:
+        return f"{start} to {end}"
+    if start:
+        return f"From {start}"
+    if end:
+        return f"Up to {end}"
+    return "All payments"
+
+
+def statement_batches(farmers, params, issued):
+    period = _period(params)
+    date_filter = _date_filter(params, 'date_paid')
+    balance_columns = (
+        'amount_due', 'paid_plot_fee', 'paid_fine', 'paid_contribution', 'paid_other', 'outstanding',
+    )
+    empty_balance = dict.fromkeys(balance_columns, 0)
+
+    rows = list(farmers.values(*_FARMER_COLUMNS))
+    for start in range(0, len(rows), BATCH_SIZE):
+        chunk = rows[start:start + BATCH_SIZE]
+        ids = [row['id'] for row in chunk]
+        balances = {
+            row.pop('farmer_id'): row
+            for row in FarmerBalance.objects.filter(farmer_id__in=ids).values('farmer_id', *balance_columns)
+        }
+        payments = {}
+        for row in Payment.objects.filter(date_filter, farmer_id__in=ids).order_by(
+            'date_paid', 'id'
+        ).values(*_PAYMENT_COLUMNS):
+            payments.setdefault(row['farmer_id'], []).append({
+                'number': receipt_number(row['id']),
+                'date_paid': row['date_paid'].isoformat(),
+                'payment_type': PAYMENT_TYPES.get(row['payment_type'], row['payment_type']),
+                'method': METHODS.get(row['method'], row['method']),
+                'reference_code': row['reference_code'],
+                'amount': row['amount'],
+                'is_verified': row['is_verified'],
+            })
+
+        batch = []
+        for row in chunk:
+            farmer_payments = payments.get(row['id'], [])
+            batch.append({
+                'farmer': _farmer(row),
+                'period': period,
+                'issued': issued,
+                'balance': balances.get(row['id'], empty_balance),
+                'payments': farmer_payments,
+                'period_total': sum(payment['amount'] for payment in farmer_payments),
+            })
+        yield batch
+
+
+def document_batches(kind, params):
+    issued = timezone.localdate().isoformat()
+    queryset = select(kind, params)
+    if kind == 'receipts':
+        return receipt_batches(queryset, issued)
+    return statement_batches(queryset, params, issued)
+
+
+# -------------------
+# Rendering
+# -------------------
+def write_archive(kind, params, fileobj, workers=None, progress=None):
+    """
+    Render every selected document into a zip written to ``fileobj``.
+    ``progress(done)`` is called after each batch. Returns the count.
+    """
+    workers = workers or worker_count()
+    done = 0
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+        try:
+            for batch in document_batches(kind, params):
+                if executor is None:
+                    results = map(render, repeat(kind), batch)
+                else:
+                    chunksize = max(1, len(batch) // (workers * 4))
+                    results = executor.map(render, repeat(kind), batch, chunksize=chunksize)
+                for name, content in results:
+                    # PDFs are already compressed
+                    archive.writestr(f"{kind}/{name}", content, compress_type=zipfile.ZIP_STORED)
+                done += len(batch)
+                if progress:
+                    progress(done)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    return done
+
+
+def archive_filename(job):
+    return f"{job.kind}-{job.pk}-{timezone.localdate():%Y%m%d}.zip"
+
+
+def run_job(job, workers=None):
+    """Render a DocumentJob's archive and store it on the job."""
+    DocumentJob.objects.filter(pk=job.pk).update(status='running', started_at=timezone.now())
+    try:
+        total = select(job.kind, job.params).count()
+        DocumentJob.objects.filter(pk=job.pk).update(total=total)
+
+        def progress(done):
+            DocumentJob.objects.filter(pk=job.pk).update(completed=done)
+
+        with tempfile.TemporaryFile() as temp:
+            write_archive(job.kind, job.params, temp, workers=workers, progress=progress)
+            temp.seek(0)
+            job.refresh_from_db()
+            job.archive.save(archive_filename(job), File(temp), save=False)
+        job.status = 'done'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['archive', 'status', 'finished_at'])
+    except Exception as e:
+        logger.exception("Document job #%s failed", job.pk)
+        DocumentJob.objects.filter(pk=job.pk).update(
+            status='failed', error=str(e), finished_at=timezone.now()
+        )
+    job.refresh_from_db()
+    return job
+
+
+def start_in_background(job):
+    def run():
+        try:
+            run_job(job)
+        finally:
+            close_old_connections()
+
+    threading.Thread(target=run, name=f"document-job-{job.pk}", daemon=True).start()
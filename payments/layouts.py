@@ -0,0 +1,151 @@
+"""
+Page layouts for payment receipts and farmer statements.
+
+The functions here take plain dicts built by ``payments.documents`` and
+return ``(filename, pdf bytes)``. They use no models or settings, so a
+process pool can run them without setting Django up.
+"""
+import re
+
+from limphasaScheme.pdf import PDFDocument
+
+SCHEME_NAME = "Limphasa Rice Scheme"
+
+MARGIN = 50
+LINE = 15
+
+
+def money(amount):
+    return "MWK {:,.2f}".format(amount or 0)
+
+
+def _slug(value):
+    return re.sub(r'[^A-Za-z0-9]+', '-', str(value or '')).strip('-') or 'farmer'
+
+
+def _header(pdf, title, subtitle):
+    pdf.text(MARGIN, 60, SCHEME_NAME, size=16, bold=True)
+    pdf.text(pdf.width - MARGIN, 60, title, size=14, bold=True, align='right')
+    pdf.text(pdf.width - MARGIN, 78, subtitle, size=9, align='right')
+    pdf.rule(MARGIN, 90, pdf.width - MARGIN, 90, width=1)
+    return 115
+
+
+def _pairs(pdf, y, pairs, x=MARGIN, label_width=130):
+    for label, value in pairs:
+        pdf.text(x, y, label, size=10, bold=True)
+        pdf.text(x + label_width, y, value if value not in (None, '') else '-', size=10)
+        y += LINE
+    return y
+
+
+def _farmer_pairs(farmer):
+    return [
+        ("Farmer", farmer['name']),
+        ("Registration no.", farmer['registration_number']),
+        ("Phone", farmer['phone_number']),
+        ("Block / Section", f"{farmer['block'] or '-'} / {farmer['section'] or '-'}"),
+    ]
+
+
+def render_receipt(data):
+    pdf = PDFDocument(title=f"Receipt {data['number']}")
+    y = _header(pdf, "PAYMENT RECEIPT", f"No. {data['number']}  -  issued {data['issued']}")
+    y = _pairs(pdf, y, _farmer_pairs(data['farmer']))
+    y += LINE
+    y = _pairs(pdf, y, [
+        ("Date paid", data['date_paid']),
+        ("Payment type", data['payment_type']),
+        ("Description", data['description']),
+        ("Method", data['method']),
+        ("Reference", data['reference_code']),
+        ("Recorded by", data['recorded_by']),
+    ])
+    y += LINE / 2
+    pdf.rule(MARGIN, y, pdf.width - MARGIN, y)
+    y += LINE + 5
+    pdf.text(MARGIN, y, "Amount received", size=12, bold=True)
+    pdf.text(pdf.width - MARGIN, y, money(data['amount']), size=12, bold=True, align='right')
+    y += LINE * 2
+    if data['is_verified']:
+        status = f"Verified by {data['verified_by'] or '-'} on {data['verification_date'] or '-'}"
+    else:
+        status = "Not yet verified by the treasurer"
+    pdf.text(MARGIN, y, status, size=9)
+    return f"receipt-{data['number']}.pdf", pdf.render()
+
+
+# (heading, x offset from the margin, alignment) of the statement table
+STATEMENT_COLUMNS = [
+    ("Date", 0, 'left'),
+    ("Receipt", 70, 'left'),
+    ("Type", 125, 'left'),
+    ("Method", 215, 'left'),
+    ("Reference", 290, 'left'),
+    ("Amount", 455, 'right'),
+    ("", 495, 'right'),
+]
+
+
+def _table_header(pdf, y):
+    for heading, offset, align in STATEMENT_COLUMNS:
+        pdf.text(MARGIN + offset, y, heading, size=9, bold=True, align=align)
+    pdf.rule(MARGIN, y + 4, pdf.width - MARGIN, y + 4)
+    return y + LINE + 2
+
+
+def render_statement(data):
+    farmer = data['farmer']
+    pdf = PDFDocument(title=f"Statement {farmer['registration_number'] or farmer['id']}")
+    y = _header(pdf, "STATEMENT OF ACCOUNT", f"{data['period']}  -  issued {data['issued']}")
+    y = _pairs(pdf, y, _farmer_pairs(farmer))
+    y += LINE
+
+    balance = data['balance']
+    y = _pairs(pdf, y, [
+        ("Plot fee due", money(balance['amount_due'])),
+        ("Plot fee paid", money(balance['paid_plot_fee'])),
+        ("Fines paid", money(balance['paid_fine'])),
+        ("Contributions paid", money(balance['paid_contribution'])),
+        ("Other payments", money(balance['paid_other'])),
+    ], label_width=150)
+    pdf.text(MARGIN, y + 4, "Outstanding", size=12, bold=True)
+    pdf.text(MARGIN + 150, y + 4, money(balance['outstanding']), size=12, bold=True)
+    y += LINE * 2 + 10
+
+    y = _table_header(pdf, y)
+    bottom = pdf.height - 70
+    if not data['payments']:
+        pdf.text(MARGIN, y, "No payments in this period.", size=9)
+    for row in data['payments']:
+        if y > bottom:
+            pdf.new_page()
+            y = _table_header(pdf, 60)
+        values = [
+            row['date_paid'], row['number'], row['payment_type'], row['method'],
+            (row['reference_code'] or '')[:28], money(row['amount']).replace('MWK ', ''),
+            '' if row['is_verified'] else '*',
+        ]
+        for value, (_, offset, align) in zip(values, STATEMENT_COLUMNS):
+            pdf.text(MARGIN + offset, y, value, size=9, align=align)
+        y += LINE - 2
+
+    y += 4
+    pdf.rule(MARGIN, y, pdf.width - MARGIN, y)
+    pdf.text(MARGIN, y + LINE, "Total paid in period", size=10, bold=True)
+    pdf.text(MARGIN + 455, y + LINE, money(data['period_total']), size=10, bold=True, align='right')
+    if any(not row['is_verified'] for row in data['payments']):
+        pdf.text(MARGIN, y + LINE * 2 + 4, "* not yet verified", size=8)
+
+    name = f"statement-{_slug(farmer['registration_number'] or farmer['id'])}-{_slug(farmer['last_name'])}.pdf"
+    return name, pdf.render()
+
+
+RENDERERS = {
+    'receipts': render_receipt,
+    'statements': render_statement,
+}
+
+
+def render(kind, data):
+    return RENDERERS[kind](data)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from payments.balances import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute every farmer balance from farmers and payments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} farmer balances."))
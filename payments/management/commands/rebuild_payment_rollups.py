@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from payments.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily payment rollups from payments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} payment rollup rows."))
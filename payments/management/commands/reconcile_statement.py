@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.reconciliation import (
+    DEFAULT_AMOUNT_TOLERANCE, DEFAULT_DATE_TOLERANCE, PROVIDERS,
+    StatementFormatError, StatementReconciler, iter_statement_rows, write_exceptions,
+)
+
+
+class Command(BaseCommand):
+    help = "Verify payments against an Airtel Money or TNM Mpamba statement (CSV)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path to the statement .csv file")
+        parser.add_argument('--provider', required=True, choices=sorted(PROVIDERS))
+        parser.add_argument('--amount-tolerance', default=str(DEFAULT_AMOUNT_TOLERANCE),
+                            help="Largest accepted amount difference (MWK)")
+        parser.add_argument('--date-tolerance', type=int, default=DEFAULT_DATE_TOLERANCE,
+                            help="Largest accepted difference in days")
+        parser.add_argument('--user', help="Username recorded as the verifier")
+        parser.add_argument('--exceptions', help="Write unmatched lines to this CSV file")
+        parser.add_argument('--dry-run', action='store_true', help="Match without verifying")
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user named {options['user']!r}")
+
+        try:
+            reconciler = StatementReconciler(
+                options['provider'], user=user,
+                amount_tolerance=options['amount_tolerance'],
+                date_tolerance=options['date_tolerance'],
+                dry_run=options['dry_run'],
+            )
+            with open(options['path'], 'rb') as fileobj:
+                report = reconciler.run(iter_statement_rows(fileobj))
+        except OSError as e:
+            raise CommandError(f"Cannot open {options['path']}: {e}")
+        except StatementFormatError as e:
+            raise CommandError(str(e))
+        except UnicodeDecodeError:
+            raise CommandError("The statement must be a UTF-8 CSV file.")
+
+        if options['exceptions']:
+            with open(options['exceptions'], 'w', newline='', encoding='utf-8') as out:
+                write_exceptions(report, out)
+        else:
+            for exception in report['exceptions']:
+                self.stderr.write(
+                    f"Line {exception['line']} ({exception['reference']}): "
+                    f"{exception['reason']} {exception['detail']}".rstrip()
+                )
+
+        verb = "would be verified" if report['dry_run'] else "verified"
+        count = report['matched'] if report['dry_run'] else report['verified']
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['total_lines']} lines read, {report['matched']} matched, "
+            f"{count} {verb}, {report['failed']} exceptions."
+        ))
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments import documents
+from payments.models import DocumentJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Render payment receipts or farmer statements to a zip of PDFs across "
+        "a process pool, or run queued document jobs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', nargs='?', choices=[kind for kind, _ in DocumentJob.KIND_CHOICES])
+        parser.add_argument('--output', help="Zip file to write")
+        parser.add_argument('--block', type=int)
+        parser.add_argument('--section', type=int)
+        parser.add_argument('--farmer', type=int, action='append', dest='farmer_ids')
+        parser.add_argument('--payment', type=int, action='append', dest='payment_ids')
+        parser.add_argument('--date-from')
+        parser.add_argument('--date-to')
+        parser.add_argument('--workers', type=int, help="Worker processes (default DOCUMENT_WORKERS)")
+        parser.add_argument('--job', type=int, help="Run this queued document job")
+        parser.add_argument('--pending', action='store_true', help="Run every queued document job")
+
+    def handle(self, *args, **options):
+        if options['job'] or options['pending']:
+            jobs = DocumentJob.objects.filter(status='queued').order_by('created_at')
+            if options['job']:
+                jobs = DocumentJob.objects.filter(pk=options['job'])
+            for job in jobs:
+                job = documents.run_job(job, workers=options['workers'])
+                self.stdout.write(f"Job #{job.pk} {job.kind}: {job.status} ({job.completed}/{job.total})")
+                if job.error:
+                    self.stderr.write(job.error)
+            return
+
+        if not options['kind'] or not options['output']:
+            raise CommandError("Give a kind and --output, or --job/--pending.")
+        try:
+            params = documents.clean_params(options['kind'], {
+                name: options[name]
+                for name in ('block', 'section', 'farmer_ids', 'payment_ids', 'date_from', 'date_to')
+            })
+        except documents.SelectionError as e:
+            raise CommandError(str(e))
+
+        total = documents.select(options['kind'], params).count()
+        self.stdout.write(f"Rendering {total} {options['kind']}...")
+        start = time.perf_counter()
+
+        def progress(done):
+            self.stdout.write(f"  {done}/{total}")
+
+        with open(options['output'], 'wb') as fileobj:
+            count = documents.write_archive(
+                options['kind'], params, fileobj, workers=options['workers'], progress=progress
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {count} documents to {options['output']} in {time.perf_counter() - start:.1f}s."
+        ))
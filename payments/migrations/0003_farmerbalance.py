@@ -0,0 +1,83 @@
+# Generated by Django 5.2 on 2026-10-18 13:52
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max, Sum
+
+PAID_FIELDS = {
+    'plot_fee': 'paid_plot_fee',
+    'fine': 'paid_fine',
+    'contribution': 'paid_contribution',
+    'other': 'paid_other',
+}
+
+
+def populate_balances(apps, schema_editor):
+    Farmer = apps.get_model('farmers', 'Farmer')
+    Payment = apps.get_model('payments', 'Payment')
+    FarmerBalance = apps.get_model('payments', 'FarmerBalance')
+
+    paid = {}
+    for row in Payment.objects.values('farmer_id', 'payment_type').annotate(
+        total=Sum('amount'), last=Max('date_paid')
+    ).order_by():
+        entry = paid.setdefault(row['farmer_id'], {'last': None})
+        field = PAID_FIELDS.get(row['payment_type'], 'paid_other')
+        entry[field] = entry.get(field, Decimal('0')) + row['total']
+        if entry['last'] is None or row['last'] > entry['last']:
+            entry['last'] = row['last']
+
+    balances = []
+    for farmer in Farmer.objects.iterator(chunk_size=1000):
+        entry = paid.get(farmer.pk, {})
+        amounts = {field: entry.get(field, Decimal('0')) for field in PAID_FIELDS.values()}
+        balances.append(FarmerBalance(
+            farmer_id=farmer.pk,
+            block_id=farmer.block_id,
+            section_id=farmer.section_id,
+            is_active=farmer.is_active,
+            amount_due=farmer.total_amount,
+            total_paid=sum(amounts.values()),
+            outstanding=farmer.total_amount - amounts['paid_plot_fee'],
+            last_payment_date=entry.get('last'),
+            **amounts
+        ))
+    FarmerBalance.objects.bulk_create(balances, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0005_farmer_search_text'),
+        ('payments', '0002_alter_payment_options_payment_is_verified_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FarmerBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True)),
+                ('amount_due', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_plot_fee', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_fine', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_contribution', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_other', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('last_payment_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('block', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='farmers.block')),
+                ('farmer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='balance', to='farmers.farmer')),
+                ('section', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='farmers.section')),
+            ],
+            options={
+                'verbose_name': 'Farmer Balance',
+                'verbose_name_plural': 'Farmer Balances',
+                'indexes': [models.Index(fields=['is_active', '-outstanding'], name='balance_outstanding_idx'), models.Index(fields=['block', 'is_active', '-outstanding'], name='balance_block_idx')],
+            },
+        ),
+        migrations.RunPython(populate_balances, migrations.RunPython.noop),
+    ]
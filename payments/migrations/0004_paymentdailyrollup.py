@@ -0,0 +1,56 @@
+# Generated by Django 5.2 on 2026-10-18 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_rollups(apps, schema_editor):
+    Payment = apps.get_model('payments', 'Payment')
+    PaymentDailyRollup = apps.get_model('payments', 'PaymentDailyRollup')
+
+    groups = Payment.objects.values(
+        'date_paid', 'farmer__block_id', 'payment_type', 'method', 'is_verified'
+    ).annotate(total_count=Count('id'), total_amount=Sum('amount')).order_by()
+    PaymentDailyRollup.objects.bulk_create([
+        PaymentDailyRollup(
+            day=group['date_paid'],
+            block_id=group['farmer__block_id'],
+            payment_type=group['payment_type'],
+            method=group['method'],
+            is_verified=group['is_verified'],
+            count=group['total_count'],
+            amount=group['total_amount'],
+        )
+        for group in groups
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0007_referencedataversion'),
+        ('payments', '0003_farmerbalance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('payment_type', models.CharField(choices=[('plot_fee', 'Plot Fee'), ('fine', 'Fine'), ('contribution', 'Scheme Contribution'), ('other', 'Other')], max_length=20)),
+                ('method', models.CharField(choices=[('cash', 'Cash'), ('airtel', 'Airtel Money'), ('tnm', 'TNM Mpamba'), ('bank', 'Bank Transfer'), ('other', 'Other')], max_length=10)),
+                ('is_verified', models.BooleanField()),
+                ('count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('block', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='farmers.block')),
+            ],
+            options={
+                'verbose_name': 'Payment Daily Rollup',
+                'verbose_name_plural': 'Payment Daily Rollups',
+                'indexes': [models.Index(fields=['day', 'block', 'payment_type', 'method', 'is_verified'], name='rollup_key_idx'), models.Index(fields=['block', 'day'], name='rollup_block_day_idx')],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
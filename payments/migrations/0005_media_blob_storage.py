@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 14:14
+
+import limphasaScheme.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_paymentdailyrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=limphasaScheme.storage.blob_storage, upload_to='payment_receipts/%Y/%m/%d/'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 14:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0008_media_blob_storage'),
+        ('payments', '0006_documentjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['farmer', 'date_paid', 'id'], name='payment_farmer_date_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-18 14:45
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+KEY = ('day', 'block_id', 'payment_type', 'method', 'is_verified')
+
+
+def recompute_if_duplicated(apps, schema_editor):
+    """
+    Rows sharing a key (from racing first writers) were all moved by every
+    later update, so their sums are wrong; recompute the table from payments.
+    """
+    PaymentDailyRollup = apps.get_model('payments', 'PaymentDailyRollup')
+    Payment = apps.get_model('payments', 'Payment')
+    duplicated = PaymentDailyRollup.objects.values(*KEY).annotate(rows=Count('id')).filter(rows__gt=1)
+    if not duplicated.exists():
+        return
+    groups = Payment.objects.values(
+        'date_paid', 'farmer__block_id', 'payment_type', 'method', 'is_verified'
+    ).annotate(total_count=Count('id'), total_amount=Sum('amount')).order_by()
+    PaymentDailyRollup.objects.all().delete()
+    PaymentDailyRollup.objects.bulk_create(
+        [
+            PaymentDailyRollup(
+                day=group['date_paid'], block_id=group['farmer__block_id'],
+                payment_type=group['payment_type'], method=group['method'],
+                is_verified=group['is_verified'],
+                count=group['total_count'], amount=group['total_amount'],
+            )
+            for group in groups.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0008_media_blob_storage'),
+        ('payments', '0007_payment_farmer_date_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_if_duplicated, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='paymentdailyrollup',
+            name='rollup_key_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='paymentdailyrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'block', 'payment_type', 'method', 'is_verified'), name='rollup_key_unique', nulls_distinct=False),
+        ),
+    ]
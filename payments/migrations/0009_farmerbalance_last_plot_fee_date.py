@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 14:48
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def backfill_last_plot_fee_date(apps, schema_editor):
+    FarmerBalance = apps.get_model('payments', 'FarmerBalance')
+    Payment = apps.get_model('payments', 'Payment')
+    last = Payment.objects.filter(
+        farmer_id=OuterRef('farmer_id'), payment_type='plot_fee'
+    ).values('farmer_id').annotate(last=Max('date_paid')).values('last')
+    FarmerBalance.objects.update(last_plot_fee_date=Subquery(last[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_rollup_key_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='farmerbalance',
+            name='last_plot_fee_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_last_plot_fee_date, migrations.RunPython.noop),
+    ]
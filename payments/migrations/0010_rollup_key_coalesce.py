@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 15:01
+
+from importlib import import_module
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+# 0008's nulls_distinct=False constraint is skipped below PostgreSQL 15 (and
+# on SQLite), so rows without a block may have been duplicated since then
+recompute_if_duplicated = import_module('payments.migrations.0008_rollup_key_unique').recompute_if_duplicated
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0008_media_blob_storage'),
+        ('payments', '0009_farmerbalance_last_plot_fee_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_if_duplicated, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='paymentdailyrollup',
+            name='rollup_key_unique',
+        ),
+        migrations.AddConstraint(
+            model_name='paymentdailyrollup',
+            constraint=models.UniqueConstraint(models.F('day'), django.db.models.functions.comparison.Coalesce('block', 0, output_field=models.BigIntegerField()), models.F('payment_type'), models.F('method'), models.F('is_verified'), name='rollup_key_unique'),
+        ),
+    ]
@@ -1,10 +1,12 @@
 # payments/models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 
-from farmers.models import Farmer
+from farmers.models import Farmer, Block, Section
+from limphasaScheme.storage import blob_storage
 
 User = get_user_model()
 
@@ -53,6 +55,7 @@ class Payment(models.Model):
     )
     attachment = models.FileField(
         upload_to="payment_receipts/%Y/%m/%d/",
+        storage=blob_storage,
         blank=True,
         null=True
     )
@@ -78,6 +81,10 @@ class Payment(models.Model):
         ordering = ['-date_paid', '-timestamp']
         verbose_name = "Payment"
         verbose_name_plural = "Payments"
+        indexes = [
+            # Farmer statements (payments.statements)
+            models.Index(fields=['farmer', 'date_paid', 'id'], name='payment_farmer_date_idx'),
+        ]
         permissions = [
             ("verify_payment", "Can verify payments"),
             ("view_all_payments", "Can view all payments"),
@@ -87,10 +94,46 @@ class Payment(models.Model):
         return f"Payment #{self.id}: {self.farmer} - {self.amount} ({self.date_paid})"
 
     def save(self, *args, **kwargs):
+        from . import balances, rollups
+
         # auto-stamp verification_date when marking verified
         if self.is_verified and not self.verification_date:
             self.verification_date = timezone.now()
-        super().save(*args, **kwargs)
+
+        # block of the payment's previous farmer, when this save moves it
+        self._previous_block_id = None
+
+        update_fields = kwargs.get('update_fields')
+        ledger = balances.touches_ledger(update_fields)
+        rollup = rollups.touches_rollup(update_fields)
+        if not (ledger or rollup):
+            super().save(*args, **kwargs)
+            return
+
+        # keep the farmer's balance and the daily rollups in step with this payment
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                fields = dict.fromkeys(balances.LEDGER_FIELDS + rollups.ROLLUP_FIELDS)
+                previous = Payment.objects.filter(pk=self.pk).values(*fields).first()
+            if previous and previous['farmer_id'] != self.farmer_id:
+                self._previous_block_id = Farmer.objects.filter(
+                    pk=previous['farmer_id']
+                ).values_list('block_id', flat=True).first()
+            super().save(*args, **kwargs)
+            if ledger:
+                balances.record_change(previous, self)
+            if rollup:
+                rollups.record_change(previous, self)
+
+    def delete(self, *args, **kwargs):
+        from . import balances, rollups
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            balances.record_delete(self)
+            rollups.record_delete(self)
+        return result
 
     @property
     def total_amount_due(self):
@@ -99,3 +142,118 @@ class Payment(models.Model):
         number_of_plots * amount_per_plot
         """
         return self.farmer.number_of_plots * self.farmer.amount_per_plot
+
+
+class FarmerBalance(models.Model):
+    """
+    Running balance per farmer, kept current by Payment.save()/delete() and
+    Farmer saves (see payments.balances). ``outstanding`` is the plot fee
+    still owed: amount_due minus plot-fee payments. Fines, contributions and
+    other payments are tracked but do not reduce it.
+    """
+    farmer = models.OneToOneField(
+        Farmer,
+        on_delete=models.CASCADE,
+        related_name="balance"
+    )
+    # Copied from the farmer so arrears queries stay on this table
+    block = models.ForeignKey(Block, on_delete=models.SET_NULL, null=True, blank=True)
+    section = models.ForeignKey(Section, on_delete=models.SET_NULL, null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    amount_due = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_plot_fee = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_fine = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_contribution = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_other = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    outstanding = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    last_payment_date = models.DateField(null=True, blank=True)
+    # Arrears age from here: other payment types do not settle plot fees
+    last_plot_fee_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Farmer Balance"
+        verbose_name_plural = "Farmer Balances"
+        indexes = [
+            models.Index(fields=['is_active', '-outstanding'], name='balance_outstanding_idx'),
+            models.Index(fields=['block', 'is_active', '-outstanding'], name='balance_block_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.farmer}: {self.outstanding} outstanding"
+
+
+class PaymentDailyRollup(models.Model):
+    """
+    Count and amount of payments per day, block, type, method and
+    verification state, kept current by Payment.save()/delete() and farmer
+    block changes (see payments.rollups). Payment statistics are read from
+    here instead of scanning payments.
+    """
+    day = models.DateField()
+    # The farmer's block; null for farmers without one
+    block = models.ForeignKey(Block, on_delete=models.SET_NULL, null=True, blank=True)
+    payment_type = models.CharField(max_length=20, choices=Payment.PAYMENT_TYPE_CHOICES)
+    method = models.CharField(max_length=10, choices=Payment.METHOD_CHOICES)
+    is_verified = models.BooleanField()
+    count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Payment Daily Rollup"
+        verbose_name_plural = "Payment Daily Rollups"
+        constraints = [
+            # Coalesce, not nulls_distinct (PostgreSQL 15+ only), so rows
+            # without a block are unique on every backend
+            models.UniqueConstraint(
+                'day', Coalesce('block', 0, output_field=models.BigIntegerField()),
+                'payment_type', 'method', 'is_verified',
+                name='rollup_key_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['block', 'day'], name='rollup_block_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.payment_type}/{self.method}: {self.count} ({self.amount})"
+
+
+class DocumentJob(models.Model):
+    """
+    A batch of receipts or statements rendered to a zip archive in the
+    background (see payments.documents).
+    """
+    KIND_CHOICES = [
+        ("receipts", "Payment receipts"),
+        ("statements", "Farmer statements"),
+    ]
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    # Selection: block, section, farmer_ids, payment_ids, date_from, date_to
+    params = models.JSONField(default=dict, blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    archive = models.FileField(upload_to="documents/", blank=True, null=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Document Job"
+        verbose_name_plural = "Document Jobs"
+
+    def __str__(self):
+        return f"{self.get_kind_display()} job #{self.id} ({self.status})"
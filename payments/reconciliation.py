@@ -0,0 +1,247 @@
+"""
+Reconciliation of Airtel Money / TNM Mpamba statements against payments.
+
+A statement export (CSV) is read into memory, and the provider's
+unverified payments in the statement's date range are indexed by
+normalized reference code, so every line is matched with a dict lookup
+instead of a query. A line matches a payment with the same reference
+whose amount and date fall within the tolerances. Matched payments are
+verified together in one transaction (payments.verification). Lines that
+do not match are returned as exceptions with the reason, and can be
+written out as a CSV report.
+"""
+import csv
+import io
+import re
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from .models import Payment
+from .verification import verify_payments
+
+PROVIDERS = {
+    'airtel': "Airtel Money",
+    'tnm': "TNM Mpamba",
+}
+
+DEFAULT_AMOUNT_TOLERANCE = Decimal('0')
+DEFAULT_DATE_TOLERANCE = 3  # days between the statement and date_paid
+
+# Column names used by the provider exports, after _normalize_header
+REFERENCE_COLUMNS = (
+    'transaction_id', 'trans_id', 'txn_id', 'tid', 'receipt_no', 'receipt',
+    'reference', 'reference_code', 'external_reference',
+)
+AMOUNT_COLUMNS = ('amount', 'credit', 'credit_amount', 'transaction_amount')
+DATE_COLUMNS = ('date', 'transaction_date', 'date_time', 'datetime', 'trans_date', 'completion_time')
+
+DATE_FORMATS = (
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M',
+    '%d/%m/%Y', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M',
+    '%d-%m-%Y', '%d-%m-%Y %H:%M:%S', '%d-%m-%Y %H:%M',
+    '%d-%b-%Y', '%d-%b-%Y %H:%M:%S', '%d %b %Y', '%d.%m.%Y',
+)
+
+EXCEPTION_COLUMNS = ['line', 'reference', 'amount', 'date', 'reason', 'detail']
+
+
+class StatementFormatError(Exception):
+    """The uploaded file cannot be read as a provider statement."""
+
+
+def _normalize_header(value):
+    return re.sub(r'[^a-z0-9]+', '_', str(value or '').strip().lower()).strip('_')
+
+
+def normalize_reference(value):
+    """Upper-case alphanumerics only, so 'ci 2105.1234' matches 'CI21051234'."""
+    return re.sub(r'[^0-9A-Z]', '', str(value or '').upper())
+
+
+def parse_amount(value):
+    text = re.sub(r'(?i)mwk|mk|,|\s', '', str(value or ''))
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        return None
+    return amount if amount.is_finite() else None
+
+
+def parse_date(value):
+    text = str(value or '').strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _pick_column(header, names, label):
+    for name in names:
+        if name in header:
+            return name
+    raise StatementFormatError(f"No {label} column; expected one of: {', '.join(names)}")
+
+
+def iter_statement_rows(fileobj):
+    """Yield ``(line_number, reference, amount, date)`` as text for each statement line."""
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text)
+    try:
+        header = [_normalize_header(h) for h in next(reader)]
+    except StopIteration:
+        raise StatementFormatError("The file is empty.")
+    reference_column = _pick_column(header, REFERENCE_COLUMNS, "transaction reference")
+    amount_column = _pick_column(header, AMOUNT_COLUMNS, "amount")
+    date_column = _pick_column(header, DATE_COLUMNS, "date")
+
+    for line_number, row in enumerate(reader, start=2):
+        if not any(cell.strip() for cell in row):
+            continue
+        values = dict(zip(header, row))
+        yield (
+            line_number,
+            values.get(reference_column, '').strip(),
+            values.get(amount_column, '').strip(),
+            values.get(date_column, '').strip(),
+        )
+    text.detach()
+
+
+class StatementReconciler:
+    """
+    Match statement lines to unverified payments and verify the matches.
+
+    ``run()`` returns a report::
+
+        {"provider": "airtel", "total_lines": 3, "matched": 2, "verified": 2,
+         "failed": 1, "dry_run": False,
+         "matches": [{"line": 2, "payment": 41}, ...],
+         "exceptions": [{"line": 4, "reference": "CI2105", "amount": "5000",
+                         "date": "2025-06-02", "reason": "no_payment",
+                         "detail": "..."}]}
+
+    Line numbers match the file, so the header is line 1.
+    """
+
+    def __init__(self, provider, user=None, amount_tolerance=DEFAULT_AMOUNT_TOLERANCE,
+                 date_tolerance=DEFAULT_DATE_TOLERANCE, dry_run=False):
+        if provider not in PROVIDERS:
+            raise StatementFormatError(
+                f"Unknown provider {provider!r}; expected one of: {', '.join(PROVIDERS)}"
+            )
+        self.provider = provider
+        self.user = user
+        try:
+            self.amount_tolerance = abs(Decimal(str(amount_tolerance)))
+            self.date_tolerance = timedelta(days=abs(int(date_tolerance)))
+        except (InvalidOperation, TypeError, ValueError):
+            raise StatementFormatError("Tolerances must be numbers.")
+        self.dry_run = dry_run
+        self.report = {
+            'provider': provider, 'total_lines': 0, 'matched': 0, 'verified': 0,
+            'failed': 0, 'dry_run': dry_run, 'matches': [], 'exceptions': [],
+        }
+
+    def add_exception(self, line, reason, detail=''):
+        line_number, reference, amount, date = line
+        self.report['failed'] += 1
+        self.report['exceptions'].append({
+            'line': line_number, 'reference': reference, 'amount': amount,
+            'date': date, 'reason': reason, 'detail': detail,
+        })
+
+    def run(self, rows):
+        lines = []
+        for line in rows:
+            self.report['total_lines'] += 1
+            line_number, reference, raw_amount, raw_date = line
+            amount, paid_on = parse_amount(raw_amount), parse_date(raw_date)
+            key = normalize_reference(reference)
+            if not key:
+                self.add_exception(line, 'invalid', "Missing transaction reference.")
+            elif amount is None:
+                self.add_exception(line, 'invalid', "Unreadable amount.")
+            elif paid_on is None:
+                self.add_exception(line, 'invalid', "Unreadable date.")
+            else:
+                lines.append((line, key, amount, paid_on))
+
+        if lines:
+            self.match(lines)
+        if self.report['matches'] and not self.dry_run:
+            self.report['verified'] = verify_payments(
+                Payment.objects.filter(pk__in=[m['payment'] for m in self.report['matches']]),
+                self.user,
+            )
+        self.report['exceptions'].sort(key=lambda exception: exception['line'])
+        return self.report
+
+    def payments_in_range(self, lines, verified):
+        first = min(paid_on for *_, paid_on in lines) - self.date_tolerance
+        last = max(paid_on for *_, paid_on in lines) + self.date_tolerance
+        return Payment.objects.filter(
+            method=self.provider, is_verified=verified,
+            date_paid__gte=first, date_paid__lte=last,
+        ).exclude(reference_code__isnull=True).exclude(reference_code='')
+
+    def build_index(self, lines):
+        """Normalized reference -> unverified payments carrying it."""
+        index = {}
+        rows = self.payments_in_range(lines, verified=False).values_list(
+            'pk', 'reference_code', 'amount', 'date_paid'
+        ).order_by('pk')
+        for pk, reference, amount, date_paid in rows.iterator(chunk_size=2000):
+            index.setdefault(normalize_reference(reference), []).append((pk, amount, date_paid))
+        return index
+
+    def match(self, lines):
+        index = self.build_index(lines)
+        seen = set()
+        claimed = set()
+        verified = None  # references already verified, loaded on first need
+
+        for line, key, amount, paid_on in lines:
+            if key in seen:
+                self.add_exception(line, 'duplicate_line', "Reference already appears earlier in the statement.")
+                continue
+            seen.add(key)
+
+            candidates = [c for c in index.get(key, ()) if c[0] not in claimed]
+            if not candidates:
+                if verified is None:
+                    verified = {
+                        normalize_reference(reference)
+                        for reference in self.payments_in_range(lines, verified=True)
+                        .values_list('reference_code', flat=True).iterator(chunk_size=2000)
+                    }
+                if key in verified:
+                    self.add_exception(line, 'already_verified', "The payment with this reference is already verified.")
+                else:
+                    self.add_exception(line, 'no_payment', "No unverified payment has this reference.")
+                continue
+
+            in_range = [
+                c for c in candidates
+                if abs(c[1] - amount) <= self.amount_tolerance
+                and abs(c[2] - paid_on) <= self.date_tolerance
+            ]
+            if not in_range:
+                recorded = ", ".join(f"#{pk}: {value} on {date_paid}" for pk, value, date_paid in candidates)
+                dates_ok = any(abs(c[2] - paid_on) <= self.date_tolerance for c in candidates)
+                reason = 'amount_mismatch' if dates_ok else 'date_mismatch'
+                self.add_exception(line, reason, f"Recorded as {recorded}.")
+                continue
+
+            pk = min(in_range, key=lambda c: (abs(c[2] - paid_on), abs(c[1] - amount), c[0]))[0]
+            claimed.add(pk)
+            self.report['matched'] += 1
+            self.report['matches'].append({'line': line[0], 'payment': pk})
+
+
+def write_exceptions(report, fileobj):
+    """Write the report's exceptions to a text file as CSV."""
+    writer = csv.DictWriter(fileobj, fieldnames=EXCEPTION_COLUMNS)
+    writer.writeheader()
+    writer.writerows(report['exceptions'])
@@ -0,0 +1,203 @@
+"""
+Daily payment rollups and the statistics read from them.
+
+PaymentDailyRollup holds one row per day x block x payment_type x method x
+verified with the count and amount of those payments. Payment.save()/
+delete() call ``record_change``/``record_delete`` inside their
+transaction, and farmer saves call ``move_farmer`` when a farmer changes
+block (see payments.signals), so the rows always add up to the payments
+table. The key is unique, so a writer that finds no row inserts it with
+ON CONFLICT DO NOTHING and then updates whichever row won.
+
+``payment_stats`` answers the stats endpoint, for any date range and
+block, with one conditional-aggregation query over the rollups and
+``block_breakdown`` groups the same rows per block. ``rebuild`` recomputes
+the table from payments (``manage.py rebuild_payment_rollups``).
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from farmers.models import Farmer
+from .models import Payment, PaymentDailyRollup
+
+# Payment fields that move a payment between rollup rows
+ROLLUP_FIELDS = ('farmer_id', 'amount', 'payment_type', 'date_paid', 'method', 'is_verified')
+
+
+def touches_rollup(update_fields):
+    return update_fields is None or bool({'farmer', *ROLLUP_FIELDS}.intersection(update_fields))
+
+
+def _farmer_blocks(*farmer_ids):
+    return dict(Farmer.objects.filter(pk__in=set(farmer_ids)).values_list('pk', 'block_id'))
+
+
+def _apply(key, count, amount):
+    rows = PaymentDailyRollup.objects.filter(**key)
+    changes = {'count': F('count') + count, 'amount': F('amount') + amount}
+    if not rows.update(**changes):
+        PaymentDailyRollup.objects.bulk_create(
+            [PaymentDailyRollup(count=0, amount=0, **key)], ignore_conflicts=True
+        )
+        rows.update(**changes)
+    if count < 0:
+        # Drop emptied rows so empty windows sum to None, as over payments
+        rows.filter(count__lte=0).delete()
+
+
+def _key(fields, block_id):
+    return {
+        'day': fields['date_paid'],
+        'block_id': block_id,
+        'payment_type': fields['payment_type'],
+        'method': fields['method'],
+        'is_verified': fields['is_verified'],
+    }
+
+
+def record_change(previous, payment):
+    """Apply a saved payment; ``previous`` holds its ROLLUP_FIELDS before the save."""
+    current = {name: getattr(payment, name) for name in ROLLUP_FIELDS}
+    if previous is not None and all(previous[name] == current[name] for name in ROLLUP_FIELDS):
+        return
+    farmer_ids = [current['farmer_id']] + ([previous['farmer_id']] if previous else [])
+    blocks = _farmer_blocks(*farmer_ids)
+    if previous is not None:
+        _apply(_key(previous, blocks.get(previous['farmer_id'])), -1, -previous['amount'])
+    _apply(_key(current, blocks.get(current['farmer_id'])), 1, current['amount'])
+
+
+def record_delete(payment):
+    fields = {name: getattr(payment, name) for name in ROLLUP_FIELDS}
+    block_id = _farmer_blocks(payment.farmer_id).get(payment.farmer_id)
+    _apply(_key(fields, block_id), -1, -fields['amount'])
+
+
+def record_verified(payments):
+    """Move ``payments`` (all still unverified) to the verified rows, before they are updated."""
+    groups = payments.values(
+        'date_paid', 'farmer__block_id', 'payment_type', 'method'
+    ).annotate(total_count=Count('id'), total_amount=Sum('amount')).order_by()
+    for group in groups:
+        key = _key({**group, 'is_verified': False}, group['farmer__block_id'])
+        _apply(key, -group['total_count'], -group['total_amount'])
+        _apply({**key, 'is_verified': True}, group['total_count'], group['total_amount'])
+
+
+def move_farmer(farmer_id, old_block_id, new_block_id):
+    """Move a farmer's payments to their new block's rows."""
+    groups = Payment.objects.filter(farmer_id=farmer_id).values(
+        'date_paid', 'payment_type', 'method', 'is_verified'
+    ).annotate(total_count=Count('id'), total_amount=Sum('amount')).order_by()
+    for group in groups:
+        _apply(_key(group, old_block_id), -group['total_count'], -group['total_amount'])
+        _apply(_key(group, new_block_id), group['total_count'], group['total_amount'])
+
+
+def rebuild(batch_size=1000):
+    """Recompute every rollup row from payments; returns the row count."""
+    groups = Payment.objects.values(
+        'date_paid', 'farmer__block_id', 'payment_type', 'method', 'is_verified'
+    ).annotate(total_count=Count('id'), total_amount=Sum('amount')).order_by()
+    with transaction.atomic():
+        PaymentDailyRollup.objects.all().delete()
+        rows = PaymentDailyRollup.objects.bulk_create(
+            [
+                PaymentDailyRollup(
+                    count=group['total_count'], amount=group['total_amount'],
+                    **_key(group, group['farmer__block_id']),
+                )
+                for group in groups.iterator(chunk_size=batch_size)
+            ],
+            batch_size=batch_size,
+        )
+    return len(rows)
+
+
+# -------------------
+# Reading
+# -------------------
+def payment_stats(today, block_id=None, date_from=None, date_to=None):
+    """
+    The payments stats payload from one aggregate over the rollups.
+
+    ``block_id`` limits it to one block. ``date_from``/``date_to`` (either
+    may be None) add a ``range`` window alongside today, last week and last
+    month.
+    """
+    rows = PaymentDailyRollup.objects.all()
+    if block_id is not None:
+        rows = rows.filter(block_id=block_id)
+
+    windows = {
+        'today': Q(day=today),
+        'last_week': Q(day__gte=today - timedelta(days=7)),
+        'last_month': Q(day__gte=today - timedelta(days=30)),
+    }
+    if date_from or date_to:
+        window = Q()
+        if date_from:
+            window &= Q(day__gte=date_from)
+        if date_to:
+            window &= Q(day__lte=date_to)
+        windows['range'] = window
+
+    aggregates = {
+        'total_payments': Sum('count', default=0),
+        'total_amount': Sum('amount'),
+        'verified': Sum('count', filter=Q(is_verified=True), default=0),
+        'unverified': Sum('count', filter=Q(is_verified=False), default=0),
+    }
+    for name, q in windows.items():
+        aggregates[f'{name}_count'] = Sum('count', filter=q, default=0)
+        aggregates[f'{name}_amount'] = Sum('amount', filter=q)
+    for payment_type, _ in Payment.PAYMENT_TYPE_CHOICES:
+        q = Q(payment_type=payment_type)
+        aggregates[f'type_{payment_type}_count'] = Sum('count', filter=q, default=0)
+        aggregates[f'type_{payment_type}_amount'] = Sum('amount', filter=q)
+    result = rows.aggregate(**aggregates)
+
+    stats = {
+        'total_payments': result['total_payments'],
+        'total_amount': result['total_amount'] or 0,
+    }
+    for name in windows:
+        # Same keys as the Count('id')/Sum('amount') aggregates this replaced
+        stats[name] = {'id__count': result[f'{name}_count'], 'amount__sum': result[f'{name}_amount']}
+    stats['by_type'] = [
+        {
+            'payment_type': payment_type,
+            'count': result[f'type_{payment_type}_count'],
+            'amount': result[f'type_{payment_type}_amount'],
+        }
+        for payment_type, _ in Payment.PAYMENT_TYPE_CHOICES
+        if result[f'type_{payment_type}_count']
+    ]
+    stats['verification_stats'] = {
+        'verified': result['verified'],
+        'unverified': result['unverified'],
+    }
+    if 'range' in windows:
+        stats['range']['date_from'] = date_from
+        stats['range']['date_to'] = date_to
+    return stats
+
+
+def block_breakdown(block_id=None, date_from=None, date_to=None):
+    """Payment count, amount and verified count per block for a date range."""
+    rows = PaymentDailyRollup.objects.all()
+    if block_id is not None:
+        rows = rows.filter(block_id=block_id)
+    if date_from:
+        rows = rows.filter(day__gte=date_from)
+    if date_to:
+        rows = rows.filter(day__lte=date_to)
+    return list(
+        rows.values('block_id', 'block__name').annotate(
+            payments=Sum('count'),
+            total_amount=Sum('amount'),
+            verified=Sum('count', filter=Q(is_verified=True), default=0),
+        ).filter(payments__gt=0).order_by('block__name')
+    )
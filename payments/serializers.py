@@ -1,10 +1,17 @@
 # payments/serializers.py
 from rest_framework import serializers
-from .models import Payment
-from farmers.serializers import FarmerSerializer
+from django.urls import reverse
+from .models import Payment, FarmerBalance, DocumentJob
+from farmers.serializers import FarmerSerializer, LeanFarmerSerializer
 from farmers.models import Farmer
+from limphasaScheme.fieldsets import SparseFieldsetMixin
+from limphasaScheme.lean import (
+    Field, LeanSerializer, Method, Nested, date_repr, datetime_repr, decimal_repr,
+    file_url, user_repr
+)
+from functools import partial
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     # Nested read-only farmer info
     farmer = FarmerSerializer(read_only=True)
     # Write-only FK for create/update
@@ -52,17 +59,13 @@ class PaymentSerializer(serializers.ModelSerializer):
 
     def get_total_amount(self, obj):
         """
-        Compute farmer.total_amount (plots * amount_per_plot).
-        If farmer has no such attributes, return None.
+        farmer.total_amount (plots * amount_per_plot, stored on Farmer.save()).
+        If there is no farmer, return None.
         """
         farmer = getattr(obj, 'farmer', None)
         if not farmer:
             return None
-        try:
-            # assuming your Farmer model has number_of_plots & amount_per_plot
-            return float(farmer.number_of_plots) * float(farmer.amount_per_plot)
-        except Exception:
-            return None
+        return float(farmer.total_amount)
 
     def validate(self, data):
         # enforce description when type is 'fine'
@@ -74,3 +77,85 @@ class PaymentSerializer(serializers.ModelSerializer):
         # auto-stamp recorded_by from request.user
         validated_data['recorded_by'] = self.context['request'].user
         return super().create(validated_data)
+
+
+class LeanPaymentSerializer(LeanSerializer):
+    """Read-only ``PaymentSerializer`` output built from ``values()`` rows."""
+    fields = {
+        'id': Field('id'),
+        'farmer': Nested(LeanFarmerSerializer, 'farmer'),
+        'total_amount': Field('farmer__total_amount', float),
+        'amount': Field('amount', partial(decimal_repr, max_digits=12, decimal_places=2)),
+        'payment_type': Field('payment_type'),
+        'description': Field('description'),
+        'date_paid': Field('date_paid', date_repr),
+        'method': Field('method'),
+        'reference_code': Field('reference_code'),
+        'attachment': Method('get_attachment', 'attachment'),
+        'attachment_url': Method('get_attachment', 'attachment'),
+        'recorded_by': Method('get_recorded_by', 'recorded_by', 'recorded_by__first_name',
+                              'recorded_by__last_name', 'recorded_by__role'),
+        'timestamp': Field('timestamp', datetime_repr),
+        'is_verified': Field('is_verified'),
+        'verified_by': Method('get_verified_by', 'verified_by', 'verified_by__first_name',
+                              'verified_by__last_name', 'verified_by__role'),
+        'verification_date': Field('verification_date', datetime_repr),
+        'notes': Field('notes'),
+    }
+    ordering_columns = ('id', 'date_paid', 'amount', 'timestamp')
+    attachment_storage = Payment._meta.get_field('attachment').storage
+
+    def get_attachment(self, row):
+        return file_url(self.attachment_storage, row[self.keys['attachment']], self.request)
+
+    def _user(self, row, name):
+        k = self.keys
+        if row[k[name]] is None:
+            return None
+        return user_repr(row[k[f'{name}__first_name']], row[k[f'{name}__last_name']], row[k[f'{name}__role']])
+
+    def get_recorded_by(self, row):
+        return self._user(row, 'recorded_by')
+
+    def get_verified_by(self, row):
+        return self._user(row, 'verified_by')
+
+
+class FarmerBalanceSerializer(serializers.ModelSerializer):
+    farmer_name = serializers.SerializerMethodField()
+    registration_number = serializers.CharField(source='farmer.registration_number', read_only=True)
+    block_name = serializers.CharField(source='block.name', read_only=True, default=None)
+    section_name = serializers.CharField(source='section.name', read_only=True, default=None)
+
+    class Meta:
+        model = FarmerBalance
+        fields = [
+            'id', 'farmer', 'farmer_name', 'registration_number',
+            'block', 'block_name', 'section', 'section_name',
+            'amount_due', 'paid_plot_fee', 'paid_fine',
+            'paid_contribution', 'paid_other', 'total_paid',
+            'outstanding', 'last_payment_date', 'last_plot_fee_date', 'updated_at',
+        ]
+        read_only_fields = fields
+
+    def get_farmer_name(self, obj):
+        return f"{obj.farmer.first_name} {obj.farmer.last_name}"
+
+
+class DocumentJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DocumentJob
+        fields = [
+            'id', 'kind', 'status', 'params', 'total', 'completed', 'error',
+            'created_at', 'started_at', 'finished_at', 'download_url',
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != 'done' or not obj.archive:
+            return None
+        url = reverse('document-job-download', kwargs={'pk': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from farmers.models import Farmer
+from . import aging, balances, rollups
+from .models import FarmerBalance, Payment
+
+
+@receiver(post_save, sender=Farmer)
+def sync_farmer_balance(sender, instance, created, **kwargs):
+    # The balance row still holds the block from before this save
+    previous = list(FarmerBalance.objects.filter(farmer_id=instance.pk).values_list('block_id', flat=True)[:1])
+    balances.sync_farmer(instance)
+    if not created and previous and previous[0] != instance.block_id:
+        rollups.move_farmer(instance.pk, previous[0], instance.block_id)
+    aging.invalidate([instance.block_id, *previous])
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def payment_changed(sender, instance, update_fields=None, **kwargs):
+    if balances.touches_ledger(update_fields):
+        aging.invalidate([instance.farmer.block_id, getattr(instance, '_previous_block_id', None)])
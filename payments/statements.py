@@ -0,0 +1,153 @@
+"""
+Farmer account statements with a running balance computed in SQL.
+
+A farmer's account opens with the plot fee charge (``Farmer.total_amount``)
+and each plot-fee payment reduces it, so the closing balance equals
+``FarmerBalance.outstanding``. Fines, contributions and other payments are
+listed but do not move the balance.
+
+The rows of a page come from one query over the farmer's payments::
+
+    balance = total_amount
+              - (plot fees paid before the page's window)    -- scalar subquery
+              - SUM(plot fee) OVER (ORDER BY date_paid, id)  -- within the window
+
+The window is every row the page's WHERE clause keeps: the date range
+plus the cursor condition, so the SUM only runs over rows from the start
+of the range (or the cursor) onwards and the subquery covers the rest.
+"""
+from decimal import Decimal
+
+from django.db.models import (
+    Case, DecimalField, F, OuterRef, Q, Subquery, Sum, Value, When, Window,
+)
+from django.db.models.expressions import RowRange
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .balances import DUE_PAYMENT_TYPE
+from .models import Payment
+
+ORDERING = ('date_paid', 'id')
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+ROW_COLUMNS = (
+    'id', 'date_paid', 'payment_type', 'description', 'method', 'reference_code',
+    'amount', 'is_verified', 'balance',
+)
+
+
+def _plot_fee():
+    return Case(
+        When(payment_type=DUE_PAYMENT_TYPE, then=F('amount')),
+        default=Value(Decimal('0')),
+        output_field=MONEY,
+    )
+
+
+def _before(values):
+    """Rows at or before the cursor position ``(date_paid, id)``."""
+    date_paid, pk = values
+    return Q(date_paid__lt=date_paid) | Q(date_paid=date_paid, id__lte=pk)
+
+
+def statement_rows(farmer, date_from=None, date_to=None, cursor=None, reverse=False):
+    """
+    The farmer's payments annotated with ``balance`` (after each row).
+    ``cursor`` is the ``(date_paid, id)`` a forward page continues after;
+    the pagination adds the matching WHERE clause and ordering itself.
+    """
+    payments = Payment.objects.filter(farmer_id=farmer.pk)
+    if date_from:
+        payments = payments.filter(date_paid__gte=date_from)
+    if date_to:
+        payments = payments.filter(date_paid__lte=date_to)
+
+    # Plot fees paid before the first row this query can return
+    if cursor is not None and not reverse:
+        before = _before(cursor)
+    elif date_from:
+        before = Q(date_paid__lt=date_from)
+    else:
+        before = None
+
+    paid_before = Value(Decimal('0'), output_field=MONEY)
+    if before is not None:
+        paid_before = Coalesce(
+            Subquery(
+                Payment.objects.filter(before, farmer_id=OuterRef('farmer_id'))
+                .order_by().values('farmer_id')
+                .annotate(total=Sum(_plot_fee())).values('total')[:1],
+                output_field=MONEY,
+            ),
+            Value(Decimal('0')),
+            output_field=MONEY,
+        )
+
+    running = Window(
+        Sum(_plot_fee()),
+        order_by=[F(name).asc() for name in ORDERING],
+        frame=RowRange(start=None, end=0),
+        output_field=MONEY,
+    )
+    return payments.annotate(
+        balance=Value(farmer.total_amount, output_field=MONEY) - paid_before - running,
+    ).values(*ROW_COLUMNS)
+
+
+def _line(kind, date, description, balance, charge=None, **payment):
+    return {
+        'entry': kind,
+        'payment_id': None,
+        'date': date,
+        'description': description,
+        'payment_type': None,
+        'method': None,
+        'reference_code': None,
+        'is_verified': None,
+        'charge': charge,
+        'paid': None,
+        'applies_to_balance': True,
+        **payment,
+        'balance': balance,
+    }
+
+
+def entry(row):
+    """A payment row as a statement line."""
+    return _line(
+        'payment', row['date_paid'], row['description'], row['balance'],
+        payment_id=row['id'],
+        payment_type=row['payment_type'],
+        method=row['method'],
+        reference_code=row['reference_code'],
+        is_verified=row['is_verified'],
+        paid=row['amount'],
+        applies_to_balance=row['payment_type'] == DUE_PAYMENT_TYPE,
+    )
+
+
+def opening_entry(farmer, rows, date_from=None):
+    """
+    The line a statement starts with: the plot fee charge, or with
+    ``date_from`` the balance brought forward, derived from the first row
+    when there is one.
+    """
+    if date_from is None:
+        return _line(
+            'charge', timezone.localdate(farmer.date_registered),
+            f"Plot fee: {farmer.number_of_plots} plot(s) x {farmer.amount_per_plot}",
+            farmer.total_amount, charge=farmer.total_amount,
+        )
+
+    if rows:
+        first = rows[0]
+        applies = first['payment_type'] == DUE_PAYMENT_TYPE
+        balance = first['balance'] + (first['amount'] if applies else 0)
+    else:
+        paid = Payment.objects.filter(
+            farmer_id=farmer.pk, payment_type=DUE_PAYMENT_TYPE, date_paid__lt=date_from
+        ).aggregate(total=Sum('amount'))['total'] or 0
+        balance = farmer.total_amount - paid
+    return _line('opening', date_from, "Balance brought forward", balance)
@@ -1,3 +1,215 @@
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from farmers.models import Block, Farmer, Location, Section
+from . import balances
+from .models import FarmerBalance, Payment
+
+
+def make_farmer(block, section, location, phone, plots=2, per_plot='500.00'):
+    return Farmer.objects.create(
+        first_name="Test", last_name=phone[-3:], gender='male', phone_number=phone,
+        number_of_plots=plots, amount_per_plot=Decimal(per_plot),
+        location=location, block=block, section=section,
+    )
+
+
+def pay(farmer, amount, day, payment_type='plot_fee'):
+    return Payment.objects.create(
+        farmer=farmer, amount=Decimal(amount), payment_type=payment_type,
+        description=payment_type, date_paid=day, method='cash',
+    )
+
+
+class FarmerBalanceTests(TestCase):
+    """FarmerBalance kept current by Payment.save()/delete() (payments.balances)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name="Location")
+        cls.block = Block.objects.create(name="Block A")
+        cls.section = Section.objects.create(name="Section 1", block=cls.block)
+
+    def setUp(self):
+        self.farmer = make_farmer(self.block, self.section, self.location, '0888000001')
+
+    def balance(self, farmer=None):
+        return FarmerBalance.objects.get(farmer=farmer or self.farmer)
+
+    def assertBalance(self, outstanding, paid_plot_fee, paid_fine=Decimal('0'), farmer=None):
+        balance = self.balance(farmer)
+        self.assertEqual(balance.outstanding, Decimal(outstanding))
+        self.assertEqual(balance.paid_plot_fee, Decimal(paid_plot_fee))
+        self.assertEqual(balance.paid_fine, Decimal(paid_fine))
+        self.assertEqual(balance.total_paid, Decimal(paid_plot_fee) + Decimal(paid_fine))
+
+    def test_new_farmer_owes_plot_fee(self):
+        self.assertBalance('1000.00', '0')
+        self.assertIsNone(self.balance().last_payment_date)
+
+    def test_create_plot_fee_reduces_outstanding(self):
+        pay(self.farmer, '300.00', date(2026, 1, 10))
+        self.assertBalance('700.00', '300.00')
+        self.assertEqual(self.balance().last_plot_fee_date, date(2026, 1, 10))
+
+    def test_fine_does_not_reduce_outstanding_or_arrears_date(self):
+        pay(self.farmer, '300.00', date(2026, 1, 10))
+        pay(self.farmer, '50.00', date(2026, 2, 1), payment_type='fine')
+        self.assertBalance('700.00', '300.00', paid_fine='50.00')
+        balance = self.balance()
+        self.assertEqual(balance.last_payment_date, date(2026, 2, 1))
+        self.assertEqual(balance.last_plot_fee_date, date(2026, 1, 10))
+
+    def test_update_amount(self):
+        payment = pay(self.farmer, '300.00', date(2026, 1, 10))
+        payment.amount = Decimal('450.00')
+        payment.save()
+        self.assertBalance('550.00', '450.00')
+
+    def test_change_type(self):
+        payment = pay(self.farmer, '300.00', date(2026, 1, 10))
+        payment.payment_type = 'fine'
+        payment.save()
+        self.assertBalance('1000.00', '0', paid_fine='300.00')
+        self.assertIsNone(self.balance().last_plot_fee_date)
+
+        payment.payment_type = 'plot_fee'
+        payment.save()
+        self.assertBalance('700.00', '300.00')
+        self.assertEqual(self.balance().last_plot_fee_date, date(2026, 1, 10))
+
+    def test_move_to_another_farmer(self):
+        other = make_farmer(self.block, self.section, self.location, '0888000002', plots=1)
+        payment = pay(self.farmer, '300.00', date(2026, 1, 10))
+        payment.farmer = other
+        payment.save()
+        self.assertBalance('1000.00', '0')
+        self.assertBalance('200.00', '300.00', farmer=other)
+
+    def test_delete_recomputes_last_dates(self):
+        pay(self.farmer, '100.00', date(2026, 1, 10))
+        latest = pay(self.farmer, '200.00', date(2026, 3, 1))
+        latest.delete()
+        self.assertBalance('900.00', '100.00')
+        balance = self.balance()
+        self.assertEqual(balance.last_payment_date, date(2026, 1, 10))
+        self.assertEqual(balance.last_plot_fee_date, date(2026, 1, 10))
+
+    def test_update_fields_outside_ledger_leave_balance(self):
+        payment = pay(self.farmer, '300.00', date(2026, 1, 10))
+        payment.notes = "checked"
+        payment.save(update_fields=['notes'])
+        self.assertBalance('700.00', '300.00')
+
+    def test_rebuild_matches_incremental(self):
+        pay(self.farmer, '300.00', date(2026, 1, 10))
+        fine = pay(self.farmer, '20.00', date(2026, 1, 12), payment_type='fine')
+        fine.amount = Decimal('25.00')
+        fine.save()
+        pay(self.farmer, '100.00', date(2026, 2, 1), payment_type='contribution').delete()
+        columns = (
+            'outstanding', 'paid_plot_fee', 'paid_fine', 'paid_contribution', 'paid_other',
+            'total_paid', 'last_payment_date', 'last_plot_fee_date',
+        )
+        incremental = list(FarmerBalance.objects.order_by('farmer_id').values(*columns))
+        balances.rebuild()
+        self.assertEqual(list(FarmerBalance.objects.order_by('farmer_id').values(*columns)), incremental)
+
+
+class FarmerStatementTests(TestCase):
+    """Running balances from payments.statements across dates and cursor pages."""
+
+    # (date, payment type, amount, balance after the row)
+    PAYMENTS = [
+        (date(2026, 1, 5), 'plot_fee', '100.00', '900.00'),
+        (date(2026, 1, 5), 'fine', '30.00', '900.00'),
+        (date(2026, 2, 1), 'plot_fee', '200.00', '700.00'),
+        (date(2026, 2, 15), 'contribution', '50.00', '700.00'),
+        (date(2026, 3, 1), 'plot_fee', '150.00', '550.00'),
+        (date(2026, 3, 20), 'plot_fee', '100.00', '450.00'),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        location = Location.objects.create(name="Location")
+        block = Block.objects.create(name="Block A")
+        section = Section.objects.create(name="Section 1", block=block)
+        cls.farmer = make_farmer(block, section, location, '0888000001')
+        for day, payment_type, amount, _ in cls.PAYMENTS:
+            pay(cls.farmer, amount, day, payment_type=payment_type)
+        cls.user = CustomUser.objects.create(username="admin", role='admin', is_approved=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('farmer-statement', kwargs={'farmer_id': self.farmer.pk})
+
+    def get(self, url=None, **params):
+        response = self.client.get(url or self.url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def walk(self, **params):
+        """Every page following ``next``; returns the pages."""
+        pages = [self.get(**params)]
+        while pages[-1]['next']:
+            pages.append(self.get(pages[-1]['next']))
+        return pages
+
+    def balances(self, lines):
+        return [line['balance'] for line in lines if line['entry'] == 'payment']
+
+    def expected(self, date_from=None):
+        return [
+            Decimal(balance) for day, _, _, balance in self.PAYMENTS
+            if date_from is None or day >= date_from
+        ]
+
+    def test_full_statement(self):
+        data = self.get(page_size=100)
+        opening = data['results'][0]
+        self.assertEqual(opening['entry'], 'charge')
+        self.assertEqual(opening['balance'], Decimal('1000.00'))
+        self.assertEqual(self.balances(data['results']), self.expected())
+        outstanding = FarmerBalance.objects.get(farmer=self.farmer).outstanding
+        self.assertEqual(data['closing_balance'], outstanding)
+
+    def test_cursor_pages(self):
+        pages = self.walk(page_size=2)
+        self.assertEqual(len(pages), 3)
+        lines = [line for page in pages for line in page['results']]
+        self.assertEqual(self.balances(lines), self.expected())
+        self.assertEqual([line['entry'] for line in lines].count('charge'), 1)
+        self.assertNotIn('closing_balance', pages[0])
+        self.assertEqual(pages[-1]['closing_balance'], Decimal('450.00'))
+
+    def test_date_from(self):
+        data = self.get(date_from='2026-02-01', page_size=100)
+        opening = data['results'][0]
+        self.assertEqual(opening['entry'], 'opening')
+        self.assertEqual(opening['balance'], Decimal('900.00'))
+        self.assertEqual(self.balances(data['results']), self.expected(date(2026, 2, 1)))
+
+    def test_date_from_with_cursor(self):
+        pages = self.walk(date_from='2026-02-01', page_size=1)
+        lines = [line for page in pages for line in page['results']]
+        self.assertEqual(self.balances(lines), self.expected(date(2026, 2, 1)))
+        self.assertEqual(lines[0]['balance'], Decimal('900.00'))
+
+    def test_date_range_without_payments(self):
+        data = self.get(date_from='2026-04-01')
+        self.assertEqual(self.balances(data['results']), [])
+        self.assertEqual(data['results'][0]['balance'], Decimal('450.00'))
+        self.assertEqual(data['closing_balance'], Decimal('450.00'))
 
-# Create your tests here.
+    def test_previous_page(self):
+        first = self.get(page_size=2)
+        second = self.get(first['next'])
+        back = self.get(second['previous'])
+        self.assertEqual(self.balances(back['results']), self.balances(first['results']))
+        self.assertEqual(self.balances(second['results']), self.expected()[2:4])
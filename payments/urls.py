@@ -3,12 +3,32 @@ from .views import (
     PaymentListCreateAPIView,
     PaymentDetailAPIView,
     VerifyPaymentAPIView,
+    BulkVerifyPaymentsAPIView,
     PaymentStatsAPIView,
+    FarmerStatementAPIView,
+    FarmerBalanceListAPIView,
+    BlockArrearsAPIView,
+    ArrearsAgingAPIView,
+    ArrearsAgingFarmersAPIView,
+    StatementReconcileAPIView,
+    DocumentJobListCreateAPIView,
+    DocumentJobDetailAPIView,
+    DocumentJobDownloadAPIView,
 )
 
 urlpatterns = [
     path('', PaymentListCreateAPIView.as_view(), name='payment-list-create'),
     path('<int:pk>/', PaymentDetailAPIView.as_view(), name='payment-detail'),
     path('<int:pk>/verify/', VerifyPaymentAPIView.as_view(), name='payment-verify'),
+    path('verify/', BulkVerifyPaymentsAPIView.as_view(), name='payment-bulk-verify'),
     path('stats/', PaymentStatsAPIView.as_view(), name='payment-stats'),
+    path('statement/<int:farmer_id>/', FarmerStatementAPIView.as_view(), name='farmer-statement'),
+    path('balances/', FarmerBalanceListAPIView.as_view(), name='farmer-balances'),
+    path('balances/arrears/', BlockArrearsAPIView.as_view(), name='block-arrears'),
+    path('balances/aging/', ArrearsAgingAPIView.as_view(), name='arrears-aging'),
+    path('balances/aging/farmers/', ArrearsAgingFarmersAPIView.as_view(), name='arrears-aging-farmers'),
+    path('reconcile/', StatementReconcileAPIView.as_view(), name='statement-reconcile'),
+    path('documents/', DocumentJobListCreateAPIView.as_view(), name='document-jobs'),
+    path('documents/<int:pk>/', DocumentJobDetailAPIView.as_view(), name='document-job-detail'),
+    path('documents/<int:pk>/download/', DocumentJobDownloadAPIView.as_view(), name='document-job-download'),
 ]
@@ -0,0 +1,31 @@
+"""
+Verifying payments in bulk.
+
+``verify_payments`` marks every unverified payment in a queryset as
+verified with one ``UPDATE ... WHERE is_verified = false``, inside a
+transaction that first locks the rows and moves them to the verified
+daily rollups (see payments.rollups).
+Balances do not depend on verification, so nothing else needs to change.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Payment
+from . import rollups
+
+
+def verify_payments(queryset, user, verified_at=None):
+    """Verify the unverified payments in ``queryset``; returns how many were verified."""
+    with transaction.atomic():
+        ids = list(
+            queryset.filter(is_verified=False).order_by().select_for_update().values_list('pk', flat=True)
+        )
+        if not ids:
+            return 0
+        payments = Payment.objects.filter(pk__in=ids, is_verified=False)
+        rollups.record_verified(payments)
+        return payments.update(
+            is_verified=True,
+            verified_by=user,
+            verification_date=verified_at or timezone.now(),
+        )
@@ -1,65 +1,100 @@
 # payments/views.py
-from datetime import timedelta
+import logging
+import os
+from datetime import date
+from decimal import Decimal, InvalidOperation
 from django.utils import timezone
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.db.models import Sum, Count
 from rest_framework import status, permissions, filters
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
 
-from .models import Payment
-from .serializers import PaymentSerializer
+from .models import Payment, FarmerBalance, DocumentJob
+from .serializers import PaymentSerializer, LeanPaymentSerializer, FarmerBalanceSerializer, DocumentJobSerializer
 from .filters import PaymentFilter
+from . import aging, documents, rollups, statements
+from .verification import verify_payments
+from .reconciliation import StatementFormatError, StatementReconciler, iter_statement_rows
+from accounts.scopes import ScopedQuerysetMixin, scope_for
+from farmers.models import Farmer
+from limphasaScheme.fieldsets import Fieldset
+from limphasaScheme.pagination import KeysetPagination
 
+logger = logging.getLogger(__name__)
 
-class PaymentListCreateAPIView(APIView):
+
+class IsAdminOrTreasurer(permissions.BasePermission):
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and user.role in ('admin', 'treasurer'))
+
+
+class CanVerifyPayments(permissions.BasePermission):
+    # Block chairs verify within their own block only (see accounts.scopes)
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and user.role in ('admin', 'treasurer', 'block_chair'))
+
+
+class CanRequestDocuments(permissions.BasePermission):
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and user.role in ('admin', 'treasurer', 'secretary', 'block_chair'))
+
+
+class PaymentListCreateAPIView(ScopedQuerysetMixin, APIView):
     """
     GET: list & filter payments  
     POST: create a new payment
     """
     permission_classes = [permissions.IsAuthenticated]
+    scope_fields = {'farmer': 'farmer_id'}
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = PaymentFilter
     search_fields = ['farmer__first_name', 'farmer__last_name', 'reference_code']
     ordering_fields = ['date_paid', 'amount', 'timestamp']
-    ordering = ['-date_paid']
+    ordering = ['-date_paid', '-timestamp']
 
     def get(self, request):
         # Base queryset
         qs = Payment.objects.select_related('farmer', 'recorded_by', 'verified_by')
-        print("🔍 Base payments queryset:", qs.query)
 
         # Role-based scoping
-        if request.user.role == 'block_chair':
-            qs = qs.filter(farmer__block__block_chair=request.user)
-            print(f"🔒 Block-chair {request.user.username} sees only their block:", request.user.block)
+        qs = self.scope_queryset(qs)
 
         # Apply DjangoFilterBackend
         filter_backend = DjangoFilterBackend()
         qs = filter_backend.filter_queryset(request, qs, self)
-        print("⚙️ After filters:", qs.query)
 
         # Apply search
         for backend in [filters.SearchFilter(), filters.OrderingFilter()]:
             qs = backend.filter_queryset(request, qs, self)
-        print("🔄 After search+ordering:", qs.query)
 
-        # Serialize & return
-        data = PaymentSerializer(qs, many=True, context={'request': request}).data
-        print(f"✅ Returning {len(data)} payments")
-        return Response(data)
+        # Paginate, serialize & return
+        serializer = LeanPaymentSerializer(
+            context={'request': request}, fieldset=Fieldset.from_request(request)
+        )
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(serializer.values(qs), request, view=self)
+        data = serializer.many(page)
+        logger.debug("Returning %d payments", len(data))
+        return paginator.get_paginated_response(data)
 
     def post(self, request):
-        print("📝 POST payload:", request.data)
+        logger.debug("Payment POST with fields %s", sorted(request.data))
         serializer = PaymentSerializer(data=request.data, context={'request': request})
         if not serializer.is_valid():
-            print("❌ Validation errors:", serializer.errors)
+            logger.debug("Payment rejected: %s", serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         # Save with recorded_by
         payment = serializer.save(recorded_by=request.user)
-        print(f"💾 Saved payment #{payment.id} by {request.user.username}")
+        logger.info("Saved payment #%s by %s", payment.id, request.user.username)
 
         return Response(
             PaymentSerializer(payment, context={'request': request}).data,
@@ -67,41 +102,41 @@ class PaymentListCreateAPIView(APIView):
         )
 
 
-class PaymentDetailAPIView(APIView):
+class PaymentDetailAPIView(ScopedQuerysetMixin, APIView):
     """
     GET, PUT, DELETE on a single payment
     """
     permission_classes = [permissions.IsAuthenticated]
+    scope_fields = {'farmer': 'farmer_id'}
 
     def get_object(self, pk, user):
         payment = get_object_or_404(Payment, pk=pk)
         # Block-chair check
-        if user.role == 'block_chair' and payment.farmer.block.block_chair != user:
-            print(f"🚫 {user.username} tried to access payment #{pk} outside their block")
+        if not self.in_scope(payment):
+            logger.warning("%s tried to access payment #%s outside their block", user.username, pk)
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("Cannot access payments from other blocks")
         return payment
 
     def get(self, request, pk):
         payment = self.get_object(pk, request.user)
-        print(f"📖 Retrieved payment #{payment.id}")
         return Response(PaymentSerializer(payment, context={'request': request}).data)
 
     def put(self, request, pk):
         payment = self.get_object(pk, request.user)
-        print(f"✏️ PUT update for payment #{payment.id} payload:", request.data)
+        logger.debug("Payment #%s PUT with fields %s", payment.id, sorted(request.data))
         serializer = PaymentSerializer(payment, data=request.data, context={'request': request}, partial=True)
         if not serializer.is_valid():
-            print("❌ Validation errors on update:", serializer.errors)
+            logger.debug("Update of payment #%s rejected: %s", payment.id, serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         updated = serializer.save()
-        print(f"✔️ Updated payment #{updated.id}")
+        logger.info("Updated payment #%s by %s", updated.id, request.user.username)
         return Response(PaymentSerializer(updated, context={'request': request}).data)
 
     def delete(self, request, pk):
         payment = self.get_object(pk, request.user)
         payment.delete()
-        print(f"🗑️ Deleted payment #{pk}")
+        logger.info("Deleted payment #%s by %s", pk, request.user.username)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -115,44 +150,436 @@ class VerifyPaymentAPIView(APIView):
     def post(self, request, pk):
         payment = get_object_or_404(Payment, pk=pk)
         if payment.is_verified:
-            print(f"⚠️ Payment #{pk} already verified")
+            logger.debug("Payment #%s already verified", pk)
             return Response({"detail": "Already verified"}, status=status.HTTP_400_BAD_REQUEST)
 
         payment.is_verified = True
         payment.verified_by = request.user
         payment.save()
-        print(f"🔓 Payment #{pk} verified by {request.user.username}")
+        logger.info("Payment #%s verified by %s", pk, request.user.username)
         return Response(PaymentSerializer(payment, context={'request': request}).data)
 
 
+class BulkVerifyPaymentsAPIView(ScopedQuerysetMixin, APIView):
+    """
+    POST /api/payments/verify/ → verify many payments at once
+    Body: {"ids": [1, 2, ...]} or {"filters": {...}} with the payment list
+    filters (date_paid_after, date_paid_before, method, payment_type,
+    farmer, min_amount, max_amount). Block chairs only reach their block.
+    """
+    permission_classes = [permissions.IsAuthenticated, CanVerifyPayments]
+    scope_fields = {'farmer': 'farmer_id'}
+    max_ids = 5000
+
+    def post(self, request):
+        user = request.user
+        error = self.scope_error_response()
+        if error:
+            return error
+        payments = self.scope_queryset(Payment.objects.all())
+
+        ids = request.data.get('ids')
+        filters_data = request.data.get('filters')
+        if (ids is None) == (filters_data is None):
+            return Response(
+                {"error": "Send either ids or filters."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        verified_at = timezone.now()
+        if ids is not None:
+            if not isinstance(ids, list) or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+                return Response({"error": "ids must be a list of payment IDs."}, status=status.HTTP_400_BAD_REQUEST)
+            if len(ids) > self.max_ids:
+                return Response(
+                    {"error": f"At most {self.max_ids} ids per request."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            found = set(payments.filter(pk__in=ids).values_list('pk', flat=True))
+            verified = verify_payments(Payment.objects.filter(pk__in=found), user, verified_at)
+            summary = {
+                "requested": len(set(ids)),
+                "matched": len(found),
+                "not_found": sorted(set(ids) - found),
+            }
+        else:
+            if not isinstance(filters_data, dict):
+                return Response({"error": "filters must be an object."}, status=status.HTTP_400_BAD_REQUEST)
+            filterset = PaymentFilter(data=filters_data, queryset=payments)
+            if not filterset.is_valid():
+                return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+            if not narrowing_filters(filterset.form.cleaned_data):
+                return Response(
+                    {"error": "filters must contain at least one payment filter with a value."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            matched = filterset.qs.order_by()
+            summary = {"matched": matched.count()}
+            verified = verify_payments(matched, user, verified_at)
+
+        summary.update({
+            "verified": verified,
+            "already_verified": summary["matched"] - verified,
+            "verified_by": user.pk,
+            "verification_date": verified_at,
+        })
+        logger.info("Bulk verification by %s: %d payments verified", user.username, verified)
+        return Response(summary)
+
+
 class PaymentStatsAPIView(APIView):
     """
     GET /api/payments/stats/
+    Optional: date_from, date_to (YYYY-MM-DD) add a "range" window,
+    block (admins) limits to one block, by_block=true adds "by_block".
+    Read from the daily rollups (see payments.rollups).
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        today = timezone.now().date()
-        last_week = today - timedelta(days=7)
-        last_month = today - timedelta(days=30)
-
-        qs = Payment.objects.all()
-        if request.user.role == 'block_chair':
-            qs = qs.filter(farmer__block__block_chair=request.user)
-            print(f"📊 Stats limited to block {request.user.block}")
-
-        stats = {
-            "total_payments": qs.count(),
-            "total_amount": qs.aggregate(Sum('amount'))['amount__sum'] or 0,
-            "today": qs.filter(date_paid=today).aggregate(Count('id'), Sum('amount')),
-            "last_week": qs.filter(date_paid__gte=last_week).aggregate(Count('id'), Sum('amount')),
-            "last_month": qs.filter(date_paid__gte=last_month).aggregate(Count('id'), Sum('amount')),
-            "by_type": list(qs.values('payment_type').annotate(count=Count('id'), amount=Sum('amount'))),
-            "verification_stats": {
-                "verified": qs.filter(is_verified=True).count(),
-                "unverified": qs.filter(is_verified=False).count()
-            }
-        }
+        params = request.query_params
+        dates = {}
+        for name in ('date_from', 'date_to'):
+            value = params.get(name)
+            if not value:
+                dates[name] = None
+                continue
+            try:
+                dates[name] = date.fromisoformat(value)
+            except ValueError:
+                return Response(
+                    {"error": f"{name} must be a date in YYYY-MM-DD format."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        block_id = None
+        scope = scope_for(request.user)
+        if not scope.unrestricted:
+            if scope.error():
+                return Response({"error": scope.error()}, status=status.HTTP_400_BAD_REQUEST)
+            block_id = scope.block_id
+        elif params.get('block'):
+            if not params['block'].isdigit():
+                return Response({"error": "block must be a block ID."}, status=status.HTTP_400_BAD_REQUEST)
+            block_id = int(params['block'])
 
-        print("📈 Payment stats:", stats)
+        stats = rollups.payment_stats(timezone.now().date(), block_id=block_id, **dates)
+        if params.get('by_block', '').lower() == 'true':
+            stats['by_block'] = rollups.block_breakdown(block_id=block_id, **dates)
         return Response(stats)
+
+
+class FarmerStatementAPIView(ScopedQuerysetMixin, APIView):
+    """
+    GET /api/payments/statement/{farmer_id}/ → the farmer's account: the
+    plot fee charge, then payments in date order with the running balance.
+    Optional: date_from, date_to (YYYY-MM-DD); date_from starts with the
+    balance brought forward. Cursor-paginated (see payments.statements).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, farmer_id):
+        farmer = get_object_or_404(Farmer, pk=farmer_id)
+        if not self.in_scope(farmer):
+            logger.warning("%s tried to read the statement of farmer #%s", request.user.username, farmer_id)
+            return Response(
+                {"error": "You can only view statements of farmers in your block."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        dates = {}
+        for name in ('date_from', 'date_to'):
+            value = request.query_params.get(name)
+            try:
+                dates[name] = date.fromisoformat(value) if value else None
+            except ValueError:
+                return Response(
+                    {"error": f"{name} must be a date in YYYY-MM-DD format."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        if dates['date_from'] and dates['date_to'] and dates['date_from'] > dates['date_to']:
+            return Response({"error": "date_from is after date_to."}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = KeysetPagination(ordering=statements.ORDERING)
+        cursor, reverse = paginator.decode_cursor(request)
+        rows = statements.statement_rows(farmer, cursor=cursor, reverse=reverse, **dates)
+        page = paginator.paginate_queryset(rows, request, view=self)
+
+        lines = [statements.entry(row) for row in page]
+        if paginator.previous_link is None:
+            lines.insert(0, statements.opening_entry(farmer, page, dates['date_from']))
+        response = paginator.get_paginated_response(lines)
+        header = {
+            'farmer': {
+                'id': farmer.pk,
+                'name': f"{farmer.first_name} {farmer.last_name}",
+                'registration_number': farmer.registration_number,
+                'block_id': farmer.block_id,
+                'section_id': farmer.section_id,
+                'amount_due': farmer.total_amount,
+            },
+            **dates,
+        }
+        if paginator.next_link is None and lines:
+            header['closing_balance'] = lines[-1]['balance']
+        response.data = {**header, **response.data}
+        return response
+
+
+class FarmerBalanceListAPIView(ScopedQuerysetMixin, APIView):
+    """
+    GET /api/payments/balances/ → farmer balances, largest arrears first
+    Filters: block, section, min_outstanding, include_inactive
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        qs = FarmerBalance.objects.select_related('farmer', 'block', 'section')
+        if request.query_params.get('include_inactive', '').lower() != 'true':
+            qs = qs.filter(is_active=True)
+
+        qs = self.scope_queryset(qs)
+        if self.get_scope().unrestricted and request.query_params.get('block'):
+            qs = qs.filter(block_id=request.query_params['block'])
+        if request.query_params.get('section'):
+            qs = qs.filter(section_id=request.query_params['section'])
+        if request.query_params.get('min_outstanding'):
+            try:
+                min_outstanding = Decimal(request.query_params['min_outstanding'])
+            except InvalidOperation:
+                min_outstanding = None
+            if min_outstanding is None or not min_outstanding.is_finite():
+                return Response(
+                    {"error": "min_outstanding must be a number."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            qs = qs.filter(outstanding__gte=min_outstanding)
+
+        paginator = KeysetPagination(ordering=('-outstanding',))
+        page = paginator.paginate_queryset(qs, request, view=self)
+        data = FarmerBalanceSerializer(page, many=True).data
+        return paginator.get_paginated_response(data)
+
+
+class BlockArrearsAPIView(ScopedQuerysetMixin, APIView):
+    """
+    GET /api/payments/balances/arrears/ → outstanding plot fees per block
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        qs = self.scope_queryset(FarmerBalance.objects.filter(is_active=True, outstanding__gt=0))
+
+        rows = qs.values('block_id', 'block__name').annotate(
+            farmers_in_arrears=Count('id'),
+            total_outstanding=Sum('outstanding'),
+        ).order_by('-total_outstanding')
+        return Response(list(rows))
+
+
+class ArrearsAgingAPIView(ScopedQuerysetMixin, APIView):
+    """
+    GET /api/payments/balances/aging/ → outstanding plot fees per block, split
+    into current / 31-60 / 61-90 / over 90 days since the last plot-fee payment.
+    Optional: group_by=section, block (admins), file_type=csv.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        group_by = params.get('group_by', 'block')
+        if group_by not in aging.GROUPINGS:
+            return Response(
+                {"error": f"group_by must be one of: {', '.join(aging.GROUPINGS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        block_id, error = aging_scope(self.get_scope(), params)
+        if error:
+            return error
+
+        as_of = timezone.localdate()
+        report = aging.get_report(as_of, block_id=block_id, group_by=group_by)
+        if params.get('file_type', '').lower() == 'csv':
+            return csv_download(aging.report_csv(report), f"arrears-aging-{as_of:%Y%m%d}.csv")
+        return Response(report)
+
+
+class ArrearsAgingFarmersAPIView(ScopedQuerysetMixin, APIView):
+    """
+    GET /api/payments/balances/aging/farmers/?bucket=days_61_90 → the farmers
+    behind a cell of the aging report, largest balance first.
+    Optional: block (admins), section, file_type=csv (all rows).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        bucket = params.get('bucket') or None
+        if bucket and bucket not in aging.BUCKET_NAMES:
+            return Response(
+                {"error": f"bucket must be one of: {', '.join(aging.BUCKET_NAMES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        block_id, error = aging_scope(self.get_scope(), params)
+        if error:
+            return error
+        section_id = params.get('section')
+        if section_id and not section_id.isdigit():
+            return Response({"error": "section must be a section ID."}, status=status.HTTP_400_BAD_REQUEST)
+
+        as_of = timezone.localdate()
+        rows = aging.bucket_balances(as_of, bucket, block_id=block_id, section_id=section_id)
+        if params.get('file_type', '').lower() == 'csv':
+            data = [aging.farmer_row(row, as_of) for row in rows.order_by('-outstanding', 'id')]
+            return csv_download(aging.farmers_csv(data), f"arrears-{bucket or 'all'}-{as_of:%Y%m%d}.csv")
+
+        paginator = KeysetPagination(ordering=('-outstanding',))
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response([aging.farmer_row(row, as_of) for row in page])
+
+
+def narrowing_filters(cleaned_data):
+    """
+    Names of the bulk-verify filters that actually narrow the payments.
+    Empty values are ignored by django-filter, and is_verified never
+    narrows a verify run, so neither counts.
+    """
+    names = []
+    for name, value in cleaned_data.items():
+        if name == 'is_verified':
+            continue
+        if isinstance(value, slice):
+            value = value.start if value.start is not None else value.stop
+        if value not in (None, ''):
+            names.append(name)
+    return names
+
+
+def aging_scope(scope, params):
+    """(block_id, None) for the report's scope, or (None, error response)."""
+    if not scope.unrestricted:
+        if scope.error():
+            return None, Response({"error": scope.error()}, status=status.HTTP_400_BAD_REQUEST)
+        return scope.block_id, None
+    block_id = params.get('block')
+    if block_id and not block_id.isdigit():
+        return None, Response({"error": "block must be a block ID."}, status=status.HTTP_400_BAD_REQUEST)
+    return (int(block_id) if block_id else None), None
+
+
+def csv_download(content, filename):
+    response = HttpResponse(content, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+class StatementReconcileAPIView(APIView):
+    """
+    POST /api/payments/reconcile/ with a statement CSV ``file`` and
+    ``provider`` (airtel or tnm) → verify matching payments, report the rest.
+    Optional: amount_tolerance, date_tolerance (days), dry_run=true.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminOrTreasurer]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({"error": "No file uploaded."}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        options = {
+            name: request.data[name]
+            for name in ('amount_tolerance', 'date_tolerance') if request.data.get(name)
+        }
+        try:
+            reconciler = StatementReconciler(
+                request.data.get('provider', ''), user=request.user, dry_run=dry_run, **options
+            )
+            report = reconciler.run(iter_statement_rows(upload))
+        except StatementFormatError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except UnicodeDecodeError:
+            return Response({"error": "The statement must be a UTF-8 CSV file."}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info(
+            "Statement reconciliation (%s) by %s: %d lines, %d verified, %d exceptions",
+            report['provider'], request.user.username,
+            report['total_lines'], report['verified'], report['failed'],
+        )
+        return Response(report)
+
+
+def document_jobs_for(user):
+    jobs = DocumentJob.objects.all()
+    if user.role == 'block_chair':
+        jobs = jobs.filter(requested_by=user)
+    return jobs
+
+
+class DocumentJobListCreateAPIView(APIView):
+    """
+    GET  /api/payments/documents/ → recent receipt/statement jobs
+    POST /api/payments/documents/ {"kind": "statements"|"receipts", "block",
+         "section", "farmer_ids", "payment_ids", "date_from", "date_to"}
+         → 202 with the queued job; poll it until status is "done".
+    Block chairs only print for their own block.
+    """
+    permission_classes = [permissions.IsAuthenticated, CanRequestDocuments]
+
+    def get(self, request):
+        paginator = KeysetPagination(ordering=('-created_at',))
+        page = paginator.paginate_queryset(document_jobs_for(request.user), request, view=self)
+        data = DocumentJobSerializer(page, many=True, context={'request': request}).data
+        return paginator.get_paginated_response(data)
+
+    def post(self, request):
+        user = request.user
+        params = request.data.dict() if hasattr(request.data, 'dict') else dict(request.data)
+        scope = scope_for(user)
+        if not scope.unrestricted:
+            if scope.error():
+                return Response({"error": scope.error()}, status=status.HTTP_400_BAD_REQUEST)
+            params['block'] = scope.block_id
+
+        kind = params.pop('kind', None)
+        try:
+            params = documents.clean_params(kind, params)
+        except documents.SelectionError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = DocumentJob.objects.create(kind=kind, params=params, requested_by=user)
+        if getattr(settings, 'DOCUMENT_JOBS_IN_BACKGROUND', True):
+            documents.start_in_background(job)
+        logger.info("Document job #%s (%s) queued by %s", job.pk, kind, user.username)
+        return Response(
+            DocumentJobSerializer(job, context={'request': request}).data,
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class DocumentJobDetailAPIView(APIView):
+    """
+    GET /api/payments/documents/{pk}/ → job status and progress
+    """
+    permission_classes = [permissions.IsAuthenticated, CanRequestDocuments]
+
+    def get(self, request, pk):
+        job = get_object_or_404(document_jobs_for(request.user), pk=pk)
+        return Response(DocumentJobSerializer(job, context={'request': request}).data)
+
+
+class DocumentJobDownloadAPIView(APIView):
+    """
+    GET /api/payments/documents/{pk}/download/ → the finished zip archive
+    """
+    permission_classes = [permissions.IsAuthenticated, CanRequestDocuments]
+
+    def get(self, request, pk):
+        job = get_object_or_404(document_jobs_for(request.user), pk=pk)
+        if job.status != 'done' or not job.archive:
+            return Response({"error": "The documents are not ready yet."}, status=status.HTTP_409_CONFLICT)
+        return FileResponse(
+            job.archive.open('rb'), as_attachment=True,
+            filename=os.path.basename(job.archive.name), content_type='application/zip'
+        )
@@ -2,6 +2,7 @@ import React, { useEffect, useState } from "react";
 import axios from "axios";
 import { format } from "date-fns";
 import { useAuth } from "../components/AuthContext";
+import { fetchAllPages } from "./fetchAllPages";
 import "./AttendanceTable.css";
 
 export default function AttendanceTable({ refreshFlag }) {
@@ -25,7 +26,7 @@ export default function AttendanceTable({ refreshFlag }) {
         }
 
         const [attendanceRes, statsRes] = await Promise.all([
-          axios.get(attendanceUrl, {
+          fetchAllPages(attendanceUrl, {
             headers: { Authorization: `Bearer ${authToken}` },
           }),
           axios.get(statsUrl, {
@@ -33,7 +34,7 @@ export default function AttendanceTable({ refreshFlag }) {
           }),
         ]);
 
-        setRecords(attendanceRes.data);
+        setRecords(attendanceRes);
         setStats(statsRes.data);
         setError(null);
       } catch (err) {
@@ -13,6 +13,7 @@ import {
 } from "chart.js";
 import Swal from "sweetalert2";
 import { useAuth } from "../components/AuthContext";
+import { fetchAllPages } from "./fetchAllPages";
 import LoadingSpinner from "../components/LoadingSpinner";
 import ErrorAlert from "../components/ErrorAlert";
 import { FiUsers, FiCalendar, FiDollarSign, FiPieChart, FiRefreshCw, FiSearch, FiFilter, FiEdit, FiCheck, FiX } from "react-icons/fi";
@@ -94,7 +95,7 @@ export default function DashboardPage() {
       try {
         setLoading(true);
         const [usersRes, blocksRes] = await Promise.all([
-          axios.get("https://rice-scheme-system-1.onrender.com/accounts/users/", {
+          fetchAllPages("https://rice-scheme-system-1.onrender.com/accounts/users/", {
             headers: { Authorization: `Bearer ${authToken}` },
           }),
           axios.get("https://rice-scheme-system-1.onrender.com/farmers/blocks/", {
@@ -102,12 +103,12 @@ export default function DashboardPage() {
           })
         ]);
 
-        setUsers(usersRes.data);
-        setFilteredUsers(usersRes.data);
+        setUsers(usersRes);
+        setFilteredUsers(usersRes);
         setBlocks(blocksRes.data);
 
         const initialStates = {};
-        usersRes.data.forEach((user) => {
+        usersRes.forEach((user) => {
           initialStates[user.id] = {
             first_name: user.first_name || "",
             last_name: user.last_name || "",
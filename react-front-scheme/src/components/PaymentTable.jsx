@@ -3,6 +3,7 @@ import axios from "axios";
 import { format } from "date-fns";
 import Swal from "sweetalert2";
 import { useAuth } from "../components/AuthContext";
+import { fetchAllPages } from "./fetchAllPages";
 import "./PaymentTable.css";
 
 export default function PaymentTable({ refreshFlag }) {
@@ -26,7 +27,7 @@ export default function PaymentTable({ refreshFlag }) {
         }
 
         const [payRes, statRes] = await Promise.all([
-          axios.get(paymentsUrl, {
+          fetchAllPages(paymentsUrl, {
             headers: { Authorization: `Bearer ${authToken}` }
           }),
           axios.get(statsUrl, {
@@ -34,7 +35,7 @@ export default function PaymentTable({ refreshFlag }) {
           })
         ]);
 
-        setPayments(payRes.data);
+        setPayments(payRes);
         setStats(statRes.data);
         setError(null);
       } catch (err) {
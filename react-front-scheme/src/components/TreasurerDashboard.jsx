@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from "react";
 import axios from "axios";
 import { useAuth } from "../components/AuthContext";
+import { fetchAllPages } from "./fetchAllPages";
 import './TreasurerDashboard.css';
 
 export default function TreasurerDashboard() {
@@ -18,7 +19,7 @@ export default function TreasurerDashboard() {
           axios.get("https://rice-scheme-system-1.onrender.com/farmers/farmers/?limit=1000", {
             headers: { Authorization: `Bearer ${authToken}` },
           }),
-          axios.get("https://rice-scheme-system-1.onrender.com/payments/", {
+          fetchAllPages("https://rice-scheme-system-1.onrender.com/payments/", {
             headers: { Authorization: `Bearer ${authToken}` },
           }),
         ]);
@@ -28,7 +29,7 @@ export default function TreasurerDashboard() {
           : farmersRes.data.results || [];
 
         setFarmers(farmerData);
-        setPayments(paymentsRes.data);
+        setPayments(paymentsRes);
         setError(null);
       } catch (err) {
         console.error("Error fetching dashboard data:", err);
@@ -2,6 +2,7 @@ import React, { useEffect, useState } from "react";
 import axios from "axios";
 import Swal from "sweetalert2";
 import { useAuth } from "../components/AuthContext";
+import { fetchAllPages } from "./fetchAllPages";
 
 export default function UserManagement() {
   const { authToken } = useAuth();
@@ -14,14 +15,13 @@ export default function UserManagement() {
   useEffect(() => {
     if (!authToken) return;
 
-    axios
-      .get("https://rice-scheme-system-1.onrender.com/accounts/users/", {
-        headers: { Authorization: `Bearer ${authToken}` },
-      })
-      .then((res) => {
-        setUsers(res.data);
+    fetchAllPages("https://rice-scheme-system-1.onrender.com/accounts/users/", {
+      headers: { Authorization: `Bearer ${authToken}` },
+    })
+      .then((users) => {
+        setUsers(users);
         const initialStates = {};
-        res.data.forEach((user) => {
+        users.forEach((user) => {
           initialStates[user.id] = {
             first_name: user.first_name || "",
             last_name: user.last_name || "",
@@ -0,0 +1,17 @@
+import axios from "axios";
+
+// List endpoints return one page at a time ({ next, previous, results }).
+// Screens that show the whole list follow `next` until it runs out.
+export async function fetchAllPages(url, config) {
+  const first = new URL(url);
+  first.searchParams.set("page_size", "100");
+
+  const results = [];
+  let next = first.toString();
+  while (next) {
+    const res = await axios.get(next, config);
+    results.push(...res.data.results);
+    next = res.data.next;
+  }
+  return results;
+}